@@ -0,0 +1,182 @@
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import platform
+import argparse
+import datetime
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import data_bridge
+import synthetic_data
+
+# Benchmark de memoria del catálogo compacto (CatalogStore) contra el sustituto SQLite (v14.2)
+# Compara bytes por 10k piezas contra un DataFrame de objetos y una lista de dicts.
+# Uso: python scripts/bench_catalog_store.py --sizes 10000,50000,200000 --budget_mb 64 --label v14.2
+#      python scripts/bench_catalog_store.py --label v14.3 --compare scripts/bench_results/catalog_store_v14.2.json
+
+MB = 1024 * 1024
+
+def traced(func):
+    """(resultado, bytes retenidos, pico) de una carga, medidos con tracemalloc."""
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        result = func()
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, current - before, peak - before
+
+def load_dicts():
+    with data_bridge.get_engine().connect() as conn:
+        return [dict(row._mapping) for row in conn.execute(data_bridge.text("SELECT * FROM Tbl_Maestro_Piezas"))]
+
+def load_frame():
+    with data_bridge.get_engine().connect() as conn:
+        return data_bridge.pd.read_sql(data_bridge.text("SELECT * FROM Tbl_Maestro_Piezas"), conn)
+
+def check_parity(store, records, rng, samples):
+    """Filas muestreadas del store contra la base (fechas comparadas como texto)."""
+    errors = 0
+    for record in rng.sample(records, min(samples, len(records))):
+        row = store.get(record['Codigo_Pieza'])
+        for name, value in record.items():
+            got = row[name] if row else None
+            if name in data_bridge.CATALOG_DATE_COLUMNS and got is not None:
+                got, value = str(got), str(value)
+            if got != value:
+                errors += 1
+    return errors
+
+def check_updates(store, records):
+    """upsert / delete / compact mantienen el índice código -> fila."""
+    errors = 0
+    code = records[0]['Codigo_Pieza']
+    store.upsert(dict(records[0], Descripcion='EDITADA EN BENCH', Material='ACERO BENCH'))
+    row = store.get(code.lower())
+    errors += row is None or row['Descripcion'] != 'EDITADA EN BENCH' or row['Material'] != 'ACERO BENCH'
+    store.upsert(dict(records[0], Codigo_Pieza='BENCH-NUEVA'))
+    errors += store.get('BENCH-NUEVA') is None
+    store.delete(code)
+    errors += store.get(code) is not None
+    expected = len(store)
+    store.compact()
+    errors += len(store) != expected or store.get('BENCH-NUEVA') is None or store.get(code) is not None
+    return int(errors)
+
+def measure_size(parts, args, temp_dir):
+    db_path = os.path.join(temp_dir, f"catalog_{parts}.sqlite")
+    synthetic_data.build_standin(db_path, parts, args.conflict_ratio, 0, args.seed)
+
+    t0 = time.perf_counter()
+    store, store_bytes, store_peak = traced(data_bridge.build_catalog_store)
+    load_ms = (time.perf_counter() - t0) * 1000
+    records, dict_bytes, _ = traced(load_dicts)
+    frame, _, frame_peak = traced(load_frame)
+    frame_bytes = int(frame.memory_usage(deep=True).sum())
+
+    t0 = time.perf_counter()
+    codes = [record['Codigo_Pieza'] for record in records]
+    for code in codes:
+        store.row_index(code)
+    lookup_us = (time.perf_counter() - t0) * 1e6 / len(codes) if codes else 0.0
+
+    reported_bytes = store.memory_bytes()
+    rng = random.Random(args.seed)
+    failures = check_parity(store, records, rng, args.samples) + check_updates(store, records)
+    per_10k = lambda size: round(size * 10000 / parts / MB, 3)
+    result = {
+        "parts": parts,
+        "store_mb": round(store_bytes / MB, 2),
+        "store_reported_mb": round(reported_bytes / MB, 2),
+        "store_peak_mb": round(store_peak / MB, 2),
+        "dicts_mb": round(dict_bytes / MB, 2),
+        "frame_mb": round(frame_bytes / MB, 2),
+        "frame_peak_mb": round(frame_peak / MB, 2),
+        "store_mb_per_10k": per_10k(store_bytes),
+        "dicts_mb_per_10k": per_10k(dict_bytes),
+        "frame_mb_per_10k": per_10k(frame_bytes),
+        "load_ms": round(load_ms, 1),
+        "lookup_us": round(lookup_us, 3),
+        "errors": failures
+    }
+    del records, frame
+    data_bridge.invalidate_catalog_store()
+    data_bridge.get_engine().dispose()
+    return result
+
+def compare(current, baseline_path):
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    print(f"\n📈 Comparación contra {baseline.get('label')} ({baseline_path})")
+    previous = {item['parts']: item for item in baseline.get('sizes', [])}
+    for item in current['sizes']:
+        before = previous.get(item['parts'])
+        if not before:
+            print(f"   - {item['parts']:>8} piezas sin referencia")
+            continue
+        print(f"   - {item['parts']:>8} piezas: store {before['store_mb']:7.2f} -> {item['store_mb']:7.2f} MB | "
+              f"carga {before['load_ms']:8.1f} -> {item['load_ms']:8.1f} ms")
+
+def run_suite(args):
+    temp_dir = tempfile.mkdtemp(prefix='bench_catalog_')
+    sizes = [int(size) for size in args.sizes.split(',')]
+    failures = 0
+    try:
+        report = {
+            "label": args.label,
+            "timestamp": datetime.datetime.now().isoformat(timespec='seconds'),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "backend": "sqlite",
+            "budget_mb": args.budget_mb,
+            "sizes": []
+        }
+        print("📊 Memoria del catálogo en memoria (MB retenidos, tracemalloc)")
+        for parts in sizes:
+            print(f"🧪 Generando sustituto SQLite: {parts} piezas")
+            item = measure_size(parts, args, temp_dir)
+            report['sizes'].append(item)
+            print(f"   - {parts:>8} piezas: store {item['store_mb']:7.2f} MB ({item['store_mb_per_10k']:.2f}/10k) | "
+                  f"dicts {item['dicts_mb']:7.2f} MB | DataFrame {item['frame_mb']:7.2f} MB | "
+                  f"carga {item['load_ms']:8.1f} ms | búsqueda {item['lookup_us']:.2f} µs")
+            if item['errors']:
+                print(f"❌ ERROR: {item['errors']} diferencias entre el store y la base")
+                failures += 1
+
+        largest = report['sizes'][-1]
+        if args.budget_mb and largest['store_mb'] > args.budget_mb:
+            print(f"❌ ERROR: {largest['parts']} piezas ocupan {largest['store_mb']:.2f} MB (presupuesto {args.budget_mb} MB)")
+            failures += 1
+
+        output = args.output or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bench_results', f"catalog_store_{args.label}.json")
+        os.makedirs(os.path.dirname(output), exist_ok=True)
+        with open(output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Resultados: {output}")
+
+        if args.compare:
+            compare(report, args.compare)
+        if not failures:
+            print("✅ Paridad con la base y presupuesto de memoria verificados.")
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', default='10000,50000,200000', help='Tamaños del maestro sintético, separados por comas')
+    parser.add_argument('--conflict_ratio', type=float, default=0.05, help='Fracción de piezas con conflicto pendiente')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--samples', type=int, default=2000, help='Filas comparadas contra la base por tamaño')
+    parser.add_argument('--budget_mb', type=float, default=64, help='Máximo de MB para el tamaño más grande (0 = sin límite)')
+    parser.add_argument('--label', default='dev', help='Etiqueta de versión para el JSON de resultados')
+    parser.add_argument('--output', help='Archivo JSON de salida (default: scripts/bench_results/catalog_store_<label>.json)')
+    parser.add_argument('--compare', help='JSON de una corrida anterior para comparar')
+    sys.exit(run_suite(parser.parse_args()))
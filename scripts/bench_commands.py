@@ -0,0 +1,160 @@
+import os
+import sys
+import json
+import time
+import random
+import platform
+import argparse
+import datetime
+import shutil
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import data_bridge
+import synthetic_data
+
+# Benchmark de latencia por comando contra el sustituto SQLite (v14.2)
+# Mide process_command + serialización JSON, igual que el listener.
+# Uso: python scripts/bench_commands.py --parts 20000 --label v14.2
+#      python scripts/bench_commands.py --label v14.3 --compare scripts/bench_results/commands_v14.2.json
+
+# Comandos de catálogo completo: menos repeticiones (cada una lee todo el maestro)
+HEAVY_COMMANDS = {'get_all', 'get_pending'}
+COMMANDS = ['get_all', 'fetch_part', 'update', 'get_pending', 'get_suggestion']
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * (len(sorted_values) - 1)))))
+    return sorted_values[index]
+
+def build_payloads(command, codes, rng):
+    if command == 'fetch_part':
+        return lambda: {'code': rng.choice(codes)}
+    if command == 'update':
+        def payload():
+            code = rng.choice(codes)
+            return {'code': code, 'Descripcion': f"SOPORTE EDITADO {rng.randint(1, 9999)} MM", 'Material': 'ACERO ASTM A36 1/4"'}
+        return payload
+    if command == 'get_suggestion':
+        materials = [item['Descripcion'] for item in data_bridge.DEFAULT_STANDARDS]
+        return lambda: {'text': synthetic_data.perturb_description(rng.choice(materials), rng)}
+    return lambda: {}
+
+def run_command(command, make_payload, iterations, warmup):
+    for _ in range(warmup):
+        json.dumps(data_bridge.process_command(command, make_payload(), None), default=str)
+
+    timings = []
+    errors = 0
+    started = time.perf_counter()
+    for _ in range(iterations):
+        payload = make_payload()
+        t0 = time.perf_counter()
+        result = data_bridge.process_command(command, payload, None)
+        json.dumps(result, default=str)
+        timings.append((time.perf_counter() - t0) * 1000)
+        if isinstance(result, dict) and result.get('status') == 'error':
+            errors += 1
+    elapsed = time.perf_counter() - started
+
+    timings.sort()
+    return {
+        "iterations": iterations,
+        "errors": errors,
+        "mean_ms": round(sum(timings) / len(timings), 3),
+        "p50_ms": round(percentile(timings, 0.50), 3),
+        "p95_ms": round(percentile(timings, 0.95), 3),
+        "p99_ms": round(percentile(timings, 0.99), 3),
+        "max_ms": round(timings[-1], 3),
+        "throughput_ops": round(iterations / elapsed, 1)
+    }
+
+def run_bulk_resolution():
+    """Una auto-resolución real (sin dry_run): cubre UPDATE ... FROM ... JOIN ... WHERE en el sustituto."""
+    t0 = time.perf_counter()
+    result = data_bridge.process_command('resolve_conflicts_bulk', {'rule': 'whitespace_case', 'dry_run': False}, None)
+    ms = (time.perf_counter() - t0) * 1000
+    after = data_bridge.process_command('resolve_conflicts_bulk', {'rule': 'whitespace_case', 'dry_run': True}, None)
+    errors = 0
+    if result.get('status') != 'success' or after.get('status') != 'success':
+        errors = 1
+    elif result['applied'] != result['matched'] or after['matched'] or after['pending'] != result['pending'] - result['applied']:
+        errors = 1 # Lo aplicado debe desaparecer de los pendientes
+    print(f"   - {'resolve_bulk':<15} {ms:8.2f} ms | {result.get('applied', 0)} de {result.get('pending', 0)} pendientes"
+          + (f" | ❌ {result.get('message') or after.get('message') or 'pendientes no coinciden'}" if errors else ""))
+    return {"ms": round(ms, 3), "applied": result.get('applied', 0), "pending": result.get('pending', 0), "errors": errors}
+
+def compare(current, baseline_path):
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    print(f"\n📈 Comparación contra {baseline.get('label')} ({baseline_path})")
+    for command, stats in current['commands'].items():
+        before = baseline.get('commands', {}).get(command)
+        if not before:
+            print(f"   - {command:<15} sin referencia")
+            continue
+        deltas = []
+        for key in ('p50_ms', 'p95_ms'):
+            change = (stats[key] - before[key]) / before[key] * 100 if before[key] else 0.0
+            deltas.append(f"{key[:-3]} {before[key]:8.2f} -> {stats[key]:8.2f} ms ({change:+6.1f}%)")
+        print(f"   - {command:<15} " + " | ".join(deltas))
+
+def run_suite(args):
+    temp_dir = None if args.db else tempfile.mkdtemp(prefix='bench_bridge_')
+    db_path = args.db or os.path.join(temp_dir, 'bench_standin.sqlite')
+    print(f"🧪 Generando sustituto SQLite: {args.parts} piezas, conflictos {args.conflict_ratio:.0%}, historial x{args.history_depth}")
+    dataset = synthetic_data.build_standin(db_path, args.parts, args.conflict_ratio, args.history_depth, args.seed)
+
+    rng = random.Random(args.seed)
+    codes = [f"JA-{i:06d}" for i in range(args.parts)]
+    commands = args.commands.split(',') if args.commands else COMMANDS
+
+    report = {
+        "label": args.label,
+        "timestamp": datetime.datetime.now().isoformat(timespec='seconds'),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "backend": "sqlite",
+        "dataset": dataset,
+        "commands": {}
+    }
+    for command in commands:
+        iterations = args.heavy_iterations if command in HEAVY_COMMANDS else args.iterations
+        stats = run_command(command, build_payloads(command, codes, rng), iterations, args.warmup)
+        report['commands'][command] = stats
+        print(f"   - {command:<15} p50 {stats['p50_ms']:8.2f} ms | p95 {stats['p95_ms']:8.2f} ms | "
+              f"p99 {stats['p99_ms']:8.2f} ms | {stats['throughput_ops']:8.1f} ops/s"
+              + (f" | ❌ {stats['errors']} errores" if stats['errors'] else ""))
+
+    report['bulk_resolution'] = run_bulk_resolution()
+
+    output = args.output or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bench_results', f"commands_{args.label}.json")
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"💾 Resultados: {output}")
+
+    if args.compare:
+        compare(report, args.compare)
+    if temp_dir:
+        data_bridge.get_engine().dispose()
+        shutil.rmtree(temp_dir, ignore_errors=True)
+    failed = any(stats['errors'] for stats in report['commands'].values()) or report['bulk_resolution']['errors']
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--parts', type=int, default=10000, help='Piezas en el maestro sintético')
+    parser.add_argument('--conflict_ratio', type=float, default=0.05, help='Fracción de piezas con conflicto pendiente')
+    parser.add_argument('--history_depth', type=int, default=3, help='Resoluciones históricas por pieza')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--iterations', type=int, default=200, help='Repeticiones por comando puntual')
+    parser.add_argument('--heavy_iterations', type=int, default=10, help='Repeticiones de get_all / get_pending')
+    parser.add_argument('--warmup', type=int, default=2, help='Llamadas descartadas antes de medir')
+    parser.add_argument('--commands', help=f"Lista separada por comas (default: {','.join(COMMANDS)})")
+    parser.add_argument('--db', help='Ruta del SQLite (default: carpeta temporal)')
+    parser.add_argument('--label', default='dev', help='Etiqueta de versión para el JSON de resultados')
+    parser.add_argument('--output', help='Archivo JSON de salida (default: scripts/bench_results/commands_<label>.json)')
+    parser.add_argument('--compare', help='JSON de una corrida anterior para comparar')
+    sys.exit(run_suite(parser.parse_args()))
@@ -0,0 +1,169 @@
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import platform
+import argparse
+import datetime
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import data_bridge
+import synthetic_data
+
+# Benchmark de find_duplicates (shingles + MinHash/LSH) contra el sustituto SQLite (v14.2)
+# Siembra duplicados (misma pieza con otro código y descripción alterada de forma que
+# la normalización no la iguale) y mide tiempo por tamaño de catálogo, recall de lo
+# sembrado y, en el tamaño menor, paridad contra la comparación de todos los pares.
+# Uso: python scripts/bench_duplicates.py --sizes 10000,50000,200000 --label v14.2
+#      python scripts/bench_duplicates.py --label v14.3 --compare scripts/bench_results/duplicates_v14.2.json
+
+def plant_duplicates(count, seed):
+    """Copia `count` piezas con otro código y descripción casi igual (caracteres o tokens cambiados)."""
+    rng = random.Random(seed)
+    pairs = synthetic_data.load_master_pairs()
+    planted = []
+    for n, (code, desc) in enumerate(rng.sample(pairs, min(count, len(pairs)))):
+        planted.append({'c': f"DUP-{n:06d}", 'd': synthetic_data.near_duplicate_description(desc, rng), 'o': code})
+    with data_bridge.get_engine().begin() as conn:
+        conn.execute(data_bridge.text("INSERT INTO Tbl_Maestro_Piezas (Codigo_Pieza, Descripcion) VALUES (:c, :d)"),
+                     [{'c': item['c'], 'd': item['d']} for item in planted])
+    data_bridge.invalidate_catalog_store()
+    return planted
+
+def planted_recall(result, planted, threshold):
+    """Fracción de duplicados sembrados (con Jaccard >= umbral) que quedaron en el cluster de su original."""
+    cluster_of = {}
+    for index, cluster in enumerate(result['clusters']):
+        for part in cluster['parts']:
+            cluster_of[part['codigo']] = index
+    originals = dict(synthetic_data.load_master_pairs())
+    expected = found = 0
+    for item in planted:
+        pair = [(0, 1, originals[item['o']], item['d'])]
+        if not data_bridge.duplicate_jaccard_pairs(pair, threshold):
+            continue # La alteración lo dejó bajo el umbral: no cuenta
+        expected += 1
+        found += item['c'] in cluster_of and cluster_of.get(item['c']) == cluster_of.get(item['o'])
+    return found, expected
+
+def brute_force_pairs(threshold):
+    """Pares de descripciones únicas (ya normalizadas: ninguno idéntico) con Jaccard >= umbral, todos contra todos."""
+    texts = sorted({data_bridge._normalize_description(desc) for _, desc in synthetic_data.load_master_pairs() if desc})
+    shingles = [data_bridge.duplicate_shingles(text) for text in texts]
+    pairs = 0
+    for i in range(len(texts)):
+        for j in range(i + 1, len(texts)):
+            union = len(shingles[i] | shingles[j])
+            pairs += bool(union) and len(shingles[i] & shingles[j]) / union >= threshold
+    return pairs
+
+def compare(current, baseline_path):
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    print(f"\n📈 Comparación contra {baseline.get('label')} ({baseline_path})")
+    previous = {item['parts']: item for item in baseline.get('sizes', [])}
+    for item in current['sizes']:
+        before = previous.get(item['parts'])
+        if not before:
+            print(f"   - {item['parts']:>8} piezas sin referencia")
+            continue
+        change = (item['ms'] - before['ms']) / before['ms'] * 100 if before['ms'] else 0.0
+        print(f"   - {item['parts']:>8} piezas: {before['ms']:10.1f} -> {item['ms']:10.1f} ms ({change:+6.1f}%)")
+
+def run_suite(args):
+    temp_dir = tempfile.mkdtemp(prefix='bench_duplicates_')
+    sizes = [int(size) for size in args.sizes.split(',')]
+    failures = 0
+    try:
+        report = {
+            "label": args.label,
+            "timestamp": datetime.datetime.now().isoformat(timespec='seconds'),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "backend": "sqlite",
+            "threshold": args.threshold,
+            "sizes": []
+        }
+        print(f"📊 find_duplicates (umbral {args.threshold}, workers {args.workers or os.cpu_count()})")
+        for n, parts in enumerate(sizes):
+            print(f"🧪 Generando sustituto SQLite: {parts} piezas + {args.planted} duplicados sembrados")
+            synthetic_data.build_standin(os.path.join(temp_dir, f"duplicates_{parts}.sqlite"), parts, 0.0, 0, args.seed)
+            planted = plant_duplicates(args.planted, args.seed)
+            data_bridge.get_catalog_store() # El store se mide aparte (bench_catalog_store.py)
+
+            t0 = time.perf_counter()
+            result = data_bridge.find_duplicates({'threshold': args.threshold, 'limit': 10 ** 9, 'workers': args.workers})
+            ms = (time.perf_counter() - t0) * 1000
+            if result.get('status') != 'success':
+                print(f"❌ ERROR: find_duplicates devolvió {result}")
+                return 1
+
+            found, expected = planted_recall(result, planted, args.threshold)
+            item = {
+                "parts": result['parts'],
+                "ms": round(ms, 1),
+                "us_per_part": round(ms * 1000 / result['parts'], 2),
+                "unique_descriptions": result['unique_descriptions'],
+                "lsh": result['lsh'],
+                "workers": result['workers'],
+                "clusters": result['total_clusters'],
+                "timings": result['timings'],
+                "planted_found": found,
+                "planted_expected": expected
+            }
+            if n == 0 and parts <= args.brute_max:
+                item['brute_force_pairs'] = brute_force_pairs(args.threshold)
+            report['sizes'].append(item)
+
+            print(f"   - {item['parts']:>8} piezas: {ms:10.1f} ms ({item['us_per_part']:.1f} µs/pieza) | "
+                  f"candidatos {item['lsh']['candidates']} -> verificados {item['lsh']['verified']} | "
+                  f"clusters {item['clusters']} | sembrados {found}/{expected}")
+            if expected < args.min_pairs:
+                print(f"❌ ERROR: solo {expected} casi-duplicados sembrados sobre el umbral (mínimo {args.min_pairs}): muestra insuficiente")
+                failures += 1
+            if expected and found / expected < args.min_recall:
+                print(f"❌ ERROR: recall de duplicados sembrados {found / expected:.1%} (mínimo {args.min_recall:.0%})")
+                failures += 1
+            if 'brute_force_pairs' in item:
+                print(f"   - Todos contra todos: {item['brute_force_pairs']} pares, LSH verificó {item['lsh']['verified']}")
+                if item['brute_force_pairs'] < args.min_pairs:
+                    print(f"❌ ERROR: la comparación completa solo encontró {item['brute_force_pairs']} pares (mínimo {args.min_pairs})")
+                    failures += 1
+                if item['lsh']['verified'] < item['brute_force_pairs'] * args.min_recall:
+                    print("❌ ERROR: LSH perdió demasiados pares respecto a la comparación completa")
+                    failures += 1
+            data_bridge.invalidate_catalog_store()
+            data_bridge.get_engine().dispose()
+
+        output = args.output or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bench_results', f"duplicates_{args.label}.json")
+        os.makedirs(os.path.dirname(output), exist_ok=True)
+        with open(output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Resultados: {output}")
+
+        if args.compare:
+            compare(report, args.compare)
+        if not failures:
+            print("✅ Duplicados sembrados detectados.")
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', default='5000,50000,200000', help='Tamaños del maestro sintético, separados por comas')
+    parser.add_argument('--planted', type=int, default=500, help='Duplicados sembrados por tamaño')
+    parser.add_argument('--threshold', type=float, default=data_bridge.DUPLICATE_THRESHOLD, help='Jaccard mínimo')
+    parser.add_argument('--workers', type=int, help='Procesos (default: núcleos disponibles)')
+    parser.add_argument('--min_pairs', type=int, default=100, help='Mínimo de pares casi-duplicados sobre el umbral para que la paridad cuente')
+    parser.add_argument('--min_recall', type=float, default=0.97, help='Recall mínimo aceptado')
+    parser.add_argument('--brute_max', type=int, default=5000, help='Comparar contra todos los pares si el primer tamaño no supera esto')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--label', default='dev', help='Etiqueta de versión para el JSON de resultados')
+    parser.add_argument('--output', help='Archivo JSON de salida (default: scripts/bench_results/duplicates_<label>.json)')
+    parser.add_argument('--compare', help='JSON de una corrida anterior para comparar')
+    sys.exit(run_suite(parser.parse_args()))
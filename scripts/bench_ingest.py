@@ -0,0 +1,210 @@
+import os
+import sys
+import json
+import time
+import shutil
+import platform
+import argparse
+import datetime
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import data_bridge
+import synthetic_data
+from bench_commands import percentile
+
+# Benchmark de ingesta de Excel (lectura -> diff -> aplicación) y write-back contra el sustituto SQLite (v14.2)
+# Uso: python scripts/bench_ingest.py --parts 20000 --rows 5000 --label v14.2
+#      python scripts/bench_ingest.py --label v14.3 --compare scripts/bench_results/ingest_v14.2.json
+
+PHASES = ['parse', 'diff', 'apply', 'writeback']
+
+def summarize(timings):
+    timings = sorted(timings)
+    return {
+        "runs": len(timings),
+        "min_ms": round(timings[0], 3),
+        "mean_ms": round(sum(timings) / len(timings), 3),
+        "p95_ms": round(percentile(timings, 0.95), 3),
+        "max_ms": round(timings[-1], 3)
+    }
+
+def run_ingest_phases(path):
+    """Una pasada completa lectura/diff/aplicación; la transacción se revierte para poder repetir."""
+    timings = {}
+    t0 = time.perf_counter()
+    rows = data_bridge.read_ingest_rows(path)
+    timings['parse'] = (time.perf_counter() - t0) * 1000
+
+    with data_bridge.get_engine().connect() as conn:
+        trans = conn.begin()
+        try:
+            t0 = time.perf_counter()
+            plan = data_bridge.diff_ingest_rows(conn, rows)
+            timings['diff'] = (time.perf_counter() - t0) * 1000
+
+            t0 = time.perf_counter()
+            data_bridge.apply_ingest_plan(conn, plan)
+            timings['apply'] = (time.perf_counter() - t0) * 1000
+        finally:
+            trans.rollback()
+    return timings, rows, plan
+
+def run_writeback(path, sheet, conflict_rows, count):
+    """write_excel_cell sobre una copia del libro: abrir, escribir una celda, guardar."""
+    timings = []
+    errors = 0
+    for item in conflict_rows[:count]:
+        t0 = time.perf_counter()
+        result = data_bridge.write_excel_cell(path, sheet, item['row'], item['master'])
+        timings.append((time.perf_counter() - t0) * 1000)
+        if result.get('status') != 'success':
+            errors += 1
+    return timings, errors
+
+def measure_peaks(path, sheet, conflict_rows, work_dir):
+    """Pico de memoria por fase (pasada aparte: tracemalloc distorsiona los tiempos)."""
+    peaks = {}
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        rows = data_bridge.read_ingest_rows(path)
+        peaks['parse'] = tracemalloc.get_traced_memory()[1]
+
+        with data_bridge.get_engine().connect() as conn:
+            trans = conn.begin()
+            try:
+                tracemalloc.reset_peak()
+                plan = data_bridge.diff_ingest_rows(conn, rows)
+                peaks['diff'] = tracemalloc.get_traced_memory()[1]
+                tracemalloc.reset_peak()
+                data_bridge.apply_ingest_plan(conn, plan)
+                peaks['apply'] = tracemalloc.get_traced_memory()[1]
+            finally:
+                trans.rollback()
+
+        if conflict_rows:
+            copy = shutil.copy(path, os.path.join(work_dir, 'writeback_memoria.xlsx'))
+            tracemalloc.reset_peak()
+            data_bridge.write_excel_cell(copy, sheet, conflict_rows[0]['row'], conflict_rows[0]['master'])
+            peaks['writeback'] = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {phase: round(peak / (1024 * 1024), 2) for phase, peak in peaks.items()}
+
+def compare(current, baseline_path):
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    print(f"\n📈 Comparación contra {baseline.get('label')} ({baseline_path})")
+    for phase, stats in current['phases'].items():
+        before = baseline.get('phases', {}).get(phase)
+        if not before:
+            print(f"   - {phase:<10} sin referencia")
+            continue
+        change = (stats['mean_ms'] - before['mean_ms']) / before['mean_ms'] * 100 if before['mean_ms'] else 0.0
+        line = f"   - {phase:<10} prom {before['mean_ms']:9.2f} -> {stats['mean_ms']:9.2f} ms ({change:+6.1f}%)"
+        if 'peak_mb' in stats and 'peak_mb' in before:
+            line += f" | pico {before['peak_mb']:7.2f} -> {stats['peak_mb']:7.2f} MB"
+        print(line)
+    before_e2e = baseline.get('end_to_end', {}).get('ms')
+    if before_e2e:
+        print(f"   - {'scan_source':<10} {before_e2e:9.2f} -> {current['end_to_end']['ms']:9.2f} ms")
+
+def run_suite(args):
+    temp_dir = tempfile.mkdtemp(prefix='bench_ingest_')
+    db_path = args.db or os.path.join(temp_dir, 'bench_standin.sqlite')
+    book_path = os.path.join(temp_dir, 'LISTA_SINTETICA.xlsx')
+    failures = 0
+    try:
+        print(f"🧪 Generando sustituto SQLite: {args.parts} piezas")
+        dataset = synthetic_data.build_standin(db_path, args.parts, args.conflict_ratio, 0, args.seed)
+        print(f"🧪 Generando lista de proyecto: {args.rows} filas, {args.sheets} hojas, conflictos {args.conflict_rate:.0%}, altas {args.new_rate:.0%}")
+        book = synthetic_data.build_project_workbook(book_path, synthetic_data.load_master_pairs(), args.rows,
+                                                     args.conflict_rate, args.new_rate, args.sheets, seed=args.seed)
+
+        collected = {phase: [] for phase in PHASES}
+        for _ in range(args.repeat):
+            timings, rows, plan = run_ingest_phases(book_path)
+            for phase, ms in timings.items():
+                collected[phase].append(ms)
+
+        # Lo detectado debe coincidir con lo que sembró el generador
+        if len(plan['inserts']) != book['new'] or len(plan['conflicts']) != book['conflicts']:
+            print(f"❌ ERROR: diff detectó {len(plan['inserts'])} altas / {len(plan['conflicts'])} conflictos; "
+                  f"esperados {book['new']} / {book['conflicts']}")
+            failures += 1
+
+        copy = shutil.copy(book_path, os.path.join(temp_dir, 'writeback.xlsx'))
+        collected['writeback'], writeback_errors = run_writeback(copy, book['sheet'], book['conflict_rows'], args.writebacks)
+        if writeback_errors:
+            print(f"❌ ERROR: {writeback_errors} escrituras fallidas en el write-back")
+            failures += 1
+        if not collected['writeback']:
+            del collected['writeback']
+
+        peaks = {} if args.no_memory else measure_peaks(book_path, book['sheet'], book['conflict_rows'], temp_dir)
+
+        # Extremo a extremo: lo que dispara Flutter (fuente registrada + scan_source)
+        data_bridge.process_command('add_source', {'name': 'BENCH', 'path': book_path}, None)
+        source_id = max(int(source['ID']) for source in data_bridge.get_sources())
+        t0 = time.perf_counter()
+        result = data_bridge.process_command('scan_source', {'id': source_id}, None)
+        e2e_ms = (time.perf_counter() - t0) * 1000
+        if result.get('status') != 'success' or result.get('new_items') != book['new'] or result.get('conflicts') != book['conflicts']:
+            print(f"❌ ERROR: scan_source devolvió {result}")
+            failures += 1
+
+        report = {
+            "label": args.label,
+            "timestamp": datetime.datetime.now().isoformat(timespec='seconds'),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "backend": "sqlite",
+            "dataset": dataset,
+            "workbook": {key: book[key] for key in ('rows', 'new', 'conflicts')} | {"sheets": args.sheets, "parsed_rows": len(rows)},
+            "phases": {},
+            "end_to_end": {"ms": round(e2e_ms, 3), "result": result}
+        }
+        print(f"📊 Ingesta de {len(rows)} filas ({args.repeat} repeticiones, write-back x{len(collected.get('writeback', []))})")
+        for phase, timings in collected.items():
+            stats = summarize(timings)
+            if phase in peaks:
+                stats['peak_mb'] = peaks[phase]
+            report['phases'][phase] = stats
+            print(f"   - {phase:<10} min {stats['min_ms']:9.2f} ms | prom {stats['mean_ms']:9.2f} ms | p95 {stats['p95_ms']:9.2f} ms"
+                  + (f" | pico {stats['peak_mb']:7.2f} MB" if 'peak_mb' in stats else ""))
+        print(f"   - {'scan_source':<10} {e2e_ms:9.2f} ms (extremo a extremo)")
+
+        output = args.output or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bench_results', f"ingest_{args.label}.json")
+        os.makedirs(os.path.dirname(output), exist_ok=True)
+        with open(output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, default=str)
+        print(f"💾 Resultados: {output}")
+
+        if args.compare:
+            compare(report, args.compare)
+        if not failures:
+            print("✅ Altas y conflictos coinciden con lo generado.")
+    finally:
+        data_bridge.get_engine().dispose()
+        shutil.rmtree(temp_dir, ignore_errors=True)
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--parts', type=int, default=10000, help='Piezas en el maestro sintético')
+    parser.add_argument('--conflict_ratio', type=float, default=0.05, help='Conflictos pendientes previos en el maestro')
+    parser.add_argument('--rows', type=int, default=2000, help='Filas de la lista de proyecto')
+    parser.add_argument('--conflict_rate', type=float, default=0.1, help='Fracción de filas con descripción distinta al maestro')
+    parser.add_argument('--new_rate', type=float, default=0.1, help='Fracción de filas con código nuevo')
+    parser.add_argument('--sheets', type=int, default=3, help='Hojas del libro')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--repeat', type=int, default=3, help='Repeticiones de lectura/diff/aplicación')
+    parser.add_argument('--writebacks', type=int, default=10, help='Correcciones escritas en la copia del libro')
+    parser.add_argument('--no_memory', action='store_true', help='Omitir la pasada de tracemalloc')
+    parser.add_argument('--db', help='Ruta del SQLite (default: carpeta temporal)')
+    parser.add_argument('--label', default='dev', help='Etiqueta de versión para el JSON de resultados')
+    parser.add_argument('--output', help='Archivo JSON de salida (default: scripts/bench_results/ingest_<label>.json)')
+    parser.add_argument('--compare', help='JSON de una corrida anterior para comparar')
+    sys.exit(run_suite(parser.parse_args()))
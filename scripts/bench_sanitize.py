@@ -0,0 +1,90 @@
+import os
+import sys
+import time
+import random
+import datetime
+import argparse
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import data_bridge
+
+# Benchmark de sanitize(): versión original (v14.1) vs versión vectorizada (v14.2)
+# Uso: python scripts/bench_sanitize.py --rows 50000 --repeat 5
+
+def sanitize_legacy(df):
+    """Copia fiel del sanitize() v14.1, solo para comparar."""
+    df = df.fillna("")
+    for col in df.select_dtypes(include=['object']):
+        df[col] = df[col].astype(str).str.replace(r'[\r\n\t]+', ' ', regex=True)
+    for col in df.select_dtypes(include=['datetime', 'datetimetz']).columns:
+        df[col] = df[col].astype(str).replace('NaT', "")
+    return df
+
+def build_catalog_frame(rows, seed=42):
+    """Frame con la forma de Tbl_Maestro_Piezas (pocas celdas con saltos de línea, algunos nulos)."""
+    rng = random.Random(seed)
+    materials = ['ACERO ASTM A36 1/4"', 'ALUMINIO 5052 1/4"', 'HSS ASTM A500 °B 4" x 3" x 1/4"', 'PTR ASTM A36 1" x 1" x C.11', None]
+    processes = ['CORTE LASER', 'DOBLEZ', 'SOLDADURA', 'MAQUINADO', 'PINTURA', None]
+    base = datetime.datetime(2024, 1, 1)
+
+    descriptions = []
+    for i in range(rows):
+        desc = f"SOPORTE LATERAL {i % 97} TIPO {rng.choice('ABCDEF')}"
+        if rng.random() < 0.01:
+            desc += "\r\nREV B" # Celdas pegadas desde Excel con salto de línea
+        descriptions.append(desc)
+
+    return pd.DataFrame({
+        'ID': np.arange(rows),
+        'Codigo_Pieza': [f"JA-{i:06d}" for i in range(rows)],
+        'Descripcion': descriptions,
+        'Material': [rng.choice(materials) for _ in range(rows)],
+        'Medida': [f"{rng.randint(10, 3000)} MM" for _ in range(rows)],
+        'Simetria': [rng.choice(['IZQ', 'DER', 'SIM', None]) for _ in range(rows)],
+        'Proceso_Primario': [rng.choice(processes) for _ in range(rows)],
+        'Proceso_1': [rng.choice(processes) for _ in range(rows)],
+        'Proceso_2': [rng.choice(processes) for _ in range(rows)],
+        'Proceso_3': [rng.choice(processes) for _ in range(rows)],
+        'Ultima_Actualizacion': pd.to_datetime([
+            None if rng.random() < 0.05 else base + datetime.timedelta(minutes=rng.randint(0, 500000))
+            for _ in range(rows)
+        ]),
+    })
+
+def time_it(func, df, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(df)
+        timings.append(time.perf_counter() - start)
+    return min(timings), sum(timings) / len(timings)
+
+def run_benchmark(rows, repeat):
+    df = build_catalog_frame(rows)
+
+    # Paridad: el JSON que recibe Flutter debe ser idéntico
+    expected = sanitize_legacy(df).to_dict(orient='records')
+    actual = data_bridge.sanitize(df).to_dict(orient='records')
+    if expected != actual:
+        print("❌ ERROR: sanitize() vectorizado no coincide con la versión original.")
+        return 1
+
+    legacy_min, legacy_avg = time_it(sanitize_legacy, df, repeat)
+    new_min, new_avg = time_it(data_bridge.sanitize, df, repeat)
+
+    print(f"📊 sanitize() sobre {rows} filas x {len(df.columns)} columnas ({repeat} repeticiones)")
+    print(f"   - Original  : min {legacy_min * 1000:8.1f} ms | prom {legacy_avg * 1000:8.1f} ms")
+    print(f"   - Vectorial : min {new_min * 1000:8.1f} ms | prom {new_avg * 1000:8.1f} ms")
+    print(f"   - Aceleración: x{legacy_min / new_min:.2f}")
+    print("✅ Paridad de salida verificada.")
+    return 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=50000, help='Filas del frame sintético')
+    parser.add_argument('--repeat', type=int, default=5, help='Repeticiones por versión')
+    args = parser.parse_args()
+    sys.exit(run_benchmark(args.rows, args.repeat))
@@ -66,11 +66,7 @@ def create_installer():
         shutil.copy2(diagnose_exe, os.path.join(dest_scripts_dir, "diagnose.exe"))
         print("   - diagnose.exe copiado a /scripts/.")
     
-    # C) Copiar debug_sql_log.txt si existe
-    log_src = "debug_sql_log.txt"
-    if os.path.exists(log_src):
-        shutil.copy(log_src, DEST_DIR)
-        print("   - debug_sql_log.txt copiado.")
+    # C) Los logs del bridge (bridge_log.jsonl*, slow_queries.log) son de cada instalación: no se distribuyen
 
     # 5. Manual y Dependencias Extra
     # Copy Manual.pdf if exists
@@ -0,0 +1,149 @@
+import os
+import sys
+import json
+import random
+import shutil
+import argparse
+import datetime
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import data_bridge
+
+# Paridad de fetch_records() / encode_records() / iter_query_records() (streaming) contra
+# read_sql + sanitize().to_dict('records') (v14.2)
+# Genera tablas SQLite al azar (tipos mezclados, nulos, fechas de distinta precisión,
+# saltos de línea y tabs) y compara el JSON que recibiría Flutter por cada consulta.
+# Uso: python scripts/check_records_parity.py --seeds 200 --rows 50
+
+TEXTS = ['SOPORTE LATERAL', 'ACERO ASTM A36 1/4"', 'HSS °B 4" x 3"', 'Ñandú', '', ' ', 'nan', 'None', '0', 'NULL']
+CONTROL = ['\r\n', '\n', '\t', '\r', '\t\t\n', '\n\n']
+
+def random_text(rng):
+    value = rng.choice(TEXTS)
+    if rng.random() < 0.3:
+        value += rng.choice(CONTROL) + rng.choice(TEXTS) # Celda pegada desde Excel
+    return value
+
+def random_datetime(rng, precision):
+    value = datetime.datetime(2020, 1, 1) + datetime.timedelta(days=rng.randint(0, 2000))
+    if precision == 'date':
+        return value
+    value = value.replace(hour=rng.randint(0, 23), minute=rng.randint(0, 59), second=rng.randint(0, 59))
+    if precision == 'ms':
+        value = value.replace(microsecond=rng.randint(0, 999) * 1000)
+    elif precision == 'us':
+        value = value.replace(microsecond=rng.randint(0, 999999))
+    return value
+
+def random_mixed(rng):
+    return rng.choice([rng.randint(-5, 5), rng.random() * 100, random_text(rng), rng.randint(0, 1)])
+
+# (nombre, tipo declarado, generador)
+COLUMNS = [
+    ('Entero', 'INTEGER', lambda rng: rng.randint(-10**6, 10**6)),
+    ('Real', 'REAL', lambda rng: round(rng.uniform(-1000, 1000), rng.randint(0, 4))),
+    ('Real_Entero', 'REAL', lambda rng: float(rng.randint(0, 100))),
+    ('Numero_Mixto', 'NUMERIC', lambda rng: rng.choice([rng.randint(0, 100), rng.random()])),
+    ('Bandera', 'INTEGER', lambda rng: rng.randint(0, 1)),
+    ('Texto', 'TEXT', random_text),
+    ('Fecha_Dia', 'TIMESTAMP', lambda rng: random_datetime(rng, 'date')),
+    ('Fecha_Seg', 'TIMESTAMP', lambda rng: random_datetime(rng, rng.choice(['date', 's']))),
+    ('Fecha_Fina', 'TIMESTAMP', lambda rng: random_datetime(rng, rng.choice(['date', 's', 'ms', 'us']))),
+    ('Mixta', '', random_mixed),
+    ('Vacia', 'TEXT', lambda rng: None),
+]
+
+def build_table(rng, rows):
+    """Tabla con una fracción de nulos distinta por columna (algunas sin nulos)."""
+    null_ratio = {name: rng.choice([0.0, 0.0, 0.1, 0.5, 0.95]) for name, _, _ in COLUMNS}
+    records = []
+    for i in range(rows):
+        record = {'Id': i}
+        for name, _, generator in COLUMNS:
+            record[name] = None if rng.random() < null_ratio[name] else generator(rng)
+        records.append(record)
+
+    columns = ', '.join(f'"{name}" {kind}'.strip() for name, kind, _ in COLUMNS)
+    with data_bridge.get_engine().begin() as conn:
+        conn.exec_driver_sql("DROP TABLE IF EXISTS Tbl_Paridad")
+        conn.exec_driver_sql(f"CREATE TABLE Tbl_Paridad (Id INTEGER PRIMARY KEY, {columns})")
+        if records:
+            names = ['Id'] + [name for name, _, _ in COLUMNS]
+            conn.execute(data_bridge.text(
+                f"INSERT INTO Tbl_Paridad ({', '.join(names)}) VALUES ({', '.join(':' + name for name in names)})"
+            ), records)
+
+def random_query(rng, rows):
+    """Subconjunto de columnas y de filas (1-50 filas es el caso de las lecturas puntuales)."""
+    names = [name for name, _, _ in COLUMNS]
+    selected = rng.sample(names, rng.randint(1, len(names)))
+    start = rng.randint(0, max(rows - 1, 0))
+    limit = rng.choice([1, 2, 5, 20, 50, rows or 1])
+    return f"SELECT Id, {', '.join(selected)} FROM Tbl_Paridad WHERE Id >= {start} ORDER BY Id LIMIT {limit}"
+
+def expected_records(query):
+    with data_bridge.get_engine().connect() as conn:
+        df = data_bridge.read_sql(data_bridge.text(query), conn)
+    return data_bridge.sanitize(df).to_dict(orient='records')
+
+def as_json(records):
+    # 1 y 1.0 son iguales para ==, pero no para Flutter
+    return json.dumps(records, default=str, ensure_ascii=False)
+
+def check_seed(seed, rows, queries):
+    rng = random.Random(seed)
+    build_table(rng, rng.randint(0, rows))
+    count = data_bridge.fetch_records("SELECT COUNT(*) AS n FROM Tbl_Paridad")[0]['n']
+    for _ in range(queries):
+        query = random_query(rng, count)
+        expected = expected_records(query)
+        actual = data_bridge.fetch_records(query)
+        if actual != expected or as_json(actual) != as_json(expected):
+            return query, expected, actual
+
+        # encode_records directo sobre las filas del cursor
+        with data_bridge.get_engine().connect() as conn:
+            result = conn.execute(data_bridge.text(query))
+            encoded = data_bridge.encode_records(list(result.keys()), result.fetchall())
+        if as_json(encoded) != as_json(expected):
+            return query, expected, encoded
+
+        # Streaming en lotes chicos: cada chunk con el formato de la columna completa
+        streamed = [record for chunk in data_bridge.iter_query_records(query, batch_size=rng.randint(1, 7)) for record in chunk]
+        if as_json(streamed) != as_json(expected):
+            return query, expected, streamed
+    return None
+
+def run_check(args):
+    temp_dir = tempfile.mkdtemp(prefix='records_parity_')
+    try:
+        data_bridge.use_backend('sqlite', os.path.join(temp_dir, 'paridad.sqlite'))
+        print(f"🧪 fetch_records / streaming vs read_sql + sanitize: {args.seeds} tablas al azar, {args.queries} consultas cada una")
+        for seed in range(args.seed, args.seed + args.seeds):
+            mismatch = check_seed(seed, args.rows, args.queries)
+            if mismatch:
+                query, expected, actual = mismatch
+                print(f"❌ ERROR: semilla {seed} no coincide\n   {query}")
+                for want, got in zip(expected, actual):
+                    if want != got or as_json([want]) != as_json([got]):
+                        print(f"   - sanitize     : {as_json([want])}\n   - fetch_records: {as_json([got])}")
+                        break
+                else:
+                    print(f"   - filas: sanitize {len(expected)} | fetch_records {len(actual)}")
+                return 1
+        data_bridge.get_engine().dispose()
+        print(f"📊 {args.seeds * args.queries} consultas comparadas")
+        print("✅ Paridad de salida verificada.")
+    finally:
+        data_bridge.get_engine().dispose()
+        shutil.rmtree(temp_dir, ignore_errors=True)
+    return 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--seeds', type=int, default=200, help='Tablas al azar a generar')
+    parser.add_argument('--queries', type=int, default=10, help='Consultas por tabla')
+    parser.add_argument('--rows', type=int, default=60, help='Máximo de filas por tabla')
+    parser.add_argument('--seed', type=int, default=0, help='Primera semilla')
+    sys.exit(run_check(parser.parse_args()))
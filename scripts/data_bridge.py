@@ -1,60 +1,119 @@
+import time
+_BRIDGE_START = time.perf_counter()
+
 import sys
 import io
 import json
 import os
-import pyodbc
-import pandas as pd
-from sqlalchemy import create_engine, text
 import urllib.parse
 import datetime
+import decimal
 import platform
 import base64
+import zlib
+import re
 import difflib
-import openpyxl
-from openpyxl.utils.cell import coordinate_from_string, column_index_from_string
-import time
+import csv
+import array
+import heapq
+import threading
+import functools
+import sqlite3
+import math
+import contextlib
+import queue
+import atexit
 
 PATH_MAP_FILE = "file_paths_map.json"
 
-def ensure_v13_1_schema():
-    engine = get_engine()
-    with engine.begin() as conn:
-        # 1. Tabla de Fuentes de Datos
-        conn.execute(text("""
-            IF NOT EXISTS (SELECT * FROM sysobjects WHERE name='Tbl_Fuentes_Datos' AND xtype='U')
-            BEGIN
-                CREATE TABLE Tbl_Fuentes_Datos (
-                    ID INT IDENTITY(1,1) PRIMARY KEY,
-                    Nombre_Logico NVARCHAR(255),
-                    Ruta_Actual NVARCHAR(MAX),
-                    Ultima_Sincronizacion DATETIME,
-                    Estado NVARCHAR(50) DEFAULT 'ACTIVO'
-                )
-            END
-        """))
-        
-        # 2. Columna Simetria en Maestro
-        try:
-            conn.execute(text("ALTER TABLE Tbl_Maestro_Piezas ADD Simetria NVARCHAR(100)"))
-        except:
-            pass # Ya existe
-            
-        # 3. Columnas de Auditoría Extendida
-        try:
-           conn.execute(text("ALTER TABLE Tbl_Auditoria_Conflictos ADD Simetria_Excel NVARCHAR(100)"))
-           conn.execute(text("ALTER TABLE Tbl_Auditoria_Conflictos ADD Proceso_Primario_Excel NVARCHAR(100)"))
-           conn.execute(text("ALTER TABLE Tbl_Auditoria_Conflictos ADD Tipo_Conflicto NVARCHAR(50)"))
-        except:
-            pass
+# --- IMPORTACIONES DIFERIDAS (v14.2) ---
+# pandas, SQLAlchemy, pyodbc y openpyxl tardan segundos en cargar (más aún desde
+# el data_bridge.exe de PyInstaller). Solo se importan cuando un comando los usa,
+# así get_config o find_blueprint responden sin pagar ese costo.
+# Los import explícitos dentro de cada loader permiten que PyInstaller los detecte.
+
+_IMPORT_TIMES = {}
+
+class _LazyModule:
+    """Proxy que importa el módulo real en el primer acceso a un atributo."""
+    def __init__(self, name, loader):
+        self._name = name
+        self._loader = loader
+        self._module = None
+
+    def _load(self):
+        if self._module is None:
+            start = time.perf_counter()
+            self._module = self._loader()
+            _IMPORT_TIMES[self._name] = round((time.perf_counter() - start) * 1000, 1)
+        return self._module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+def _import_numpy():
+    import numpy
+    return numpy
+
+def _import_pandas():
+    import pandas
+    return pandas
+
+def _import_sqlalchemy():
+    import sqlalchemy
+    return sqlalchemy
+
+def _import_pyodbc():
+    import pyodbc
+    return pyodbc
+
+def _import_openpyxl():
+    import openpyxl
+    return openpyxl
+
+# Orden de carga = orden de dependencia, para que cada tiempo sea incremental
+np = _LazyModule('numpy', _import_numpy)
+pd = _LazyModule('pandas', _import_pandas)
+sqlalchemy = _LazyModule('sqlalchemy', _import_sqlalchemy)
+pyodbc = _LazyModule('pyodbc', _import_pyodbc)
+openpyxl = _LazyModule('openpyxl', _import_openpyxl)
+_HEAVY_MODULES = [np, pd, sqlalchemy, pyodbc, openpyxl]
+
+def text(sql):
+    if get_dialect() == 'sqlite':
+        sql = translate_sql(sql)
+    return sqlalchemy.text(sql)
+
+def create_engine(url, **kwargs):
+    with measure_phase('engine'):
+        engine = sqlalchemy.create_engine(url, **kwargs)
+        instrument_engine(engine)
+    return engine
+
+def get_startup_profile(load_all=True):
+    """Tiempos de arranque: carga del bridge y de cada librería pesada (ms)."""
+    if load_all:
+        for module in _HEAVY_MODULES:
+            try:
+                module._load()
+            except Exception as e:
+                _IMPORT_TIMES[module._name] = f"ERROR: {e}"
+    return {
+        "status": "success",
+        "bridge_load_ms": _BRIDGE_LOAD_MS,
+        "uptime_ms": round((time.perf_counter() - _BRIDGE_START) * 1000, 1),
+        "imports_ms": dict(_IMPORT_TIMES),
+        "not_loaded": [m._name for m in _HEAVY_MODULES if m._name not in _IMPORT_TIMES],
+        "frozen": hasattr(sys, '_MEIPASS'),
+        "python": platform.python_version()
+    }
 
 def get_sources():
-    ensure_v13_1_schema()
-    engine = get_engine()
-    with engine.connect() as conn:
-        return sanitize(pd.read_sql("SELECT * FROM Tbl_Fuentes_Datos WHERE Estado = 'ACTIVO'", conn)).to_dict(orient='records')
+    ensure_schema()
+    return fetch_records("SELECT * FROM Tbl_Fuentes_Datos WHERE Estado = 'ACTIVO'")
 
 def add_source(name, path):
-    ensure_v13_1_schema()
+    ensure_schema()
     engine = get_engine()
     with engine.begin() as conn:
         conn.execute(text("INSERT INTO Tbl_Fuentes_Datos (Nombre_Logico, Ruta_Actual) VALUES (:n, :r)"), {"n": name, "r": path})
@@ -85,89 +144,117 @@ def scan_and_ingest(source_id):
     if not path or not os.path.exists(path):
         return {"status": "error", "message": f"Archivo no encontrado o ruta inválida: {path}"}
         
-    # 2. Leer Excel (Data Only)
+    # 2. Leer Excel -> comparar contra el maestro -> aplicar (una transacción)
     try:
-        wb = openpyxl.load_workbook(path, data_only=True)
-        ws = wb.active # Asumimos hoja activa o primera
-        
-        # Mapeo Columnas (0-based en iter_rows, pero Excel es 1-based)
-        # D=4, E=5, F=6, H=8, I=9, J-L=10-12
-        # openpyxl col idx: A=1, B=2 ... D=4
-        
-        new_count = 0
-        conflict_count = 0
-        
+        rows = read_ingest_rows(path)
         with engine.begin() as conn:
-            # Cache de códigos existentes para evitar miles de SELECTs
-            existing_codes = set(pd.read_sql("SELECT Codigo_Pieza FROM Tbl_Maestro_Piezas", conn)['Codigo_Pieza'].str.upper().tolist())
-            
-            for row in ws.iter_rows(min_row=6, values_only=True):
-                # row es tupla (0..N). Index 3 es Col D (Codigo).
-                if not row or len(row) < 5: continue
-                
-                code = str(row[3]).strip().upper() if row[3] else ""
-                if not code or code in ["NONE", "CODIGO", "CODE"]: continue
-                
-                # Extraer Data
-                desc = str(row[4]).strip() if len(row) > 4 and row[4] else ""
-                medida = str(row[5]).strip() if len(row) > 5 and row[5] else ""
-                simetria = str(row[7]).strip() if len(row) > 7 and row[7] else "" # Col H (Index 7)
-                proc_prim = str(row[8]).strip() if len(row) > 8 and row[8] else "" # Col I (Index 8)
-                
-                # Procesos Secundarios (Concat J, K, L)
-                procs = []
-                if len(row) > 9 and row[9]: procs.append(str(row[9]).strip())
-                if len(row) > 10 and row[10]: procs.append(str(row[10]).strip())
-                if len(row) > 11 and row[11]: procs.append(str(row[11]).strip())
-                
-                p1 = procs[0] if len(procs) > 0 else ""
-                p2 = procs[1] if len(procs) > 1 else ""
-                p3 = procs[2] if len(procs) > 2 else ""
-                
-                # CASO 1: NO EXISTE -> INSERTAR
-                if code not in existing_codes:
-                    conn.execute(text("""
-                        INSERT INTO Tbl_Maestro_Piezas 
-                        (Codigo_Pieza, Descripcion, Medida, Simetria, Proceso_Primario, Proceso_1, Proceso_2, Proceso_3, Ultima_Actualizacion)
-                        VALUES (:c, :d, :m, :s, :p0, :p1, :p2, :p3, GETDATE())
-                    """), {
-                        'c': code, 'd': desc, 'm': medida, 's': simetria,
-                        'p0': proc_prim, 'p1': p1, 'p2': p2, 'p3': p3
-                    })
-                    existing_codes.add(code)
-                    new_count += 1
-                else:
-                    # CASO 2: YA EXISTE -> COMPARAR (Simplificado a Descripción para MVP, extendible)
-                    # En v13.1 DATA MANAGER se pide auditar MULTIPLES columnas.
-                    # Hacemos una validación rápida. Si difiere, lanzamos a conflicto.
-                    
-                    # Traer data actual (Optimizacion: Podriamos cachear todo, pero memoria...)
-                    curr = conn.execute(text("SELECT Descripcion FROM Tbl_Maestro_Piezas WHERE Codigo_Pieza = :c"), {'c': code}).fetchone()
-                    curr_desc = curr[0] if curr else ""
-                    
-                    if curr_desc != desc:
-                        # Registrar Conflicto
-                        # Upsert en Auditoria
-                        conn.execute(text("""
-                            MERGE Tbl_Auditoria_Conflictos AS target
-                            USING (SELECT :code AS Codigo) AS source
-                            ON (target.Codigo_Pieza = source.Codigo AND target.Estado = 'PENDIENTE')
-                            WHEN MATCHED THEN
-                                UPDATE SET Desc_Excel = :desc, Fecha_Deteccion = GETDATE()
-                            WHEN NOT MATCHED THEN
-                                INSERT (Codigo_Pieza, Desc_Excel, Desc_Master, Estado, Fecha_Deteccion, Tipo_Conflicto)
-                                VALUES (:code, :desc, :master, 'PENDIENTE', GETDATE(), 'DATOS_DIFERENTES');
-                        """), {'code': code, 'desc': desc, 'master': curr_desc})
-                        conflict_count += 1
-
-            # Actualizar timestamp fuente
-            conn.execute(text("UPDATE Tbl_Fuentes_Datos SET Ultima_Sincronizacion = GETDATE() WHERE ID = :id"), {'id': source_id})
-            
+            plan = diff_ingest_rows(conn, rows)
+            apply_ingest_plan(conn, plan, source_id)
+            # Altas y conflictos cuya Desc_Excel se actualizó
+            maintain_conflict_summary(conn, codes=[row['c'] for row in plan['inserts']] + [row['code'] for row in plan['conflicts']])
+
+        new_count = len(plan['inserts'])
+        conflict_count = len(plan['conflicts'])
+        if new_count:
+            invalidate_search_index()
         return {"status": "success", "new_items": new_count, "conflicts": conflict_count}
         
     except Exception as e:
         return {"status": "error", "message": str(e)}
 
+# --- INGESTA POR FASES (v14.2) ---
+# scan_and_ingest = lectura -> diff -> aplicación. Separadas para poder medir cada
+# fase (scripts/bench_ingest.py). El diff usa un solo SELECT del maestro en vez de
+# uno por fila existente.
+
+INGEST_FIRST_ROW = 6 # Encabezados en la fila 4, datos desde la 6
+
+def _cell_text(row, index):
+    return str(row[index]).strip() if len(row) > index and row[index] else ""
+
+def read_ingest_rows(path):
+    """Fase 1: filas de la hoja activa. Columnas D=código, E=descripción, F=medida, H=simetría, I-L=procesos."""
+    # read_only: lectura en streaming (las celdas combinadas no superiores vienen vacías, igual que en modo normal)
+    wb = openpyxl.load_workbook(path, data_only=True, read_only=True)
+    try:
+        ws = wb.active # Asumimos hoja activa o primera
+        rows = []
+        for row in ws.iter_rows(min_row=INGEST_FIRST_ROW, values_only=True):
+            # row es tupla (0..N). Index 3 es Col D (Codigo).
+            if not row or len(row) < 5: continue
+
+            code = str(row[3]).strip().upper() if row[3] else ""
+            if not code or code in ["NONE", "CODIGO", "CODE"]: continue
+
+            # Procesos Secundarios (J, K, L compactados en orden)
+            procs = [str(row[i]).strip() for i in (9, 10, 11) if len(row) > i and row[i]]
+            rows.append({
+                'c': code,
+                'd': _cell_text(row, 4),
+                'm': _cell_text(row, 5),
+                's': _cell_text(row, 7), # Col H (Index 7)
+                'p0': _cell_text(row, 8), # Col I (Index 8)
+                'p1': procs[0] if len(procs) > 0 else "",
+                'p2': procs[1] if len(procs) > 1 else "",
+                'p3': procs[2] if len(procs) > 2 else ""
+            })
+        return rows
+    finally:
+        wb.close()
+
+def diff_ingest_rows(conn, rows):
+    """Fase 2: códigos nuevos -> inserts; existentes con otra descripción -> conflictos."""
+    current = {}
+    for code, desc in conn.execute(text("SELECT Codigo_Pieza, Descripcion FROM Tbl_Maestro_Piezas")):
+        if code is not None:
+            current[code.upper()] = desc
+
+    inserts, conflicts = [], []
+    for row in rows:
+        code = row['c']
+        if code not in current:
+            inserts.append(row)
+            current[code] = row['d'] # Repetido más abajo en el archivo: se compara contra esta alta
+        elif current[code] != row['d']:
+            conflicts.append({'code': code, 'desc': row['d'], 'master': current[code]})
+    return {"inserts": inserts, "conflicts": conflicts}
+
+def apply_ingest_plan(conn, plan, source_id=None):
+    """Fase 3: inserts y upsert de conflictos pendientes (mismo MERGE de siempre, en lote)."""
+    if plan['inserts']:
+        conn.execute(text("""
+            INSERT INTO Tbl_Maestro_Piezas 
+            (Codigo_Pieza, Descripcion, Medida, Simetria, Proceso_Primario, Proceso_1, Proceso_2, Proceso_3, Ultima_Actualizacion)
+            VALUES (:c, :d, :m, :s, :p0, :p1, :p2, :p3, GETDATE())
+        """), plan['inserts'])
+
+    if plan['conflicts']:
+        conn.execute(dialect_text(
+            mssql="""
+            MERGE Tbl_Auditoria_Conflictos AS target
+            USING (SELECT :code AS Codigo) AS source
+            ON (target.Codigo_Pieza = source.Codigo AND target.Estado = 'PENDIENTE')
+            WHEN MATCHED THEN
+                UPDATE SET Desc_Excel = :desc, Fecha_Deteccion = GETDATE()
+            WHEN NOT MATCHED THEN
+                INSERT (Codigo_Pieza, Desc_Excel, Desc_Master, Estado, Fecha_Deteccion, Tipo_Conflicto)
+                VALUES (:code, :desc, :master, 'PENDIENTE', GETDATE(), 'DATOS_DIFERENTES');
+            """,
+            sqlite="""
+            INSERT INTO Tbl_Auditoria_Conflictos (Codigo_Pieza, Desc_Excel, Desc_Master, Estado, Fecha_Deteccion, Tipo_Conflicto)
+            SELECT :code, :desc, :master, 'PENDIENTE', GETDATE(), 'DATOS_DIFERENTES'
+            WHERE NOT EXISTS (SELECT 1 FROM Tbl_Auditoria_Conflictos WHERE Codigo_Pieza = :code AND Estado = 'PENDIENTE')
+            """
+        ), plan['conflicts'])
+        if get_dialect() == 'sqlite':
+            # Rama WHEN MATCHED del MERGE (el último valor del archivo gana)
+            conn.execute(text("UPDATE Tbl_Auditoria_Conflictos SET Desc_Excel = :desc, Fecha_Deteccion = GETDATE() WHERE Codigo_Pieza = :code AND Estado = 'PENDIENTE'"),
+                         plan['conflicts'])
+
+    if source_id is not None:
+        # Actualizar timestamp fuente
+        conn.execute(text("UPDATE Tbl_Fuentes_Datos SET Ultima_Sincronizacion = GETDATE() WHERE ID = :id"), {'id': source_id})
+
 
 # FORZAR SALIDA UTF-8 (Vital para comunicación con Flutter)
 sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
@@ -188,8 +275,16 @@ def get_base_path():
         return os.path.dirname(sys.executable)
     return os.path.dirname(os.path.abspath(__file__))
 
+_BEST_DRIVER = None
+
 def get_best_driver():
-    """Selecciona el mejor driver ODBC disponible en el sistema."""
+    """Selecciona el mejor driver ODBC disponible (se resuelve una sola vez por proceso)."""
+    global _BEST_DRIVER
+    if _BEST_DRIVER is None:
+        _BEST_DRIVER = _find_best_driver()
+    return _BEST_DRIVER
+
+def _find_best_driver():
     try:
         drivers = pyodbc.drivers()
         # Lista de prioridad según recomendación de Microsoft y compatibilidad
@@ -211,6 +306,8 @@ def get_best_driver():
         return 'ODBC Driver 17 for SQL Server'
 
 def get_connection_string():
+    if get_dialect() == 'sqlite':
+        return f"sqlite:///{get_sqlite_path()}"
     config = load_config()
     server = config.get('server', '192.168.1.73,1433')
     database = config.get('database', 'DB_Materiales_Industrial')
@@ -249,7 +346,12 @@ def save_sys_config(payload):
         current = load_config()
         
         # Merge safe keys
-        valid_keys = ['server', 'database', 'user', 'password', 'blueprints_path', 'generics_path', 'trusted_connection']
+        valid_keys = ['server', 'database', 'user', 'password', 'blueprints_path', 'generics_path', 'trusted_connection',
+                      'read_replica', 'replica_path', 'replica_refresh_seconds', 'replica_max_staleness_seconds',
+                      'query_trace', 'slow_query_ms', 'slow_query_log',
+                      'log_level', 'log_file', 'log_max_bytes', 'log_backups',
+                      'warm_start', 'keepalive_seconds', 'change_watch', 'change_watch_seconds', 'change_coalesce_seconds',
+                      'catalog_store']
         for k, v in payload.items():
             if k in valid_keys:
                 current[k] = v
@@ -271,24 +373,765 @@ def save_sys_config(payload):
     except Exception as e:
         return {"status": "error", "message": f"Error guardando config: {str(e)}"}
 
+# Un engine (y su pool) por cadena de conexión: el listener reutiliza las conexiones
+# abiertas en el arranque en caliente. pool_pre_ping descarta las que la red cortó.
+_ENGINES = {}
+_ENGINES_LOCK = threading.Lock()
+
+def _get_cached_engine(bulk=False):
+    url = get_connection_string()
+    with _ENGINES_LOCK:
+        engine = _ENGINES.get((url, bulk))
+        if engine is None:
+            for key in [key for key in _ENGINES if key[0] != url]:
+                _ENGINES.pop(key).dispose() # Cambió la configuración (save_config)
+            kwargs = {'pool_pre_ping': True}
+            if bulk:
+                kwargs['fast_executemany'] = True
+            engine = _ENGINES[(url, bulk)] = create_engine(url, **kwargs)
+    return engine
+
 def get_engine():
-    return create_engine(get_connection_string())
+    pinned = get_pinned_engine() # Dentro de un pipeline transaccional: su conexión
+    if pinned is not None:
+        return pinned
+    if get_dialect() == 'sqlite':
+        return get_sqlite_engine()
+    return _get_cached_engine()
+
+def get_bulk_engine():
+    """Engine para cargas masivas: pyodbc envía los parámetros como arreglo (fast_executemany)."""
+    pinned = get_pinned_engine()
+    if pinned is not None:
+        return pinned
+    if get_dialect() == 'sqlite':
+        return get_sqlite_engine()
+    return _get_cached_engine(bulk=True)
+
+# --- DIALECTO SQL: SQL SERVER / SQLITE DE PRUEBAS (v14.2) ---
+# El bridge está escrito en T-SQL. Con "backend": "sqlite" en config.json (o
+# use_backend() desde las herramientas de benchmark) corre contra un archivo SQLite
+# con el mismo esquema: text() traduce las construcciones T-SQL que usa el bridge y
+# los MERGE tienen su variante explícita (dialect_text). Producción no cambia.
+
+DIALECTS = ('mssql', 'sqlite')
+STANDIN_FILE = "DB_Materiales_Industrial.sqlite"
+
+_DIALECT = None
+_SQLITE_PATH = None
+_SQLITE_ENGINE = None
+
+def get_dialect():
+    global _DIALECT
+    if _DIALECT is None:
+        backend = load_config().get('backend', 'mssql')
+        _DIALECT = backend if backend in DIALECTS else 'mssql'
+    return _DIALECT
+
+def get_sqlite_path():
+    global _SQLITE_PATH
+    if _SQLITE_PATH is None:
+        _SQLITE_PATH = load_config().get('sqlite_path') or os.path.join(get_base_path(), STANDIN_FILE)
+    return _SQLITE_PATH
+
+def use_backend(dialect, sqlite_path=None):
+    """Cambia el backend del proceso (herramientas de benchmark y pruebas)."""
+    global _DIALECT, _SQLITE_PATH, _SQLITE_ENGINE, _SCHEMA_CURRENT
+    if dialect not in DIALECTS:
+        raise ValueError(f"Backend desconocido: {dialect}. Use {', '.join(DIALECTS)}.")
+    if _SQLITE_ENGINE is not None:
+        _SQLITE_ENGINE.dispose()
+    _DIALECT = dialect
+    _SQLITE_PATH = sqlite_path
+    _SQLITE_ENGINE = None
+    _SCHEMA_CURRENT = False
+
+class _ChecksumAgg:
+    """CHECKSUM_AGG de SQL Server: XOR de los valores del grupo."""
+    def __init__(self):
+        self.value = 0
+    def step(self, value):
+        if value is not None:
+            self.value ^= value
+    def finalize(self):
+        return self.value
+
+def _sqlite_checksum(value):
+    return None if value is None else zlib.crc32(str(value).upper().encode('utf-8')) - 2**31
+
+def _sqlite_binary_checksum(*values):
+    """BINARY_CHECKSUM de SQL Server: sensible a mayúsculas, sobre varias columnas."""
+    joined = '\x1f'.join('\x00' if value is None else str(value) for value in values)
+    return zlib.crc32(joined.encode('utf-8')) - 2**31
+
+def _on_sqlite_connect(dbapi_connection, connection_record):
+    # pysqlite abre transacciones por su cuenta y rompe los SAVEPOINT (begin_nested):
+    # se desactiva y SQLAlchemy emite BEGIN explícito
+    dbapi_connection.isolation_level = None
+    dbapi_connection.create_function('CHECKSUM', 1, _sqlite_checksum, deterministic=True)
+    dbapi_connection.create_function('BINARY_CHECKSUM', -1, _sqlite_binary_checksum, deterministic=True)
+    dbapi_connection.create_aggregate('CHECKSUM_AGG', 1, _ChecksumAgg)
+    dbapi_connection.execute("PRAGMA journal_mode=WAL")
+
+def get_sqlite_engine():
+    global _SQLITE_ENGINE
+    if _SQLITE_ENGINE is None:
+        # Columnas TIMESTAMP <-> datetime, como devuelve pyodbc las DATETIME
+        sqlite3.register_adapter(datetime.datetime, lambda value: value.isoformat(sep=' '))
+        sqlite3.register_converter('TIMESTAMP', lambda value: datetime.datetime.fromisoformat(value.decode('utf-8')))
+        engine = create_engine(get_connection_string(), connect_args={'detect_types': sqlite3.PARSE_DECLTYPES})
+        sqlalchemy.event.listen(engine, 'connect', _on_sqlite_connect)
+        sqlalchemy.event.listen(engine, 'begin', lambda conn: conn.exec_driver_sql('BEGIN'))
+        _SQLITE_ENGINE = engine
+    return _SQLITE_ENGINE
+
+_NET_DATE_TOKENS = [('yyyy', '%Y'), ('MM', '%m'), ('dd', '%d'), ('HH', '%H'), ('mm', '%M'), ('ss', '%S')]
+
+def _net_format_to_strftime(pattern):
+    for token, directive in _NET_DATE_TOKENS:
+        pattern = pattern.replace(token, directive)
+    return pattern
+
+_TSQL_REWRITES = [
+    # Creación condicional de tablas (migraciones)
+    (re.compile(r"IF NOT EXISTS \(SELECT \* FROM sysobjects WHERE name='(\w+)' AND xtype='U'\)\s*BEGIN\s*CREATE TABLE \1(.*)\bEND\s*$", re.I | re.S),
+     r"CREATE TABLE IF NOT EXISTS \1\2"),
+    (re.compile(r"\bINT IDENTITY\(1,\s*1\) PRIMARY KEY", re.I), "INTEGER PRIMARY KEY AUTOINCREMENT"),
+    (re.compile(r"\bNVARCHAR\(MAX\)", re.I), "TEXT"),
+    # Funciones
+    (re.compile(r"\bGETDATE\(\)", re.I), "datetime('now', 'localtime')"),
+    (re.compile(r"\bISNULL\(", re.I), "IFNULL("),
+    (re.compile(r"\bFORMAT\(([^,()]+),\s*'([^']*)'\)", re.I),
+     lambda m: f"strftime('{_net_format_to_strftime(m.group(2))}', {m.group(1)})"),
+    (re.compile(r"\bDATEADD\((\w+),\s*(-?\d+),\s*CAST\(([^()]+?) AS DATE\)\)", re.I),
+     lambda m: f"date({m.group(3)}, '{int(m.group(2)):+d} {m.group(1).lower()}')"),
+    # Tablas temporales
+    (re.compile(r"\bCREATE TABLE #(\w+)", re.I), r"CREATE TEMP TABLE \1"),
+    (re.compile(r"\bDROP TABLE #(\w+)", re.I), r"DROP TABLE temp.\1"),
+    # Solo en posición de tabla: un '#' dentro de un literal ('TORNILLO #10') queda igual
+    (re.compile(r"\b(INTO|FROM|JOIN|USING|UPDATE)(\s+)#(\w+)", re.I), r"\1\2\3"),
+    # UPDATE alias SET ... FROM Tabla alias JOIN Otra o ON ... [WHERE ...]
+    #   ->  UPDATE Tabla AS alias SET ... FROM Otra AS o WHERE <on> [AND (<where>)]
+    (re.compile(r"UPDATE (\w+) SET (.+?)\s+FROM (\w+) \1\s+JOIN (\w+) (\w+) ON (.+?)(?:\s+WHERE\s+(.+?))?\s*$", re.I | re.S),
+     lambda m: f"UPDATE {m.group(3)} AS {m.group(1)} SET {m.group(2)} FROM {m.group(4)} AS {m.group(5)} WHERE {m.group(6)}"
+               + (f" AND ({m.group(7)})" if m.group(7) else "")),
+]
+_TSQL_TOP = re.compile(r"\bSELECT\s+TOP\s*\(?\s*(:\w+|\d+)\s*\)?", re.I)
+
+@functools.lru_cache(maxsize=512)
+def translate_sql(sql):
+    """T-SQL del bridge -> SQLite. Solo cubre las construcciones que el bridge usa."""
+    for pattern, replacement in _TSQL_REWRITES:
+        sql = pattern.sub(replacement, sql)
+    top = _TSQL_TOP.search(sql)
+    if top:
+        # SELECT TOP n ... -> SELECT ... LIMIT n (sentencias con un solo SELECT)
+        sql = sql[:top.start()] + 'SELECT ' + sql[top.end():].lstrip()
+        sql = sql.rstrip().rstrip(';') + f" LIMIT {top.group(1)}"
+    return sql
+
+def dialect_text(mssql, sqlite):
+    """Para sentencias sin traducción mecánica (MERGE)."""
+    return text(sqlite if get_dialect() == 'sqlite' else mssql)
+
+# Esquema base del sustituto SQLite. En producción estas tablas y la vista ya existen
+# (las crea el DBA); las migraciones de SCHEMA_MIGRATIONS agregan el resto.
+# Textos COLLATE NOCASE = intercalación CI de SQL Server.
+STANDIN_SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS Tbl_Maestro_Piezas (
+        ID INTEGER PRIMARY KEY AUTOINCREMENT,
+        Codigo_Pieza TEXT COLLATE NOCASE NOT NULL UNIQUE,
+        Descripcion TEXT COLLATE NOCASE,
+        Material TEXT COLLATE NOCASE,
+        Medida TEXT COLLATE NOCASE,
+        Proceso_Primario TEXT COLLATE NOCASE,
+        Proceso_1 TEXT COLLATE NOCASE,
+        Proceso_2 TEXT COLLATE NOCASE,
+        Proceso_3 TEXT COLLATE NOCASE,
+        Ultima_Actualizacion TIMESTAMP
+    )""",
+    """CREATE TABLE IF NOT EXISTS Tbl_Historial_Proyectos (
+        Id INTEGER PRIMARY KEY AUTOINCREMENT,
+        Codigo_Pieza TEXT COLLATE NOCASE,
+        Descripcion_Excel TEXT COLLATE NOCASE,
+        Nombre_Archivo TEXT,
+        Nombre_Hoja TEXT,
+        Numero_Fila_Excel INTEGER,
+        Requiere_Correccion INTEGER DEFAULT 0,
+        Estado_Resolucion TEXT,
+        Fecha_Registro TIMESTAMP
+    )""",
+    "CREATE INDEX IF NOT EXISTS IX_Historial_Proyectos_Codigo ON Tbl_Historial_Proyectos (Codigo_Pieza)",
+    """CREATE TABLE IF NOT EXISTS Tbl_Historial_Resoluciones (
+        ID INTEGER PRIMARY KEY AUTOINCREMENT,
+        Codigo_Pieza TEXT COLLATE NOCASE,
+        Descripcion_Final TEXT COLLATE NOCASE,
+        Estado_Resolucion TEXT,
+        Fecha_Resolucion TIMESTAMP,
+        Usuario TEXT
+    )""",
+    "CREATE INDEX IF NOT EXISTS IX_Historial_Resoluciones_Codigo ON Tbl_Historial_Resoluciones (Codigo_Pieza, Fecha_Resolucion)",
+    """CREATE TABLE IF NOT EXISTS Tbl_Auditoria_Conflictos (
+        ID INTEGER PRIMARY KEY AUTOINCREMENT,
+        Codigo_Pieza TEXT COLLATE NOCASE,
+        Desc_Excel TEXT COLLATE NOCASE,
+        Desc_Master TEXT COLLATE NOCASE,
+        Estado TEXT,
+        Fecha_Deteccion TIMESTAMP
+    )""",
+    """CREATE VIEW IF NOT EXISTS V_Auditoria_Conflictos AS
+        SELECT hp.Id AS Id, hp.Codigo_Pieza, hp.Descripcion_Excel AS Desc_Excel, m.Descripcion AS Desc_Master,
+               hp.Nombre_Archivo, hp.Nombre_Hoja, hp.Numero_Fila_Excel
+        FROM Tbl_Historial_Proyectos hp
+        LEFT JOIN Tbl_Maestro_Piezas m ON m.Codigo_Pieza = hp.Codigo_Pieza
+        WHERE hp.Requiere_Correccion = 1""",
+]
+
+def create_standin_schema():
+    """Crea el esquema completo en el SQLite de pruebas (base + migraciones versionadas)."""
+    if get_dialect() != 'sqlite':
+        raise RuntimeError("create_standin_schema solo aplica con backend sqlite")
+    with get_engine().begin() as conn:
+        for statement in STANDIN_SCHEMA:
+            conn.exec_driver_sql(statement)
+    ensure_schema()
+
+def _has_control_chars(values):
+    # Un solo join en C es mucho más barato que un regex por celda
+    joined = '\x00'.join(values)
+    return '\r' in joined or '\n' in joined or '\t' in joined
 
 def sanitize(df):
     # 1. Reemplazar NaN/None con cadena VACÍA "" (Para que Flutter muestre celda vacía, no "null")
-    df = df.fillna("")
+    # Solo en las columnas que realmente tienen nulos (evita copiar todo el frame)
+    null_cols = df.columns[df.isna().any().to_numpy()]
+    if len(null_cols):
+        df = df.fillna({col: "" for col in null_cols})
+    else:
+        df = df.copy(deep=False)
     
     # 2. Limpieza de Strings (Evitar crash de JSON por caracteres de Excel)
-    # Convertir columnas de texto a string y limpiar saltos de línea/tabs que rompen JSON
+    # Convertir columnas de texto a string y limpiar saltos de línea/tabs que rompen JSON,
+    # pero solo donde de verdad hay caracteres de control
     for col in df.select_dtypes(include=['object']):
-        df[col] = df[col].astype(str).str.replace(r'[\r\n\t]+', ' ', regex=True)
+        series = df[col]
+        if pd.api.types.infer_dtype(series, skipna=False) != 'string':
+            series = series.astype(str)
+            df[col] = series
+        if _has_control_chars(series.to_numpy()):
+            df[col] = series.str.replace(r'[\r\n\t]+', ' ', regex=True)
         
-    # 3. Fechas a string
+    # 3. Fechas a string (una sola conversión vectorizada por columna)
     for col in df.select_dtypes(include=['datetime', 'datetimetz']).columns:
-        df[col] = df[col].astype(str).replace('NaT', "")
+        df[col] = _format_datetime_column(df[col])
         
     return df
 
+_NS_PER_DAY = 86400 * 10**9
+
+def _format_datetime_column(series):
+    """Mismo texto que astype(str) de pandas (precisión uniforme), pero formateado en numpy."""
+    if series.dt.tz is not None:
+        return series.astype(str).replace('NaT', "")
+
+    values = series.to_numpy(dtype='datetime64[ns]')
+    nat_mask = np.isnat(values)
+    ticks = values.view('i8')[~nat_mask]
+
+    if (ticks % _NS_PER_DAY == 0).all():
+        unit = 'D'
+    elif (ticks % 1000).any():
+        unit = 'ns'
+    elif (ticks % 10**6).any():
+        unit = 'us'
+    elif (ticks % 10**9).any():
+        unit = 'ms'
+    else:
+        unit = 's'
+
+    formatted = np.char.replace(np.datetime_as_string(values, unit=unit), 'T', ' ').astype(object)
+    formatted[nat_mask] = ""
+    return pd.Series(formatted, index=series.index, name=series.name)
+
+def read_sql(query, conn, **kwargs):
+    """pd.read_sql medido como fase 'pandas' (la ejecución del cursor cuenta aparte como 'query')."""
+    with measure_phase('pandas'):
+        return pd.read_sql(query, conn, **kwargs)
+
+def to_records(df):
+    """sanitize + to_dict: la lista de registros que recibe Flutter."""
+    with measure_phase('sanitize'):
+        return sanitize(df).to_dict(orient='records')
+
+# --- LECTURAS PUNTUALES SIN PANDAS (v14.2) ---
+# Para consultas chicas (1-50 filas) el costo de read_sql + sanitize + to_dict
+# domina sobre la consulta. Aquí se lee directo del cursor y se aplica, por
+# columna, exactamente la misma regla que produce sanitize() sobre ese resultado.
+
+_CONTROL_CHARS_RE = re.compile(r'[\r\n\t]+')
+
+def _clean_text(value):
+    if '\r' in value or '\n' in value or '\t' in value:
+        return _CONTROL_CHARS_RE.sub(' ', value)
+    return value
+
+def _datetime_format(has_time, has_ms, has_us):
+    # Igual que pandas: precisión uniforme para toda la columna
+    if not has_time:
+        return lambda v: v.strftime('%Y-%m-%d')
+    if has_us:
+        return lambda v: v.strftime('%Y-%m-%d %H:%M:%S.%f')
+    if has_ms:
+        return lambda v: v.strftime('%Y-%m-%d %H:%M:%S.') + '%03d' % (v.microsecond // 1000)
+    return lambda v: v.strftime('%Y-%m-%d %H:%M:%S')
+
+def _datetime_column_format(present):
+    return _datetime_format(any(v.hour or v.minute or v.second or v.microsecond for v in present),
+                            any(v.microsecond for v in present),
+                            any(v.microsecond % 1000 for v in present))
+
+def _is_datetime_kinds(kinds):
+    return bool(kinds) and all(issubclass(kind, datetime.datetime) for kind in kinds)
+
+def _compile_column_encoder(values):
+    """Devuelve el codificador de una columna según los tipos presentes (reglas de sanitize)."""
+    present = [v for v in values if v is not None]
+    kinds = {type(v) for v in present}
+    fmt = _datetime_column_format(present) if _is_datetime_kinds(kinds) else None
+    return _column_encoder(kinds, len(present) < len(values), fmt)
+
+def _column_encoder(kinds, has_null, datetime_format=None):
+    """Codificador para una columna con esos tipos no nulos; datetime_format si son fechas."""
+    if not kinds:
+        return lambda v: ""
+
+    if kinds == {str}:
+        return lambda v: "" if v is None else _clean_text(v)
+
+    if kinds <= {int, float, decimal.Decimal}:
+        # Columna numérica: con nulos pandas la promueve a float y sanitize la vuelve texto
+        if has_null:
+            return lambda v: "" if v is None else str(float(v))
+        if kinds == {int}:
+            return lambda v: v
+        return float
+
+    if kinds == {bool} and not has_null:
+        return lambda v: v
+
+    if datetime_format is not None:
+        return lambda v: "" if v is None else datetime_format(v)
+
+    return lambda v: "" if v is None else _clean_text(str(v))
+
+def encode_records(columns, rows):
+    """Convierte filas del cursor a registros con la misma forma que sanitize(df).to_dict('records')."""
+    if not rows:
+        return []
+    with measure_phase('sanitize'):
+        encoded = []
+        for i in range(len(columns)):
+            values = [row[i] for row in rows]
+            encoder = _compile_column_encoder(values)
+            encoded.append([encoder(v) for v in values])
+        return [dict(zip(columns, values)) for values in zip(*encoded)]
+
+def fetch_records(query, params=None):
+    """Ejecuta una lectura puntual sin pasar por pandas."""
+    if isinstance(query, str):
+        query = text(query)
+    engine = get_engine()
+    with engine.connect() as conn:
+        result = conn.execute(query, params or {})
+        columns = list(result.keys())
+        rows = result.fetchall()
+    return encode_records(columns, rows)
+
+# --- RÉPLICA LOCAL DE LECTURA (v14.2) ---
+# Copia SQLite de Tbl_Maestro_Piezas, Tbl_Estandares_Materiales y Tbl_Resumen_Conflictos
+# junto al ejecutable. Opcional (config.json: "read_replica": true).
+# - Las lecturas se sirven desde disco local mientras la copia esté fresca.
+# - Si SQL Server no responde, se sirve la copia aunque esté vieja (modo solo lectura)
+#   y durante REPLICA_PRIMARY_RETRY_SECONDS no se vuelve a esperar el LoginTimeout.
+# - Las escrituras siempre van al servidor y dejan la copia "pendiente" hasta refrescar.
+# - Cada respuesta de una lectura replicable dice de dónde salió: "source" ("replica" o
+#   "server") y "replica_age_seconds". Las respuestas que son listas solo se envuelven
+#   ({"status", "data", "source", ...}) si el request trae "read_source": true.
+
+REPLICA_FILE = "replica_lectura.sqlite"
+REPLICA_REFRESH_SECONDS = 60
+REPLICA_MAX_STALENESS_SECONDS = 300
+REPLICA_PRIMARY_RETRY_SECONDS = 30
+REPLICA_CHUNK = 500 # Parámetros por sentencia (SQLite admite 999)
+
+REPLICA_TABLES = ['Tbl_Maestro_Piezas', 'Tbl_Estandares_Materiales', 'Tbl_Resumen_Conflictos']
+REPLICA_INDEXES = {'Tbl_Maestro_Piezas': 'Codigo_Pieza', 'Tbl_Resumen_Conflictos': 'Codigo_Pieza'}
+
+# Comandos que escriben en el servidor
+REPLICA_WRITE_COMMANDS = {
+    'update', 'insert', 'delete', 'batch_apply', 'resolve_conflicts_bulk', 'mark_corrected', 'mark_solved',
+    'add_standard', 'import_standards', 'edit_standard', 'delete_standard', 'save_correction', 'scan_source',
+    'rebuild_conflict_summary'
+}
+
+_REPLICA_SETTINGS = None
+_REPLICA_WAKE = threading.Event()
+_REPLICA_REFRESH_LOCK = threading.Lock()
+_REPLICA_LAST_READ = None # Solo diagnóstico (replica_status); cada respuesta trae su propio origen
+
+def get_replica_settings():
+    global _REPLICA_SETTINGS
+    if _REPLICA_SETTINGS is None:
+        config = load_config()
+        _REPLICA_SETTINGS = {
+            "enabled": bool(config.get('read_replica', False)),
+            "path": config.get('replica_path') or os.path.join(get_base_path(), REPLICA_FILE),
+            "refresh_seconds": float(config.get('replica_refresh_seconds', REPLICA_REFRESH_SECONDS)),
+            "max_staleness_seconds": float(config.get('replica_max_staleness_seconds', REPLICA_MAX_STALENESS_SECONDS))
+        }
+    return _REPLICA_SETTINGS
+
+def _replica_connect():
+    # Autocommit: las transacciones se abren explícitamente con BEGIN IMMEDIATE
+    conn = sqlite3.connect(get_replica_settings()['path'], timeout=10, isolation_level=None, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL") # Lectores no se bloquean mientras se refresca
+    conn.execute("CREATE TABLE IF NOT EXISTS _Replica_Meta (Clave TEXT PRIMARY KEY, Valor TEXT)")
+    return conn
+
+def _replica_get(rconn, key, default=None):
+    row = rconn.execute("SELECT Valor FROM _Replica_Meta WHERE Clave = ?", (key,)).fetchone()
+    return json.loads(row[0]) if row else default
+
+def _replica_set(rconn, key, value):
+    rconn.execute("INSERT OR REPLACE INTO _Replica_Meta (Clave, Valor) VALUES (?, ?)", (key, json.dumps(value, default=str)))
+
+def _quote_identifier(name):
+    return '"' + str(name).replace('"', '""') + '"'
+
+def _replica_value(value):
+    """Valor de SQL Server -> valor SQLite (read_sql convierte Decimal a float: igual aquí)."""
+    if isinstance(value, datetime.datetime):
+        return value.isoformat(sep=' ')
+    if isinstance(value, datetime.date):
+        return value.isoformat()
+    if isinstance(value, decimal.Decimal):
+        return float(value)
+    if isinstance(value, bool):
+        return int(value)
+    return value
+
+def _replica_column_kinds(columns, rows, kinds=None):
+    """Columnas fecha/booleanas, para restaurar los tipos de pandas al leer la copia."""
+    kinds = kinds or {"dates": [], "bools": []}
+    for position, column in enumerate(columns):
+        sample = next((row[position] for row in rows if row[position] is not None), None)
+        if isinstance(sample, bool) and column not in kinds['bools']:
+            kinds['bools'].append(column)
+        elif isinstance(sample, datetime.datetime) and column not in kinds['dates']:
+            kinds['dates'].append(column)
+    return kinds
+
+def _replica_insert(rconn, table, columns, rows):
+    placeholders = ', '.join('?' for _ in columns)
+    rconn.executemany(
+        f"INSERT INTO {_quote_identifier(table)} VALUES ({placeholders})",
+        ([_replica_value(value) for value in row] for row in rows)
+    )
+
+def _replica_replace_table(conn, rconn, table, started, query=None):
+    result = conn.execute(text(query or f"SELECT * FROM {table}"))
+    columns = list(result.keys())
+    rows = result.fetchall()
+    staging = _quote_identifier(table + '__nuevo')
+
+    # Tabla nueva + RENAME en una sola transacción: los lectores ven la copia anterior hasta el COMMIT
+    rconn.execute("BEGIN IMMEDIATE")
+    try:
+        rconn.execute(f"DROP TABLE IF EXISTS {staging}")
+        rconn.execute(f"CREATE TABLE {staging} ({', '.join(_quote_identifier(c) for c in columns)})")
+        _replica_insert(rconn, table + '__nuevo', columns, rows)
+        rconn.execute(f"DROP TABLE IF EXISTS {_quote_identifier(table)}")
+        rconn.execute(f"ALTER TABLE {staging} RENAME TO {_quote_identifier(table)}")
+        if REPLICA_INDEXES.get(table) in columns:
+            column = REPLICA_INDEXES[table]
+            rconn.execute(f"CREATE INDEX IX_{table}_{column} ON {_quote_identifier(table)} ({_quote_identifier(column)} COLLATE NOCASE)")
+        meta = {"columns": columns, "rows": len(rows), "synced_ts": started, **_replica_column_kinds(columns, rows)}
+        if 'Ultima_Actualizacion' in columns:
+            stamps = [row[columns.index('Ultima_Actualizacion')] for row in rows]
+            meta['watermark'] = max((s for s in stamps if s is not None), default=None)
+        _replica_set(rconn, 'tabla:' + table, meta)
+        rconn.execute("COMMIT")
+    except Exception:
+        rconn.execute("ROLLBACK")
+        raise
+    return {"mode": "full", "rows": len(rows)}
+
+def _replica_refresh_master(conn, rconn, started, full=False):
+    """Incremental por Ultima_Actualizacion; altas sin fecha y bajas se detectan por CHECKSUM de códigos."""
+    table = 'Tbl_Maestro_Piezas'
+    meta = _replica_get(rconn, 'tabla:' + table)
+    fingerprint = list(conn.execute(text("SELECT COUNT(*), CHECKSUM_AGG(CHECKSUM(Codigo_Pieza)) FROM Tbl_Maestro_Piezas")).fetchone())
+    if full or not meta or not meta.get('watermark'):
+        stats = _replica_replace_table(conn, rconn, table, started)
+        _replica_set(rconn, 'codigos:' + table, fingerprint)
+        return stats
+
+    result = conn.execute(text("SELECT * FROM Tbl_Maestro_Piezas WHERE Ultima_Actualizacion >= :w"),
+                          {"w": datetime.datetime.fromisoformat(meta['watermark'])})
+    columns = list(result.keys())
+    if columns != meta['columns']:
+        # Cambió el esquema del maestro: copia completa
+        stats = _replica_replace_table(conn, rconn, table, started)
+        _replica_set(rconn, 'codigos:' + table, fingerprint)
+        return stats
+    changed = result.fetchall()
+
+    missing, removed = [], []
+    if fingerprint != _replica_get(rconn, 'codigos:' + table):
+        server_codes = {row[0] for row in conn.execute(text("SELECT Codigo_Pieza FROM Tbl_Maestro_Piezas"))}
+        local_codes = {row[0] for row in rconn.execute("SELECT Codigo_Pieza FROM Tbl_Maestro_Piezas")}
+        removed = list(local_codes - server_codes)
+        new_codes = list(server_codes - local_codes)
+        for i in range(0, len(new_codes), REPLICA_CHUNK):
+            chunk = new_codes[i:i + REPLICA_CHUNK]
+            names = {f"c{n}": code for n, code in enumerate(chunk)}
+            missing.extend(conn.execute(
+                text(f"SELECT * FROM Tbl_Maestro_Piezas WHERE Codigo_Pieza IN ({', '.join(':' + k for k in names)})"), names
+            ).fetchall())
+
+    upserts = changed + missing
+    position = columns.index('Codigo_Pieza')
+    stale_codes = [row[position] for row in upserts] + removed
+    rconn.execute("BEGIN IMMEDIATE")
+    try:
+        for i in range(0, len(stale_codes), REPLICA_CHUNK):
+            chunk = stale_codes[i:i + REPLICA_CHUNK]
+            rconn.execute(f"DELETE FROM Tbl_Maestro_Piezas WHERE Codigo_Pieza IN ({', '.join('?' for _ in chunk)})", chunk)
+        _replica_insert(rconn, table, columns, upserts)
+        stamps = [row[columns.index('Ultima_Actualizacion')] for row in changed]
+        if stamps:
+            meta['watermark'] = max(meta['watermark'], _replica_value(max(stamps)))
+        meta.update(_replica_column_kinds(columns, upserts, {"dates": meta['dates'], "bools": meta['bools']}))
+        meta['rows'] = rconn.execute("SELECT COUNT(*) FROM Tbl_Maestro_Piezas").fetchone()[0]
+        meta['synced_ts'] = started
+        _replica_set(rconn, 'tabla:' + table, meta)
+        _replica_set(rconn, 'codigos:' + table, fingerprint)
+        rconn.execute("COMMIT")
+    except Exception:
+        rconn.execute("ROLLBACK")
+        raise
+    return {"mode": "incremental", "upserted": len(upserts), "removed": len(removed)}
+
+def _is_connection_error(error):
+    return isinstance(error, (sqlalchemy.exc.OperationalError, sqlalchemy.exc.InterfaceError))
+
+def refresh_replica(full=False):
+    settings = get_replica_settings()
+    if not settings['enabled']:
+        return {"status": "error", "message": "Réplica local deshabilitada (config.json: read_replica)"}
+
+    with _REPLICA_REFRESH_LOCK:
+        started = time.time()
+        rconn = _replica_connect()
+        try:
+            # Incluye ensure_schema; la copia parte de un resumen al día y lleva solo las
+            # columnas de la vista (o la vista misma si el resumen no se puede mantener)
+            conflicts_select = conflict_rows_query(*conflict_summary_source())
+            tables = {}
+            with get_engine().connect() as conn:
+                tables['Tbl_Maestro_Piezas'] = _replica_refresh_master(conn, rconn, started, full)
+                for table in REPLICA_TABLES[1:]:
+                    query = conflicts_select if table == CONFLICT_SUMMARY_TABLE else None
+                    tables[table] = _replica_replace_table(conn, rconn, table, started, query)
+            _replica_set(rconn, 'primario_caido_hasta', 0)
+            return {"status": "success", "elapsed_ms": round((time.time() - started) * 1000, 1), "tables": tables}
+        except Exception as e:
+            if _is_connection_error(e):
+                _replica_set(rconn, 'primario_caido_hasta', time.time() + REPLICA_PRIMARY_RETRY_SECONDS)
+            return {"status": "error", "message": str(e)}
+        finally:
+            rconn.close()
+
+def mark_replica_pending():
+    """Tras una escritura: las lecturas vuelven al servidor hasta el próximo refresco."""
+    if not get_replica_settings()['enabled']:
+        return
+    try:
+        rconn = _replica_connect()
+        try:
+            _replica_set(rconn, 'pendiente', time.time())
+        finally:
+            rconn.close()
+    except sqlite3.Error:
+        pass
+    _REPLICA_WAKE.set()
+
+def start_replica_refresher():
+    if get_replica_settings()['enabled']:
+        threading.Thread(target=_replica_refresh_loop, name='read-replica', daemon=True).start()
+
+def _replica_refresh_loop():
+    while True:
+        result = refresh_replica()
+        if result['status'] != 'success':
+            log_update(f"Réplica local: refresco fallido: {result['message']}", 'WARNING')
+        _REPLICA_WAKE.wait(get_replica_settings()['refresh_seconds'])
+        _REPLICA_WAKE.clear()
+
+def _note_replica_read(name, source, age):
+    global _REPLICA_LAST_READ
+    read = {"source": source, "replica_age_seconds": round(age, 1) if age is not None else None}
+    request = _current_request()
+    if request is not None:
+        request['replica_read'] = read # Lo agrega a la respuesta process_command
+    _REPLICA_LAST_READ = {"command": name, **read, "at": datetime.datetime.now().isoformat(timespec='seconds')}
+
+def read_with_replica(name, tables, primary_reader, local_reader, args):
+    settings = get_replica_settings()
+    if not settings['enabled']:
+        return primary_reader(*args)
+    if get_pinned_engine() is not None:
+        # Pipeline transaccional: solo su conexión ve lo que escribió y aún no confirma
+        result = primary_reader(*args)
+        _note_replica_read(name, 'server', None)
+        return result
+    try:
+        rconn = _replica_connect()
+    except sqlite3.Error:
+        return primary_reader(*args)
+
+    try:
+        now = time.time()
+        synced = [_replica_get(rconn, 'tabla:' + table) for table in tables]
+        available = all(synced)
+        age = now - min(meta['synced_ts'] for meta in synced) if available else None
+        pending = available and _replica_get(rconn, 'pendiente', 0) >= min(meta['synced_ts'] for meta in synced)
+        primary_down = _replica_get(rconn, 'primario_caido_hasta', 0) > now
+
+        if available and (primary_down or (not pending and age <= settings['max_staleness_seconds'])):
+            source = 'replica'
+            result = local_reader(rconn, *args)
+        else:
+            try:
+                result = primary_reader(*args)
+                source = 'server'
+                _REPLICA_WAKE.set() # Copia vieja o inexistente: refrescar en segundo plano
+            except Exception as e:
+                if not (available and _is_connection_error(e)):
+                    raise
+                log_update(f"Servidor no disponible, sirviendo {name} desde la réplica local: {e}", 'WARNING')
+                _replica_set(rconn, 'primario_caido_hasta', now + REPLICA_PRIMARY_RETRY_SECONDS)
+                source = 'replica'
+                result = local_reader(rconn, *args)
+
+        _note_replica_read(name, source, age)
+        return result
+    finally:
+        rconn.close()
+
+def take_replica_read():
+    """Origen de la última lectura replicable del request en curso (y lo consume)."""
+    request = _current_request()
+    return request.pop('replica_read', None) if request is not None else None
+
+def with_read_source(result, read, wrap_lists=False):
+    """Agrega source / replica_age_seconds a la respuesta (las listas solo si se pidió envolverlas)."""
+    if isinstance(result, dict):
+        return {**result, **read}
+    if wrap_lists and isinstance(result, list):
+        return {"status": "success", "data": result, **read}
+    return result
+
+def served_by_replica(local_reader, *tables):
+    """Decorador para lecturas: local_reader(rconn, *args) atiende desde la copia SQLite."""
+    def decorator(primary_reader):
+        @functools.wraps(primary_reader)
+        def reader(*args):
+            return read_with_replica(primary_reader.__name__, tables, primary_reader, local_reader, args)
+        return reader
+    return decorator
+
+def get_replica_status():
+    settings = get_replica_settings()
+    if not settings['enabled']:
+        return {"status": "success", "enabled": False}
+    rconn = _replica_connect()
+    try:
+        now = time.time()
+        tables = {}
+        for table in REPLICA_TABLES:
+            meta = _replica_get(rconn, 'tabla:' + table)
+            tables[table] = None if not meta else {
+                "synced_at": datetime.datetime.fromtimestamp(meta['synced_ts']).isoformat(timespec='seconds'),
+                "age_seconds": round(now - meta['synced_ts'], 1),
+                "rows": meta['rows'],
+                "stale": now - meta['synced_ts'] > settings['max_staleness_seconds']
+            }
+        synced_ts = [_replica_get(rconn, 'tabla:' + table)['synced_ts'] for table in REPLICA_TABLES if tables[table]]
+        return {
+            "status": "success",
+            "enabled": True,
+            "path": settings['path'],
+            "primary_online": _replica_get(rconn, 'primario_caido_hasta', 0) <= now,
+            "pending_writes": bool(synced_ts) and _replica_get(rconn, 'pendiente', 0) >= min(synced_ts),
+            "max_staleness_seconds": settings['max_staleness_seconds'],
+            "tables": tables,
+            "last_read": _REPLICA_LAST_READ
+        }
+    finally:
+        rconn.close()
+
+def _replica_frame(rconn, table, query, params=()):
+    meta = _replica_get(rconn, 'tabla:' + table)
+    df = read_sql(query, rconn, params=params)
+    for column in meta['dates']:
+        if column in df.columns:
+            df[column] = pd.to_datetime(df[column], format='ISO8601')
+    for column in meta['bools']:
+        if column in df.columns:
+            df[column] = df[column].map({1: True, 0: False})
+    return df
+
+def _replica_master_catalog(rconn):
+    df = _replica_frame(rconn, 'Tbl_Maestro_Piezas', "SELECT * FROM Tbl_Maestro_Piezas ORDER BY Codigo_Pieza COLLATE NOCASE")
+    return to_records(df)
+
+def _replica_records(rconn, query, params=()):
+    cursor = rconn.execute(translate_sql(query), params)
+    return encode_records([d[0] for d in cursor.description], cursor.fetchall())
+
+def _replica_conflict_columns(rconn):
+    # La copia se hace con las columnas de la vista (ver refresh_replica)
+    return tuple(_replica_get(rconn, 'tabla:' + CONFLICT_SUMMARY_TABLE)['columns'])
+
+def _replica_conflicts(rconn):
+    return _replica_records(rconn, conflicts_query(CONFLICT_SUMMARY_TABLE, _replica_conflict_columns(rconn)))
+
+def _replica_pending_tasks(rconn):
+    return _replica_records(rconn, pending_query(CONFLICT_SUMMARY_TABLE, _replica_conflict_columns(rconn)))
+
+def _replica_fetch_part(rconn, code):
+    cursor = rconn.execute("""
+        SELECT
+            Codigo_Pieza, Descripcion,
+            IFNULL(Material, '') as Material,
+            IFNULL(Medida, '') as Medida,
+            IFNULL(Proceso_Primario, '') as Proceso_Primario,
+            IFNULL(Proceso_1, '') as Proceso_1,
+            IFNULL(Proceso_2, '') as Proceso_2,
+            IFNULL(Proceso_3, '') as Proceso_3
+        FROM Tbl_Maestro_Piezas WHERE Codigo_Pieza = ? COLLATE NOCASE LIMIT 1
+    """, (code,))
+    return encode_records([d[0] for d in cursor.description], cursor.fetchall())
+
+def _replica_homologation(rconn, code):
+    query = conflict_rows_query(CONFLICT_SUMMARY_TABLE, _replica_conflict_columns(rconn), "WHERE Codigo_Pieza = ? COLLATE NOCASE")
+    return _replica_records(rconn, query, (code,))
+
+def _replica_standards(rconn):
+    df = _replica_frame(rconn, 'Tbl_Estandares_Materiales', "SELECT * FROM Tbl_Estandares_Materiales ORDER BY Descripcion COLLATE NOCASE")
+    return to_records(df)
+
 # --- RUTAS DE API ---
 
 def test_connection():
@@ -301,33 +1144,89 @@ def test_connection():
     except Exception as e:
         return {"status": "error", "message": str(e)}
 
+@served_by_replica(_replica_master_catalog, 'Tbl_Maestro_Piezas')
 def get_master_catalog():
     engine = get_engine()
     query = "SELECT * FROM Tbl_Maestro_Piezas ORDER BY Codigo_Pieza"
     with engine.connect() as conn:
-        df = pd.read_sql(query, conn)
-    return sanitize(df).to_dict(orient='records')
+        df = read_sql(query, conn)
+    return to_records(df)
+
+# --- BÚSQUEDA EN SERVIDOR (v14.2) ---
+# search_catalog traduce los filtros a SQL parametrizado con ORDER BY y TOP,
+# así solo cruzan el pipe las filas que coinciden.
+
+SEARCH_DEFAULT_LIMIT = 200
+SEARCH_MAX_LIMIT = 5000
+SEARCH_SORTABLE = ['Codigo_Pieza', 'Descripcion', 'Material', 'Proceso_Primario', 'Ultima_Actualizacion']
+SEARCH_PROCESS_COLUMNS = ['Proceso_Primario', 'Proceso_1', 'Proceso_2', 'Proceso_3']
 
+def _escape_like(value):
+    return str(value).replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_').replace('[', '\\[')
+
+def build_catalog_search(filters):
+    """Devuelve (sql, params) para los filtros de search_catalog."""
+    clauses = []
+    params = {}
+
+    if filters.get('code_prefix'):
+        clauses.append("Codigo_Pieza LIKE :code_prefix ESCAPE '\\'")
+        params['code_prefix'] = _escape_like(str(filters['code_prefix']).strip().upper()) + '%'
+
+    tokens = filters.get('tokens') or []
+    if isinstance(tokens, str):
+        tokens = tokens.split()
+    if filters.get('description'):
+        tokens = [filters['description']] + list(tokens)
+    for i, token in enumerate(t for t in tokens if str(t).strip()):
+        clauses.append(f"Descripcion LIKE :desc_{i} ESCAPE '\\'")
+        params[f'desc_{i}'] = '%' + _escape_like(str(token).strip()) + '%'
+
+    if filters.get('material'):
+        clauses.append("Material LIKE :material ESCAPE '\\'")
+        params['material'] = '%' + _escape_like(str(filters['material']).strip()) + '%'
+
+    if filters.get('process'):
+        params['process'] = '%' + _escape_like(str(filters['process']).strip()) + '%'
+        clauses.append('(' + ' OR '.join(f"{col} LIKE :process ESCAPE '\\'" for col in SEARCH_PROCESS_COLUMNS) + ')')
+
+    if filters.get('date_from'):
+        clauses.append("Ultima_Actualizacion >= :date_from")
+        params['date_from'] = filters['date_from']
+    if filters.get('date_to'):
+        clauses.append("Ultima_Actualizacion < DATEADD(day, 1, CAST(:date_to AS DATE))") # Incluye todo el día final
+        params['date_to'] = filters['date_to']
+
+    try:
+        limit = int(filters.get('limit') or SEARCH_DEFAULT_LIMIT)
+    except (TypeError, ValueError):
+        limit = SEARCH_DEFAULT_LIMIT
+    params['limit'] = max(1, min(limit, SEARCH_MAX_LIMIT))
+
+    # ORDER BY solo desde lista blanca (no se puede parametrizar un identificador)
+    order_by = filters.get('order_by') if filters.get('order_by') in SEARCH_SORTABLE else 'Codigo_Pieza'
+    direction = 'DESC' if filters.get('descending') else 'ASC'
+
+    where = (' WHERE ' + ' AND '.join(clauses)) if clauses else ''
+    sql = f"SELECT TOP (:limit) * FROM Tbl_Maestro_Piezas{where} ORDER BY {order_by} {direction}"
+    if order_by != 'Codigo_Pieza':
+        sql += ", Codigo_Pieza ASC" # Orden estable entre llamadas
+    return sql, params
+
+def search_catalog(filters):
+    try:
+        ensure_schema() # Crea los índices de búsqueda la primera vez
+        sql, params = build_catalog_search(filters or {})
+        rows = fetch_records(sql, params)
+        return {"status": "success", "count": len(rows), "limit": params['limit'], "rows": rows}
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+
+@served_by_replica(_replica_conflicts, 'Tbl_Resumen_Conflictos')
 def get_conflicts():
-    engine = get_engine()
-    query = "SELECT * FROM V_Auditoria_Conflictos"
-    with engine.connect() as conn:
-        df = pd.read_sql(query, conn)
-    
-    # Aliases for frontend compatibility
-    if not df.empty:
-        df['id'] = df['Id'] if 'Id' in df.columns else ''
-        df['codigo'] = df['Codigo_Pieza']
-        df['descripcion'] = df['Descripcion_Final'] if 'Descripcion_Final' in df.columns else df['Desc_Master']
-        df['archivo'] = df['Nombre_Archivo'] if 'Nombre_Archivo' in df.columns else ''
-        df['hoja'] = df['Nombre_Hoja'] if 'Nombre_Hoja' in df.columns else ''
-        df['fila'] = df['Numero_Fila_Excel'] if 'Numero_Fila_Excel' in df.columns else ''
-        df['desc_excel'] = df['Desc_Excel'] if 'Desc_Excel' in df.columns else ''
-
-    return sanitize(df).to_dict(orient='records')
+    return fetch_records(conflicts_query(*conflict_summary_source()))
 
 def get_history(code):
-    engine = get_engine()
     q = text("""
         SELECT TOP 50
             Codigo_Pieza as codigo, 
@@ -339,12 +1238,9 @@ def get_history(code):
         WHERE Codigo_Pieza = :c 
         ORDER BY Fecha_Resolucion DESC
     """)
-    with engine.connect() as conn:
-        df = pd.read_sql(q, conn, params={"c": code})
-    return sanitize(df).to_dict(orient='records')
+    return fetch_records(q, {"c": code})
 
 def get_resolved_tasks():
-    engine = get_engine()
     query = """
     SELECT TOP 50
         Codigo_Pieza as codigo, 
@@ -356,22 +1252,185 @@ def get_resolved_tasks():
     FROM Tbl_Historial_Resoluciones 
     ORDER BY Fecha_Resolucion DESC
     """
-    with engine.connect() as conn:
-        df = pd.read_sql(query, conn)
-    return sanitize(df).to_dict(orient='records')
+    return fetch_records(query)
+
+# --- LOG ESTRUCTURADO EN SEGUNDO PLANO (v14.2) ---
+# log_update ya no abre el archivo en cada llamada: encola un registro JSON y un hilo
+# lo escribe por lotes. Rotación por tamaño (bridge_log.jsonl, .1, .2, ...) para que
+# el disco quede acotado. Config: "log_level", "log_file", "log_max_bytes", "log_backups".
+
+LOG_FILE = "bridge_log.jsonl"
+LOG_LEVELS = {'DEBUG': 10, 'INFO': 20, 'WARNING': 30, 'ERROR': 40}
+LOG_DEFAULT_LEVEL = 'INFO'
+LOG_MAX_BYTES = 5 * 1024 * 1024
+LOG_BACKUPS = 3
+LOG_QUEUE_MAX = 10000 # Registros en espera; si el disco no da abasto se descartan (y se cuentan)
+LOG_BATCH_MAX = 500
+
+class JsonLinesWriter:
+    """Archivo JSON-lines escrito por un hilo propio, por lotes y con rotación por tamaño."""
+    def __init__(self, path, max_bytes=LOG_MAX_BYTES, backups=LOG_BACKUPS):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.written = 0
+        self.dropped = 0
+        self.rotations = 0
+        self._queue = queue.Queue(maxsize=LOG_QUEUE_MAX)
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def write(self, record):
+        if self._thread is None:
+            self._start()
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def _start(self):
+        with self._lock:
+            if self._thread is None:
+                thread = threading.Thread(target=self._run, name='log-writer', daemon=True)
+                thread.start()
+                self._thread = thread
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < LOG_BATCH_MAX:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            records = [record for record in batch if record is not None]
+            if records:
+                self._append(records)
+            for _ in batch:
+                self._queue.task_done()
+            if len(records) < len(batch): # Centinela de close()
+                return
+
+    def _append(self, records):
+        data = ''.join(json.dumps(record, default=str, ensure_ascii=False) + "\n" for record in records).encode('utf-8')
+        try:
+            # Se abre por lote (no se mantiene abierto): en Windows no se puede renombrar un archivo abierto
+            size = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+            if size and size + len(data) > self.max_bytes:
+                self._rotate()
+            with open(self.path, 'ab') as f:
+                f.write(data)
+            self.written += len(records)
+        except OSError:
+            self.dropped += len(records) # Nunca romper el bridge por el log
+
+    def _rotate(self):
+        if self.backups <= 0:
+            os.remove(self.path)
+        else:
+            for index in range(self.backups - 1, 0, -1):
+                source = f"{self.path}.{index}"
+                if os.path.exists(source):
+                    os.replace(source, f"{self.path}.{index + 1}")
+            os.replace(self.path, f"{self.path}.1")
+        self.rotations += 1
+
+    def flush(self, timeout=2.0):
+        """Espera a que lo encolado llegue al disco (pruebas, cierre)."""
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.01)
+        return not self._queue.unfinished_tasks
+
+    def close(self, timeout=2.0):
+        if self._thread is not None and self._thread.is_alive():
+            try:
+                self._queue.put(None, timeout=timeout)
+            except queue.Full:
+                return
+            self._thread.join(timeout)
+
+    def status(self):
+        return {
+            "path": self.path,
+            "written": self.written,
+            "dropped": self.dropped,
+            "queued": self._queue.qsize(),
+            "rotations": self.rotations,
+            "max_bytes": self.max_bytes,
+            "backups": self.backups
+        }
+
+_LOG_SETTINGS = None
+_LOG_WRITER = None
+_LOG_WRITERS = [] # Todos los writers abiertos, para vaciarlos al salir
+_LOG_WRITERS_LOCK = threading.Lock()
+_LOG_WRITER_LOCK = threading.Lock()
 
-def log_update(message):
+def get_log_settings():
+    global _LOG_SETTINGS
+    if _LOG_SETTINGS is None:
+        config = load_config()
+        level = str(config.get('log_level') or LOG_DEFAULT_LEVEL).upper()
+        _LOG_SETTINGS = {
+            "level": level if level in LOG_LEVELS else LOG_DEFAULT_LEVEL,
+            "path": config.get('log_file') or os.path.join(get_base_path(), LOG_FILE),
+            "max_bytes": int(config.get('log_max_bytes', LOG_MAX_BYTES)),
+            "backups": int(config.get('log_backups', LOG_BACKUPS))
+        }
+    return _LOG_SETTINGS
+
+def open_log_writer(path, max_bytes=LOG_MAX_BYTES, backups=LOG_BACKUPS):
+    writer = JsonLinesWriter(path, max_bytes, backups)
+    with _LOG_WRITERS_LOCK:
+        _LOG_WRITERS.append(writer)
+    return writer
+
+def get_log_writer():
+    global _LOG_WRITER
+    if _LOG_WRITER is None:
+        settings = get_log_settings()
+        with _LOG_WRITER_LOCK:
+            if _LOG_WRITER is None:
+                _LOG_WRITER = open_log_writer(settings['path'], settings['max_bytes'], settings['backups'])
+    return _LOG_WRITER
+
+def close_log_writers():
+    with _LOG_WRITERS_LOCK:
+        writers = list(_LOG_WRITERS)
+    for writer in writers:
+        writer.close()
+
+atexit.register(close_log_writers)
+
+def log_update(message, level='INFO', **fields):
+    """Encola una línea de log (no bloquea el request). Agrega comando y tiempo transcurrido si hay uno en curso."""
     try:
-        base_dir = get_base_path()
-        log_path = os.path.join(base_dir, "debug_sql_log.txt")
-        with open(log_path, "a", encoding="utf-8") as f:
-            timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            f.write(f"[{timestamp}] {message}\n")
-    except:
+        settings = get_log_settings()
+        if LOG_LEVELS.get(level, LOG_LEVELS['INFO']) < LOG_LEVELS[settings['level']]:
+            return
+        record = {
+            "ts": datetime.datetime.now().isoformat(timespec='milliseconds'),
+            "level": level,
+            "msg": message
+        }
+        request = _current_request()
+        if request is not None:
+            record['command'] = request['cmd']
+            record['elapsed_ms'] = round((time.perf_counter() - request['start']) * 1000, 3)
+        record.update(fields)
+        get_log_writer().write(record)
+    except Exception:
         pass
 
+def get_log_status():
+    settings = get_log_settings()
+    with _LOG_WRITERS_LOCK:
+        writers = [writer.status() for writer in _LOG_WRITERS]
+    return {"status": "success", "level": settings['level'], "path": settings['path'], "writers": writers}
+
 def update_master(code, payload, force_resolve=False, resolution_status=None):
-    log_update(f"Attempting UPDATE for {code}. Force: {force_resolve}, Status: {resolution_status}")
+    log_update(f"Attempting UPDATE for {code}. Force: {force_resolve}, Status: {resolution_status}", 'DEBUG')
     engine = get_engine()
     
     status_resolution = 'IGNORADO'
@@ -422,9 +1481,13 @@ def update_master(code, payload, force_resolve=False, resolution_status=None):
                 })
                 history_logged = True
 
+            maintain_conflict_summary(conn, codes=[code])
+
+        if payload:
+            sync_search_index(upserts=[(code, payload.get('Descripcion'))])
         return {"status": "success", "history_logged": history_logged}
     except Exception as e:
-        log_update(f"Error in update_master: {e}")
+        log_update(f"Error in update_master: {e}", 'ERROR')
         return {"status": "error", "message": str(e), "history_logged": False}
 
 def insert_master(payload):
@@ -444,104 +1507,368 @@ def insert_master(payload):
             'p2': payload.get('Proceso_2'), 
             'p3': payload.get('Proceso_3')
         })
+        maintain_conflict_summary(conn, codes=[payload.get('Codigo_Pieza')])
+    sync_search_index(upserts=[(payload.get('Codigo_Pieza'), payload.get('Descripcion'))])
+
 def delete_master(code):
     engine = get_engine()
     q = text("DELETE FROM Tbl_Maestro_Piezas WHERE Codigo_Pieza = :c")
     with engine.begin() as conn:
         conn.execute(q, {'c': code})
+        maintain_conflict_summary(conn, codes=[code])
+    sync_search_index(deletes=[code])
     return {"status": "success"}
 
-def fetch_part(code):
-    engine = get_engine()
-    q = text("""
-        SELECT TOP 1 
-            Codigo_Pieza, Descripcion, 
-            ISNULL(Material, '') as Material, 
-            ISNULL(Medida, '') as Medida,
-            ISNULL(Proceso_Primario, '') as Proceso_Primario,
-            ISNULL(Proceso_1, '') as Proceso_1,
-            ISNULL(Proceso_2, '') as Proceso_2,
-            ISNULL(Proceso_3, '') as Proceso_3
-        FROM Tbl_Maestro_Piezas WHERE Codigo_Pieza = :code
-    """)
-    with engine.connect() as conn:
-        df = pd.read_sql(q, conn, params={"code": code})
-    return sanitize(df).to_dict(orient='records')
-
-def get_homologation(code):
-    engine = get_engine()
-    query = text("SELECT * FROM V_Auditoria_Conflictos WHERE Codigo_Pieza = :c")
-    with engine.connect() as conn:
-        df = pd.read_sql(query, conn, params={"c": code})
-    return sanitize(df).to_dict(orient='records')
+# --- LOTES TRANSACCIONALES SOBRE EL MAESTRO (v14.2) ---
+# batch_apply recibe N operaciones update/insert/delete y las ejecuta en UNA
+# transacción: cada tramo consecutivo del mismo tipo va como arreglo de
+# parámetros y las banderas de Tbl_Historial_Proyectos se actualizan en bloque.
+# Modos: 'atomic' (todo o nada) y 'best_effort' (aísla las operaciones que fallan).
 
+MASTER_FIELDS = ['Descripcion', 'Material', 'Medida', 'Proceso_Primario', 'Proceso_1', 'Proceso_2', 'Proceso_3']
+BATCH_MODES = ('atomic', 'best_effort')
 
-def get_pending_tasks():
-    engine = get_engine()
-    # Usar VISTA DE CONFLICTOS como fuente principal (684 registros detectados)
-    query = "SELECT * FROM V_Auditoria_Conflictos"
-    with engine.connect() as conn:
-        df = pd.read_sql(query, conn)
-    
-    # SOLUCIÓN MAESTRA v10.7: DATA TRANSLATOR logic
-    
-    # 1. Normalizar nombres de columnas (Todo a minúsculas para evitar case-sensitivity)
-    df.columns = [c.lower() for c in df.columns]
-
-    # 2. Renombrar columnas específicas (SQL -> Flutter Key)
-    rename_map = {
-        'id': 'id', # Asegurar ID si existe
-        'archivo_origen': 'archivo',
-        'nombre_archivo': 'archivo',
-        'file': 'archivo',
-        'nombre_hoja': 'hoja',
-        'sheet': 'hoja',
-        'fila_excel': 'fila',
-        'numero_fila_excel': 'fila', # Added for safety
-        'row': 'fila',
-        'codigo_pieza': 'codigo',
-        'parte': 'codigo',
-        'desc_excel': 'desc_excel',
-        'descripcion_excel': 'desc_excel'
+def _master_params(code, data):
+    return {
+        'c': code,
+        'd': data.get('Descripcion'),
+        'm': data.get('Material'),
+        'md': data.get('Medida'),
+        'p0': data.get('Proceso_Primario'),
+        'p1': data.get('Proceso_1'),
+        'p2': data.get('Proceso_2'),
+        'p3': data.get('Proceso_3')
     }
-    
-    # Búsqueda de Candidatos para Descripción (Detectivazo)
-    candidatos_desc = ['descripcion_base', 'desc_master', 'descripcion', 'desc_oficial', 'descripcion_final', 'desc']
-    col_encontrada = next((c for c in candidatos_desc if c in df.columns), None)
-    
-    if col_encontrada:
-        rename_map[col_encontrada] = 'descripcion'
-    
-    df = df.rename(columns=rename_map)
-    
-    # Si de verdad no existe, llenar con un texto de aviso técnico
-    if 'descripcion' not in df.columns:
-        df['descripcion'] = 'Columna Descripción No Encontrada en SQL'
-
-    # 3. Sanitizar Nulos (Blindaje)
-    if not df.empty:
-        # Usar .get para evitar KeyErrors si la columna no existe tras el rename
-        if 'archivo' not in df.columns: df['archivo'] = 'Desconocido.xlsx'
-        else: df['archivo'] = df['archivo'].fillna('Desconocido.xlsx')
-
-        if 'fila' not in df.columns: df['fila'] = 0
-        else: df['fila'] = df['fila'].fillna(0)
-        
-        if 'hoja' not in df.columns: df['hoja'] = 'Sheet1'
-        else: df['hoja'] = df['hoja'].fillna('Sheet1')
 
-    return sanitize(df).to_dict(orient='records')
+def _normalize_batch_operation(index, operation):
+    """Valida una operación del lote. Acepta los campos en 'data' o al mismo nivel (como 'update')."""
+    if not isinstance(operation, dict):
+        raise ValueError("Operación inválida")
+    op = str(operation.get('op') or operation.get('command') or '').lower()
+    if op not in ('update', 'insert', 'delete'):
+        raise ValueError(f"Operación desconocida: {op or '(vacía)'}")
 
-def export_master():
-    try:
-        engine = get_engine()
+    data = operation.get('data')
+    if data is None:
+        data = {k: operation[k] for k in MASTER_FIELDS + ['Codigo_Pieza'] if k in operation}
+    code = operation.get('code') or data.get('Codigo_Pieza')
+    if not code:
+        raise ValueError("Falta el código de pieza")
+
+    force = bool(operation.get('force_resolve'))
+    status = operation.get('status')
+    if not status:
+        status = 'CORREGIDO' if force and data.get('Descripcion') else 'IGNORADO'
+
+    return {"index": index, "op": op, "code": code, "data": data, "force": force, "status": status}
+
+def _apply_update_run(conn, items):
+    with_data = [item for item in items if any(k in item['data'] for k in MASTER_FIELDS)]
+    if with_data:
+        conn.execute(text("""
+            UPDATE Tbl_Maestro_Piezas
+            SET Descripcion=:d, Material=:m, Medida=:md,
+                Proceso_Primario=:p0, Proceso_1=:p1, Proceso_2=:p2, Proceso_3=:p3,
+                Ultima_Actualizacion=GETDATE()
+            WHERE Codigo_Pieza=:c
+        """), [_master_params(item['code'], item['data']) for item in with_data])
+
+    # Banderas de historial en bloque: un solo UPDATE con JOIN contra staging
+    # (si un código se repite en el lote gana la última operación)
+    flags = {item['code']: item['status'] for item in items}
+    conn.execute(text("CREATE TABLE #Lote_Resoluciones (Codigo_Pieza NVARCHAR(255), Estado NVARCHAR(50))"))
+    try:
+        conn.execute(text("INSERT INTO #Lote_Resoluciones (Codigo_Pieza, Estado) VALUES (:c, :s)"),
+                     [{'c': code, 's': status} for code, status in flags.items()])
+        conn.execute(text("""
+            UPDATE hp SET Requiere_Correccion = 0, Estado_Resolucion = lote.Estado
+            FROM Tbl_Historial_Proyectos hp
+            JOIN #Lote_Resoluciones lote ON hp.Codigo_Pieza = lote.Codigo_Pieza
+        """))
+    finally:
+        conn.execute(text("DROP TABLE #Lote_Resoluciones"))
+
+    resolved = [item for item in items if item['force']]
+    if resolved:
+        conn.execute(text("""
+            INSERT INTO Tbl_Historial_Resoluciones 
+            (Codigo_Pieza, Descripcion_Final, Estado_Resolucion, Fecha_Resolucion, Usuario)
+            VALUES (:c, :d, :st, GETDATE(), 'SISTEMA')
+        """), [{
+            'c': item['code'],
+            'd': item['data'].get('Descripcion') if item['data'] else 'VALOR ORIGINAL CONSERVADO',
+            'st': item['status']
+        } for item in resolved])
+
+def _apply_insert_run(conn, items):
+    conn.execute(text("""
+        INSERT INTO Tbl_Maestro_Piezas (Codigo_Pieza, Descripcion, Material, Medida, Proceso_Primario, Proceso_1, Proceso_2, Proceso_3)
+        VALUES (:c, :d, :m, :md, :p0, :p1, :p2, :p3)
+    """), [_master_params(item['code'], item['data']) for item in items])
+
+def _apply_delete_run(conn, items):
+    conn.execute(text("DELETE FROM Tbl_Maestro_Piezas WHERE Codigo_Pieza = :c"), [{'c': item['code']} for item in items])
+
+_BATCH_RUNNERS = {
+    'update': _apply_update_run,
+    'insert': _apply_insert_run,
+    'delete': _apply_delete_run,
+}
+
+def _batch_runs(items):
+    """Agrupa operaciones consecutivas del mismo tipo, respetando el orden del lote."""
+    runs = []
+    for item in items:
+        if runs and runs[-1][0]['op'] == item['op']:
+            runs[-1].append(item)
+        else:
+            runs.append([item])
+    return runs
+
+def _batch_item_result(item, status, message=None):
+    result = {"index": item['index'], "op": item['op'], "code": item['code'], "status": status}
+    if item['op'] == 'update':
+        result["history_logged"] = status == 'success' and item['force']
+    if message:
+        result["message"] = message
+    return result
+
+def batch_apply(payload):
+    payload = payload or {}
+    operations = payload.get('operations') or []
+    mode = payload.get('mode', 'atomic')
+    if mode not in BATCH_MODES:
+        return {"status": "error", "message": f"Modo inválido: {mode}. Use {' o '.join(BATCH_MODES)}."}
+
+    results = [None] * len(operations)
+    items = []
+    for index, operation in enumerate(operations):
+        try:
+            items.append(_normalize_batch_operation(index, operation))
+        except ValueError as e:
+            results[index] = {"index": index, "status": "error", "message": str(e)}
+
+    if mode == 'atomic' and len(items) < len(operations):
+        for item in items:
+            results[item['index']] = _batch_item_result(item, 'skipped')
+        return {"status": "error", "message": "Lote rechazado: hay operaciones inválidas", "mode": mode, "results": results}
+
+    log_update(f"batch_apply: {len(items)} operaciones, modo {mode}")
+    try:
+        engine = get_bulk_engine()
+        with engine.begin() as conn:
+            for run in _batch_runs(items):
+                runner = _BATCH_RUNNERS[run[0]['op']]
+                if mode == 'atomic':
+                    try:
+                        runner(conn, run)
+                    except Exception as e:
+                        for item in run:
+                            results[item['index']] = _batch_item_result(item, 'error', str(e))
+                        raise
+                    for item in run:
+                        results[item['index']] = _batch_item_result(item, 'success')
+                    continue
+
+                # best_effort: primero el tramo completo; si falla, uno por uno para aislar el error
+                try:
+                    with conn.begin_nested():
+                        runner(conn, run)
+                    for item in run:
+                        results[item['index']] = _batch_item_result(item, 'success')
+                except Exception:
+                    for item in run:
+                        try:
+                            with conn.begin_nested():
+                                runner(conn, [item])
+                            results[item['index']] = _batch_item_result(item, 'success')
+                        except Exception as e:
+                            results[item['index']] = _batch_item_result(item, 'error', str(e))
+
+            maintain_conflict_summary(conn, codes=[item['code'] for item in items if results[item['index']]['status'] == 'success'])
+    except Exception as e:
+        log_update(f"Error in batch_apply: {e}", 'ERROR')
+        for i, result in enumerate(results):
+            if result is None or result['status'] == 'success':
+                results[i] = {**(result or {"index": i}), "status": "rolled_back"}
+                results[i].pop('history_logged', None)
+        return {"status": "error", "message": str(e), "mode": mode, "results": results}
+
+    applied = [item for item in items if results[item['index']]['status'] == 'success']
+    sync_search_index(
+        upserts=[(item['code'], item['data'].get('Descripcion')) for item in applied
+                 if item['op'] == 'insert' or (item['op'] == 'update' and any(k in item['data'] for k in MASTER_FIELDS))],
+        deletes=[item['code'] for item in applied if item['op'] == 'delete']
+    )
+
+    succeeded = sum(1 for r in results if r['status'] == 'success')
+    return {
+        "status": "success" if succeeded == len(results) else "partial",
+        "mode": mode,
+        "succeeded": succeeded,
+        "failed": len(results) - succeeded,
+        "results": results
+    }
+
+@served_by_replica(_replica_fetch_part, 'Tbl_Maestro_Piezas')
+def fetch_part(code):
+    q = text("""
+        SELECT TOP 1 
+            Codigo_Pieza, Descripcion, 
+            ISNULL(Material, '') as Material, 
+            ISNULL(Medida, '') as Medida,
+            ISNULL(Proceso_Primario, '') as Proceso_Primario,
+            ISNULL(Proceso_1, '') as Proceso_1,
+            ISNULL(Proceso_2, '') as Proceso_2,
+            ISNULL(Proceso_3, '') as Proceso_3
+        FROM Tbl_Maestro_Piezas WHERE Codigo_Pieza = :code
+    """)
+    return fetch_records(q, {"code": code})
+
+@served_by_replica(_replica_homologation, 'Tbl_Resumen_Conflictos')
+def get_homologation(code):
+    return fetch_records(conflict_rows_query(*conflict_summary_source(), "WHERE Codigo_Pieza = :c"), {"c": code})
+
+
+@served_by_replica(_replica_pending_tasks, 'Tbl_Resumen_Conflictos')
+def get_pending_tasks():
+    # Resumen mantenido de V_Auditoria_Conflictos, ya con las llaves de Flutter
+    return fetch_records(pending_query(*conflict_summary_source()))
+
+# --- LECTURAS POR LOTE DE CÓDIGOS (v14.2) ---
+# fetch_parts / get_history_many / get_homologation_many: la misma lectura que sus
+# versiones de un código, para N códigos en una conexión y una sentencia por cada
+# BATCH_READ_CHUNK códigos (listas IN). Respuesta agrupada por código:
+#   {"status": "success", "codes": N, "results": {codigo: ...}}
+# Todos los códigos pedidos aparecen en results (None / [] si no hay datos).
+
+BATCH_READ_CHUNK = 500 # Parámetros por sentencia (SQL Server admite 2100, SQLite 999)
+HISTORY_LIMIT = 50 # Resoluciones por código, igual que get_history
+
+def normalize_codes(codes):
+    """Lista o texto separado por comas -> códigos únicos (sin distinguir mayúsculas), en orden."""
+    if isinstance(codes, str):
+        codes = codes.split(',')
+    unique = {}
+    for code in codes or []:
+        code = str(code or '').strip()
+        if code and code.upper() not in unique:
+            unique[code.upper()] = code
+    return list(unique.values())
+
+def _code_chunks(codes):
+    """(lista IN, parámetros) por tramo de BATCH_READ_CHUNK códigos."""
+    for i in range(0, len(codes), BATCH_READ_CHUNK):
+        names = {f"c{n}": code for n, code in enumerate(codes[i:i + BATCH_READ_CHUNK])}
+        yield ', '.join(':' + name for name in names), names
+
+def _group_by_code(codes, records, key, single=False):
+    """Agrupa registros por código pedido (la comparación en SQL no distingue mayúsculas)."""
+    requested = {code.upper(): code for code in codes}
+    results = {code: None if single else [] for code in codes}
+    for record in records:
+        code = requested.get(str(record.get(key, '')).upper())
+        if code is None:
+            continue
+        if single:
+            if results[code] is None:
+                results[code] = record
+        else:
+            results[code].append(record)
+    return {"status": "success", "codes": len(codes), "results": results}
+
+def fetch_records_by_codes(query, codes, params=None):
+    """query con {codes} como lista IN; una conexión para todos los tramos."""
+    records = []
+    with get_engine().connect() as conn:
+        for in_list, names in _code_chunks(codes):
+            result = conn.execute(text(query.format(codes=in_list)), {**(params or {}), **names})
+            records.extend(encode_records(list(result.keys()), result.fetchall()))
+    return records
+
+FETCH_PARTS_SELECT = """
+    SELECT
+        Codigo_Pieza, Descripcion,
+        ISNULL(Material, '') as Material,
+        ISNULL(Medida, '') as Medida,
+        ISNULL(Proceso_Primario, '') as Proceso_Primario,
+        ISNULL(Proceso_1, '') as Proceso_1,
+        ISNULL(Proceso_2, '') as Proceso_2,
+        ISNULL(Proceso_3, '') as Proceso_3
+    FROM Tbl_Maestro_Piezas
+"""
+
+def _replica_records_by_codes(rconn, query, codes):
+    """Igual que fetch_records_by_codes sobre la réplica (parámetros '?')."""
+    records = []
+    for i in range(0, len(codes), BATCH_READ_CHUNK):
+        chunk = codes[i:i + BATCH_READ_CHUNK]
+        records.extend(_replica_records(rconn, query.format(codes=', '.join('?' for _ in chunk)), chunk))
+    return records
+
+def _replica_fetch_parts(rconn, codes):
+    records = _replica_records_by_codes(rconn, FETCH_PARTS_SELECT + " WHERE Codigo_Pieza COLLATE NOCASE IN ({codes})", codes)
+    return _group_by_code(codes, records, 'Codigo_Pieza', single=True)
+
+def _replica_homologation_many(rconn, codes):
+    query = conflict_rows_query(CONFLICT_SUMMARY_TABLE, _replica_conflict_columns(rconn), "WHERE Codigo_Pieza COLLATE NOCASE IN ({codes})")
+    records = _replica_records_by_codes(rconn, query, codes)
+    return _group_by_code(codes, records, 'Codigo_Pieza')
+
+@served_by_replica(_replica_fetch_parts, 'Tbl_Maestro_Piezas')
+def _fetch_parts(codes):
+    records = fetch_records_by_codes(FETCH_PARTS_SELECT + " WHERE Codigo_Pieza IN ({codes})", codes)
+    return _group_by_code(codes, records, 'Codigo_Pieza', single=True)
+
+def fetch_parts(codes):
+    codes = normalize_codes(codes)
+    if not codes:
+        return {"status": "error", "message": "Falta la lista de códigos"}
+    return _fetch_parts(codes)
+
+def get_history_many(codes, limit=HISTORY_LIMIT):
+    codes = normalize_codes(codes)
+    if not codes:
+        return {"status": "error", "message": "Falta la lista de códigos"}
+    # TOP 50 por código: ROW_NUMBER por partición en vez de una consulta por código
+    records = fetch_records_by_codes("""
+        SELECT codigo, descripcion, estado, fecha, usuario FROM (
+            SELECT
+                Codigo_Pieza as codigo,
+                Descripcion_Final as descripcion,
+                Estado_Resolucion as estado,
+                Fecha_Resolucion as fecha,
+                Usuario as usuario,
+                ROW_NUMBER() OVER (PARTITION BY Codigo_Pieza ORDER BY Fecha_Resolucion DESC) as rn
+            FROM Tbl_Historial_Resoluciones
+            WHERE Codigo_Pieza IN ({codes})
+        ) h
+        WHERE rn <= :limit
+        ORDER BY codigo, rn
+    """, codes, {"limit": int(limit)})
+    return _group_by_code(codes, records, 'codigo')
+
+@served_by_replica(_replica_homologation_many, 'Tbl_Resumen_Conflictos')
+def _get_homologation_many(codes):
+    records = fetch_records_by_codes(conflict_rows_query(*conflict_summary_source(), "WHERE Codigo_Pieza IN ({codes})"), codes)
+    return _group_by_code(codes, records, 'Codigo_Pieza')
+
+def get_homologation_many(codes):
+    codes = normalize_codes(codes)
+    if not codes:
+        return {"status": "error", "message": "Falta la lista de códigos"}
+    return _get_homologation_many(codes)
+
+def export_master():
+    try:
+        engine = get_engine()
         desktop = os.path.join(os.path.join(os.environ['USERPROFILE']), 'Desktop')
         filename = f"Maestro_Materiales_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
         output_path = os.path.join(desktop, filename)
         
         query = "SELECT * FROM Tbl_Maestro_Piezas ORDER BY Codigo_Pieza"
         with engine.connect() as conn:
-            df = pd.read_sql(query, conn)
+            df = read_sql(query, conn)
             df.to_excel(output_path, index=False)
             
         return {"status": "success", "path": output_path}
@@ -553,8 +1880,21 @@ def mark_task_solved(id):
     q = text("UPDATE Tbl_Historial_Proyectos SET Requiere_Correccion = 0 WHERE Id = :id")
     with engine.begin() as conn:
         conn.execute(q, {"id": id})
+        maintain_conflict_summary(conn, ids=[id])
     return {"status": "success"}
 
+def load_path_map():
+    """Nombre de archivo -> ruta completa (file_paths_map.json junto al bridge)."""
+    map_path = os.path.join(get_base_path(), PATH_MAP_FILE)
+    if os.path.exists(map_path):
+        with open(map_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return {}
+
+def save_path_map(pmap):
+    with open(os.path.join(get_base_path(), PATH_MAP_FILE), 'w', encoding='utf-8') as f:
+        json.dump(pmap, f, indent=4, ensure_ascii=False)
+
 def register_file_path(filename, full_path):
     pmap = load_path_map()
     pmap[filename] = full_path
@@ -568,7 +1908,17 @@ def write_excel_correction(id, new_value, filename, sheet_name, row_idx, col_nam
     
     if not full_path or not os.path.exists(full_path):
         return {"status": "error", "message": f"Ruta no encontrada para '{filename}'. Vaya a 'Fuentes de Datos' y relocalice el archivo."}
-        
+
+    result = write_excel_cell(full_path, sheet_name, row_idx, new_value)
+    if result['status'] == 'success':
+        # 7. Actualizar SQL para reflejar que se corrigió en Excel
+        # Opcional: Marcar como 'CORREGIDO_EN_EXCEL' o simplemente 'CORREGIDO'
+        save_excel_correction(id, new_value)
+    return result
+
+def write_excel_cell(full_path, sheet_name, row_idx, new_value):
+    """Escribe la descripción corregida en el libro (sin tocar SQL)."""
+    filename = os.path.basename(full_path)
     try:
         # 2. Abrir Excel
         wb = openpyxl.load_workbook(full_path)
@@ -622,10 +1972,6 @@ def write_excel_correction(id, new_value, filename, sheet_name, row_idx, col_nam
         wb.save(full_path)
         wb.close()
         
-        # 7. Actualizar SQL para reflejar que se corrigió en Excel
-        # Opcional: Marcar como 'CORREGIDO_EN_EXCEL' o simplemente 'CORREGIDO'
-        save_excel_correction(id, new_value) 
-        
         return {"status": "success", "message": "Excel actualizado correctamente."}
         
     except PermissionError:
@@ -642,6 +1988,36 @@ def save_excel_correction(id, new_desc):
     except Exception as e:
         return {"status": "error", "message": str(e)}
 
+BLUEPRINT_SKIP_DIRS = ['OBSOLETO', 'RESPALDO', 'BACKUP', 'OLD', 'BAK']
+
+# Índice CÓDIGO -> PDF de la ruta de planos, armado en el arranque en caliente del
+# listener: evita recorrer el recurso compartido en cada find_blueprint. Si el
+# índice no tiene el código (plano nuevo), find_blueprint sigue con la búsqueda normal.
+_BLUEPRINT_INDEX = None
+
+def build_blueprint_index(bp_path=None):
+    global _BLUEPRINT_INDEX
+    bp_path = bp_path if bp_path is not None else load_config().get('blueprints_path', '')
+    if not bp_path or not os.path.isdir(bp_path):
+        _BLUEPRINT_INDEX = None
+        return 0
+    files = {}
+    for root, dirs, names in os.walk(bp_path):
+        dirs[:] = [d for d in dirs if not any(s in d.upper() for s in BLUEPRINT_SKIP_DIRS)]
+        for name in names:
+            stem, ext = os.path.splitext(name)
+            if ext.lower() == '.pdf':
+                files.setdefault(stem.upper(), os.path.join(root, name))
+    _BLUEPRINT_INDEX = {"root": bp_path, "files": files, "built_at": time.time()}
+    return len(files)
+
+def lookup_blueprint_index(bp_path, code_clean):
+    index = _BLUEPRINT_INDEX
+    if not index or index['root'] != bp_path:
+        return None
+    path = index['files'].get(code_clean)
+    return path if path and os.path.exists(path) else None
+
 def find_blueprint(code):
     try:
         cfg = load_config()
@@ -664,9 +2040,10 @@ def find_blueprint(code):
         if not bp_path or not os.path.exists(bp_path):
             return {"status": "error", "message": "Ruta de planos no configurada"}
             
-        matches = []
-        SKIP_DIRS = ['OBSOLETO', 'RESPALDO', 'BACKUP', 'OLD', 'BAK']
-        
+        indexed = lookup_blueprint_index(bp_path, code_clean)
+        if indexed:
+            return {"status": "success", "path": indexed, "level": "index"}
+
         search_root = bp_path
         if '-' in code_clean:
             prefix = code_clean.split('-')[0]
@@ -680,7 +2057,7 @@ def find_blueprint(code):
                 pass
 
         for root, dirs, files in os.walk(search_root):
-            dirs[:] = [d for d in dirs if not any(s in d.upper() for s in SKIP_DIRS)]
+            dirs[:] = [d for d in dirs if not any(s in d.upper() for s in BLUEPRINT_SKIP_DIRS)]
             if f"{code_clean}.pdf" in files:
                 full_path = os.path.join(root, f"{code_clean}.pdf")
                 return {"status": "success", "path": full_path, "level": "deep_search"}
@@ -689,8 +2066,177 @@ def find_blueprint(code):
     except Exception as e:
         return {"status": "error", "message": str(e)}
 
-def run_full_diagnostics():
-    # Estructura plana solicitada por el usuario v10.5
+# --- DIAGNÓSTICO SENTINEL PARALELO (v14.2) ---
+# Las sondas independientes corren en hilos (daemon: una conexión colgada no frena la
+# salida) bajo un presupuesto total de tiempo; lo que no termina se reporta como
+# "timeout". Además de verificar, mide: login, ida y vuelta de consultas (SELECT 1 x N)
+# y una lectura de volumen, para decir si la lentitud es de la red, del servidor o del
+# recurso compartido de planos / archivos fuente.
+
+DIAGNOSTIC_BUDGET_SECONDS = 15
+DIAGNOSTIC_RTT_SAMPLES = 10
+DIAGNOSTIC_THROUGHPUT_ROWS = 2000
+DIAGNOSTIC_SCAN_ENTRIES = 200 # Entradas listadas para medir el acceso a la ruta de planos
+DIAGNOSTIC_FILE_READ_BYTES = 64 * 1024
+DIAGNOSTIC_TABLES = ['Tbl_Maestro_Piezas', 'Tbl_Historial_Resoluciones', 'Tbl_Historial_Proyectos']
+
+# Umbrales del veredicto
+DIAG_RTT_SLOW_MS = 30 # SELECT 1 en LAN: < 5 ms
+DIAG_LOGIN_SLOW_MS = 1500
+DIAG_QUERY_SLOW_MS = 1000
+DIAG_THROUGHPUT_SLOW_KBPS = 1000
+DIAG_SHARE_SLOW_MS = 1000
+
+def _start_probe(results, name, func, *args):
+    def run():
+        start = time.perf_counter()
+        try:
+            outcome = func(*args)
+        except Exception as e:
+            outcome = {"ok": False, "error": str(e)}
+        outcome.setdefault('ms', round((time.perf_counter() - start) * 1000, 1))
+        results[name] = outcome
+    thread = threading.Thread(target=run, name=f"diag-{name}", daemon=True)
+    thread.start()
+    return thread
+
+def _wait_probes(threads, deadline):
+    for thread in threads:
+        thread.join(max(0.0, deadline - time.monotonic()))
+
+def _probe_login():
+    """Conexión nueva (sin pool): costo real de login, más la primera consulta."""
+    engine = create_engine(get_connection_string(), poolclass=sqlalchemy.pool.NullPool)
+    try:
+        start = time.perf_counter()
+        with engine.connect() as conn:
+            login_ms = (time.perf_counter() - start) * 1000
+            start = time.perf_counter()
+            conn.execute(text("SELECT 1")).scalar()
+            first_query_ms = (time.perf_counter() - start) * 1000
+        return {"ok": True, "login_ms": round(login_ms, 1), "first_query_ms": round(first_query_ms, 1)}
+    finally:
+        engine.dispose()
+
+def _probe_table(engine, table):
+    with engine.connect() as conn:
+        conn.execute(text(f"SELECT TOP 1 * FROM {table}")).fetchall()
+    return {"ok": True}
+
+def _probe_excel_columns(engine):
+    with engine.connect() as conn:
+        conn.execute(text("SELECT TOP 1 Nombre_Archivo, Nombre_Hoja, Numero_Fila_Excel FROM Tbl_Historial_Proyectos")).fetchall()
+    return {"ok": True}
+
+def _probe_view_count(engine):
+    with engine.connect() as conn:
+        start = time.perf_counter()
+        count = conn.execute(text("SELECT COUNT(*) FROM V_Auditoria_Conflictos")).scalar()
+        query_ms = (time.perf_counter() - start) * 1000
+    return {"ok": True, "rows": int(count or 0), "query_ms": round(query_ms, 1)}
+
+def _probe_round_trip(engine, samples):
+    timings = []
+    with engine.connect() as conn:
+        for _ in range(samples):
+            start = time.perf_counter()
+            conn.execute(text("SELECT 1")).scalar()
+            timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return {
+        "ok": True,
+        "samples": samples,
+        "min_ms": round(timings[0], 2),
+        "median_ms": round(timings[len(timings) // 2], 2),
+        "p95_ms": round(timings[min(len(timings) - 1, int(round(0.95 * (len(timings) - 1))))], 2),
+        "max_ms": round(timings[-1], 2)
+    }
+
+def _probe_throughput(engine, rows):
+    with engine.connect() as conn:
+        start = time.perf_counter()
+        fetched = conn.execute(text("SELECT TOP (:n) * FROM Tbl_Maestro_Piezas"), {'n': rows}).fetchall()
+        read_ms = (time.perf_counter() - start) * 1000
+    payload = sum(len(str(value)) for row in fetched for value in row if value is not None)
+    seconds = max(read_ms / 1000, 1e-6)
+    return {
+        "ok": True,
+        "rows": len(fetched),
+        "bytes": payload,
+        "read_ms": round(read_ms, 1),
+        "rows_per_s": round(len(fetched) / seconds),
+        "kb_per_s": round(payload / 1024 / seconds, 1)
+    }
+
+def _probe_sources(engine):
+    with engine.connect() as conn:
+        rows = conn.execute(text("SELECT ID, Nombre_Logico, Ruta_Actual FROM Tbl_Fuentes_Datos WHERE Estado = 'ACTIVO'")).fetchall()
+    return {"ok": True, "sources": [{"id": row[0], "name": row[1], "path": row[2]} for row in rows]}
+
+def _probe_directory(path):
+    if not path:
+        return {"ok": False, "configured": False}
+    start = time.perf_counter()
+    if not os.path.exists(path):
+        return {"ok": False, "configured": True, "access_ms": round((time.perf_counter() - start) * 1000, 1)}
+    entries = 0
+    with os.scandir(path) as listing:
+        for _ in listing:
+            entries += 1
+            if entries >= DIAGNOSTIC_SCAN_ENTRIES:
+                break
+    return {"ok": True, "configured": True, "entries": entries, "access_ms": round((time.perf_counter() - start) * 1000, 1)}
+
+def _probe_file(path):
+    start = time.perf_counter()
+    if not path or not os.path.exists(path):
+        return {"ok": False, "access_ms": round((time.perf_counter() - start) * 1000, 1)}
+    size = os.path.getsize(path)
+    with open(path, 'rb') as f:
+        f.read(DIAGNOSTIC_FILE_READ_BYTES)
+    return {"ok": True, "bytes": size, "access_ms": round((time.perf_counter() - start) * 1000, 1)}
+
+def diagnose_bottlenecks(results):
+    """Hallazgos [(área, detalle)] a partir de las métricas: red, servidor o recurso compartido."""
+    findings = []
+    login = results.get('login', {})
+    rtt = results.get('round_trip', {})
+    if not login.get('ok'):
+        findings.append(('network', "Sin conexión al servidor SQL (red, firewall, nombre del servidor o driver ODBC)."))
+    else:
+        network_slow = rtt.get('ok') and rtt['min_ms'] > DIAG_RTT_SLOW_MS
+        if network_slow:
+            findings.append(('network', f"Ida y vuelta mínima de {rtt['min_ms']} ms por consulta (en LAN debería ser < 5 ms)."))
+        if login.get('login_ms', 0) > DIAG_LOGIN_SLOW_MS and not network_slow:
+            findings.append(('server', f"Login de {login['login_ms']} ms con red rápida: autenticación/DNS o servidor saturado."))
+        view = results.get('view_count', {})
+        if view.get('ok') and view['query_ms'] - rtt.get('min_ms', 0) > DIAG_QUERY_SLOW_MS:
+            findings.append(('server', f"COUNT de V_Auditoria_Conflictos tardó {view['query_ms']} ms: la vista/consulta es lenta en el servidor."))
+        throughput = results.get('throughput', {})
+        if throughput.get('ok') and throughput['rows'] >= 100 and throughput['kb_per_s'] < DIAG_THROUGHPUT_SLOW_KBPS:
+            findings.append(('network', f"Lectura de volumen a {throughput['kb_per_s']} KB/s: ancho de banda limitado entre el equipo y el servidor."))
+
+    blueprints = results.get('blueprints_path', {})
+    if blueprints.get('configured') and not blueprints.get('ok'):
+        findings.append(('share', "Ruta de planos inaccesible."))
+    elif blueprints.get('access_ms', 0) > DIAG_SHARE_SLOW_MS:
+        findings.append(('share', f"Ruta de planos responde en {blueprints['access_ms']} ms (recurso compartido lento)."))
+    for name, outcome in results.items():
+        if outcome.get('timeout') and name != 'login':
+            area = 'share' if name.startswith('source:') or name == 'blueprints_path' else 'server'
+            findings.append((area, f"La sonda '{name}' no respondió dentro del presupuesto de tiempo."))
+            continue
+        if not name.startswith('source:'):
+            continue
+        if not outcome.get('ok'):
+            findings.append(('share', f"Archivo fuente inaccesible: {outcome.get('path') or name[7:]}"))
+        elif outcome.get('access_ms', 0) > DIAG_SHARE_SLOW_MS:
+            findings.append(('share', f"Archivo fuente lento ({outcome['access_ms']} ms): {outcome.get('path')}"))
+    return findings
+
+def run_full_diagnostics(payload=None):
+    # Estructura plana solicitada por el usuario v10.5 (+ métricas v14.2)
+    payload = payload or {}
     response = {
         "db_status": False,
         "integrity_status": False,
@@ -705,290 +2251,347 @@ def run_full_diagnostics():
         timestamp = datetime.datetime.now().strftime("%H:%M:%S")
         log_buffer.append(f"[{timestamp}] {msg}")
 
+    started = time.monotonic()
+    budget = float(payload.get('budget_s') or DIAGNOSTIC_BUDGET_SECONDS)
+    samples = max(1, int(payload.get('samples') or DIAGNOSTIC_RTT_SAMPLES))
+    deadline = started + budget
+    results = {}
+    planned = ['login', 'blueprints_path']
+
     try:
-        add_log("=== INICIANDO DIAGNÓSTICO SENTINEL PRO v10.5 ===")
-        
-        # PASO 1: Conexión SQL
-        try:
-            add_log("1. Verificando Conexión SQL...")
+        add_log("=== INICIANDO DIAGNÓSTICO SENTINEL PRO v14.2 (paralelo) ===")
+
+        # Fase 1: login y ruta de planos no dependen de nada
+        threads = [
+            _start_probe(results, 'login', _probe_login),
+            _start_probe(results, 'blueprints_path', _probe_directory, load_config().get('blueprints_path', ''))
+        ]
+        _wait_probes(threads[:1], deadline)
+
+        # Fase 2: con el servidor arriba, todas las sondas SQL en paralelo
+        if results.get('login', {}).get('ok'):
             engine = get_engine()
-            with engine.connect() as conn:
-                conn.execute(text("SELECT 1"))
-            response['db_status'] = True
-            add_log("✅ Conexión SQL: EXITOSA")
-        except Exception as e:
-            add_log(f"❌ Error Crítico de Conexión: {str(e)}")
-            raise e # Detener todo si no hay DB
+            db_probes = [(f"table:{t}", _probe_table, engine, t) for t in DIAGNOSTIC_TABLES] + [
+                ('excel_columns', _probe_excel_columns, engine),
+                ('view_count', _probe_view_count, engine),
+                ('round_trip', _probe_round_trip, engine, samples),
+                ('throughput', _probe_throughput, engine, DIAGNOSTIC_THROUGHPUT_ROWS),
+                ('sources', _probe_sources, engine)
+            ]
+            for name, func, *args in db_probes:
+                planned.append(name)
+                threads.append(_start_probe(results, name, func, *args))
+
+            # Fase 3: acceso a cada archivo fuente registrado
+            _wait_probes([threads[-1]], deadline)
+            for source in results.get('sources', {}).get('sources', []):
+                name = f"source:{source['id']}"
+                planned.append(name)
+                threads.append(_start_probe(results, name, _probe_file, source['path']))
+        _wait_probes(threads, deadline)
+    except Exception as general_error:
+        add_log(f"\n❌ EXCEPCIÓN GENERAL DEL SISTEMA: {str(general_error)}")
 
+    # Instantánea: las sondas que sigan corriendo ya no modifican el reporte
+    results = dict(results)
+    timed_out = [name for name in planned if name not in results]
+    for name in timed_out:
+        results[name] = {"ok": False, "timeout": True}
+    for source in results.get('sources', {}).get('sources', []):
+        results.get(f"source:{source['id']}", {}).update(name=source['name'], path=source['path'])
+
+    # PASO 1: Conexión SQL
+    login = results['login']
+    add_log("1. Verificando Conexión SQL...")
+    if login.get('ok'):
+        response['db_status'] = True
+        add_log(f"✅ Conexión SQL: EXITOSA (login {login['login_ms']} ms, primera consulta {login['first_query_ms']} ms)")
+    elif login.get('timeout'):
+        add_log(f"❌ Error Crítico de Conexión: sin respuesta en {budget:g} s")
+    else:
+        add_log(f"❌ Error Crítico de Conexión: {login.get('error')}")
+
+    if response['db_status']:
         # PASO 2: Auditoría de Tablas
-        try:
-            add_log("2. Auditando Esquema de Tablas...")
-            with engine.connect() as conn:
-                tables = ['Tbl_Maestro_Piezas', 'Tbl_Historial_Resoluciones', 'Tbl_Historial_Proyectos']
-                missing = []
-                for t in tables:
-                    try:
-                        conn.execute(text(f"SELECT TOP 1 * FROM {t}"))
-                        add_log(f"  - Tabla '{t}': OK")
-                    except:
-                        add_log(f"  - Tabla '{t}': NO ENCONTRADA")
-                        missing.append(t)
-                
-                if missing:
-                    add_log("❌ Tablas faltantes detectadas.")
-                else:
-                    try:
-                        conn.execute(text("SELECT TOP 1 Nombre_Archivo, Nombre_Hoja, Numero_Fila_Excel FROM Tbl_Historial_Proyectos"))
-                        add_log("  - Columnas de Metadatos Excel: OK")
-                        response['integrity_status'] = True
-                    except Exception as ce:
-                        add_log(f"❌ Faltan columnas críticas en Tbl_Historial_Proyectos: {ce}")
-        except Exception as e:
-            add_log(f"❌ Error en auditoría de tablas: {e}")
+        add_log("2. Auditando Esquema de Tablas...")
+        missing = []
+        for t in DIAGNOSTIC_TABLES:
+            outcome = results[f"table:{t}"]
+            if outcome.get('ok'):
+                add_log(f"  - Tabla '{t}': OK ({outcome['ms']} ms)")
+            else:
+                add_log(f"  - Tabla '{t}': {'SIN RESPUESTA' if outcome.get('timeout') else 'NO ENCONTRADA'}")
+                missing.append(t)
+        if missing:
+            add_log("❌ Tablas faltantes detectadas.")
+        elif results['excel_columns'].get('ok'):
+            add_log("  - Columnas de Metadatos Excel: OK")
+            response['integrity_status'] = True
+        else:
+            add_log(f"❌ Faltan columnas críticas en Tbl_Historial_Proyectos: {results['excel_columns'].get('error', 'sin respuesta')}")
 
-        # PASO 3: Simulación Lógica Excel
-        try:
-            add_log("3. Simulando Lógica de Conflictos (Dry Run)...")
-            query = "SELECT * FROM V_Auditoria_Conflictos"
-            with engine.connect() as conn:
-                df = pd.read_sql(query, conn)
-            
-            count = len(df)
-            add_log(f"  - Filas leídas de V_Auditoria_Conflictos: {count}")
-            
-            if count == 0:
+        # PASO 3: Vista de conflictos (COUNT en el servidor, sin traer filas)
+        add_log("3. Verificando Vista de Conflictos...")
+        view = results['view_count']
+        if view.get('ok'):
+            add_log(f"  - Filas en V_Auditoria_Conflictos: {view['rows']} ({view['query_ms']} ms)")
+            if view['rows'] == 0:
                 add_log("⚠️ CERO conflictos detectados. ¿Lectura de Excel vacía?")
-                # Warning status is technically "True" for logic operation but with warning log
-                response['logic_status'] = True 
             else:
                 add_log("✅ Lógica de Vistas operando correctamente.")
-                response['logic_status'] = True
+            response['logic_status'] = True
+        else:
+            add_log(f"❌ Error leyendo vista de conflictos: {view.get('error', 'sin respuesta')}")
 
-        except Exception as e:
-            add_log(f"❌ Error leyendo vista de conflictos: {e}")
+    # PASO 4: Integridad de Rutas
+    add_log("4. Verificando Acceso a Recursos...")
+    blueprints = results['blueprints_path']
+    bp_path = load_config().get('blueprints_path', '')
+    if not blueprints.get('configured', True) or not bp_path:
+        add_log("⚠️ Ruta de planos no configurada.")
+    elif blueprints.get('ok'):
+        add_log(f"✅ Ruta de Planos accesible: {bp_path} ({blueprints['access_ms']} ms)")
+        response['path_status'] = True
+    else:
+        add_log(f"❌ Ruta de Planos INACCESIBLE: {bp_path}")
+    for name in planned:
+        if name.startswith('source:'):
+            outcome = results[name]
+            state = f"OK ({outcome['access_ms']} ms)" if outcome.get('ok') else ('SIN RESPUESTA' if outcome.get('timeout') else 'INACCESIBLE')
+            add_log(f"  - Fuente '{outcome.get('name', name)}': {state}")
 
-        # PASO 4: Integridad de Rutas
-        try:
-            add_log("4. Verificando Acceso a Recursos...")
-            cfg = load_config()
-            bp_path = cfg.get('blueprints_path', '')
-            if not bp_path:
-                 add_log("⚠️ Ruta de planos no configurada.")
-            elif os.path.exists(bp_path):
-                 add_log(f"✅ Ruta de Planos accesible: {bp_path}")
-                 response['path_status'] = True
-            else:
-                 add_log(f"❌ Ruta de Planos INACCESIBLE: {bp_path}")
-        except Exception as e:
-            add_log(f"❌ Error validando rutas: {e}")
+    # PASO 5: Métricas y veredicto
+    metrics = {
+        "login_ms": login.get('login_ms'),
+        "first_query_ms": login.get('first_query_ms'),
+        "round_trip": {k: v for k, v in results.get('round_trip', {}).items() if k.endswith('_ms') or k == 'samples'},
+        "view_count_ms": results.get('view_count', {}).get('query_ms'),
+        "throughput": {k: v for k, v in results.get('throughput', {}).items() if k != 'ok' and k != 'ms'},
+        "blueprints_access_ms": blueprints.get('access_ms')
+    }
+    if metrics['round_trip']:
+        rtt = metrics['round_trip']
+        add_log(f"5. Métricas: ida y vuelta min {rtt.get('min_ms')} / mediana {rtt.get('median_ms')} / p95 {rtt.get('p95_ms')} ms")
+    if metrics['throughput'].get('rows'):
+        tp = metrics['throughput']
+        add_log(f"  - Lectura de volumen: {tp['rows']} filas en {tp['read_ms']} ms ({tp['kb_per_s']} KB/s)")
+    findings = diagnose_bottlenecks(results)
+    for area, detail in findings:
+        add_log(f"⚠️ [{area.upper()}] {detail}")
+    if timed_out:
+        add_log(f"⚠️ Sin respuesta dentro de {budget:g} s: {', '.join(timed_out)}")
+    verdict = "Sin cuellos de botella detectados." if not findings else \
+        "Problemas detectados en: " + ", ".join(dict.fromkeys({'network': 'red', 'server': 'servidor SQL', 'share': 'recurso compartido'}[area] for area, _ in findings))
+    add_log(f"=== VEREDICTO: {verdict} ===")
 
-    except Exception as general_error:
-        add_log(f"\n❌ EXCEPCIÓN GENERAL DEL SISTEMA: {str(general_error)}")
-    
-    finally:
-        # Construir reporte final
-        full_log = "\n".join(log_buffer)
-        response['log'] = full_log
-        
-        # Guardar reporte físico en el Escritorio (USERPROFILE/Desktop)
-        try:
-            desktop = os.path.join(os.environ['USERPROFILE'], 'Desktop')
-            report_path = os.path.join(desktop, "SENTINEL_LOG_v10.txt")
-            with open(report_path, "w", encoding="utf-8") as f:
-                f.write(full_log)
-        except:
-            pass # No fallar si no se puede escribir el archivo
+    response.update({
+        "elapsed_ms": round((time.monotonic() - started) * 1000, 1),
+        "budget_s": budget,
+        "timed_out": timed_out,
+        "metrics": metrics,
+        "bottlenecks": [{"area": area, "detail": detail} for area, detail in findings],
+        "verdict": verdict,
+        "probes": results
+    })
 
-        return response
+    # Construir reporte final
+    full_log = "\n".join(log_buffer)
+    response['log'] = full_log
 
-# --- EXECUTION ---
-if __name__ == "__main__":
-    import argparse
-    parser = argparse.ArgumentParser()
-    parser.add_argument('command', nargs='?', help='API Command') # Optional for loop mode
-    parser.add_argument('--code', help='Part code')
-    parser.add_argument('--id', help='Task ID')
-    parser.add_argument('--stdin', action='store_true', help='Read payload from stdin (base64)')
-    parser.add_argument('--force_resolve', action='store_true', help='Force resolution')
-    parser.add_argument('--status', help='Custom resolution status')
-    parser.add_argument('--listen', action='store_true', help='Start in persistent listener mode')
-    
-    args = parser.parse_known_args()[0]
+    # Guardar reporte físico en el Escritorio (USERPROFILE/Desktop)
+    try:
+        desktop = os.path.join(os.environ['USERPROFILE'], 'Desktop')
+        report_path = os.path.join(desktop, "SENTINEL_LOG_v10.txt")
+        with open(report_path, "w", encoding="utf-8") as f:
+            f.write(full_log)
+    except:
+        pass # No fallar si no se puede escribir el archivo
 
-    def process_command(cmd, payload, args_obj):
-        try:
-            result = None
-            if cmd == 'test_connection':
-                result = test_connection()
-            elif cmd in ['get_all', 'catalog']:
-                result = get_master_catalog()
-            elif cmd in ['conflicts', 'get_conflicts']:
-                result = get_conflicts()
-            elif cmd in ['history', 'get_history']:
-                code_val = args_obj.code if args_obj else payload.get('code')
-                result = get_history(code_val)
-            elif cmd == 'update':
-                code_val = args_obj.code if args_obj else payload.get('code')
-                force = args_obj.force_resolve if args_obj else payload.get('force_resolve')
-                status = args_obj.status if args_obj else payload.get('status')
-                result = update_master(code_val, payload, force, status)
-            elif cmd == 'delete':
-                code_val = args_obj.code if args_obj else payload.get('code')
-                result = delete_master(code_val)
-            elif cmd == 'insert':
-                result = insert_master(payload)
-            elif cmd in ['fetch', 'fetch_part']:
-                code_val = args_obj.code if args_obj else payload.get('code')
-                result = fetch_part(code_val)
-            elif cmd in ['homologation', 'get_homologation']:
-                code_val = args_obj.code if args_obj else payload.get('code')
-                result = get_homologation(code_val)
-            elif cmd == 'get_resolved':
-                result = get_resolved_tasks()
-            elif cmd == 'get_pending':
-                result = get_pending_tasks()
-            elif cmd in ['mark_corrected', 'mark_solved']:
-                id_val = args_obj.id if args_obj and args_obj.id else (args_obj.code if args_obj else payload.get('id'))
-                result = mark_task_solved(id_val)
-            elif cmd == 'find_blueprint':
-                code_val = args_obj.code if args_obj else payload.get('code')
-                result = find_blueprint(code_val)
-            elif cmd == 'export_master':
-                result = export_master()
-            elif cmd == 'diagnostic':
-                result = run_full_diagnostics()
-            # --- COMMANDS v12.0 STANDARDS ---
-            elif cmd in ['standards', 'get_standards']:
-                result = get_standards()
-            elif cmd == 'add_standard':
-                desc = payload.get('Descripcion') if payload else (args_obj.code if args_obj else '')
-                cat = payload.get('Categoria', 'GENERAL') if payload else 'GENERAL'
-                result = add_standard(desc, cat)
-            elif cmd == 'edit_standard':
-                id_val = args_obj.id if args_obj else payload.get('id')
-                new_desc = payload.get('Descripcion') if payload else (args_obj.code if args_obj else '')
-                result = edit_standard(id_val, new_desc)
-            elif cmd == 'delete_standard':
-                id_val = args_obj.id if args_obj else payload.get('id')
-                result = delete_standard(id_val)
-            # --- COMMANDS v12.1 SMART HOMOLOGATOR ---
-            elif cmd == 'get_suggestion':
-                dirty = (args_obj.code if args_obj else None) or (payload.get('text') if payload else None)
-                result = get_match_suggestion(dirty)
-            elif cmd == 'save_correction':
-                id_val = args_obj.id if args_obj else payload.get('id')
-                txt = payload.get('text')
-                result = save_excel_correction(id_val, txt)
-            # --- COMMANDS v13.x DATA MANAGER & CONFIG ---
-            elif cmd == 'get_config':
-                result = load_config()
-            elif cmd == 'save_config':
-                result = save_sys_config(payload)
-            elif cmd in ['get_sources', 'get_paths']:
-                result = get_sources()
-            elif cmd in ['add_source', 'register_path']:
-                name = payload.get('name') or payload.get('filename') or "Archivo Nuevo"
-                path = payload.get('path')
-                result = add_source(name, path)
-            elif cmd == 'update_source':
-                result = update_source(payload.get('id'), payload.get('path'))
-            elif cmd == 'scan_source':
-                result = scan_and_ingest(payload.get('id'))
-            elif cmd == 'write_excel':
-                result = write_excel_correction(
-                    payload.get('id'), 
-                    payload.get('value'), 
-                    payload.get('filename'), 
-                    payload.get('sheet'), 
-                    payload.get('row'),
-                    'D' 
-                )
-            elif cmd == 'kill':
-                sys.exit(0)
-            else:
-                result = {"status": "error", "message": f"Comando desconocido: {cmd}"}
-                
-            return result
-        except Exception as e:
-            return {"status": "error", "message": str(e)}
+    return response
 
-    # --- MODE 1: PERSISTENT LISTENER (OPTIMIZATION v14.1) ---
-    if args.listen:
-        # Optimización: Mantener proceso vivo para evitar carga repetitiva de Python/Librerías
-        while True:
-            try:
-                # 1. FRENO DE MANO: Pausa obligatoria
-                time.sleep(0.05) # 50ms es suficiente para respuesta rápida sin quemar CPU
+# --- COMPRESIÓN DE RESPUESTAS (v14.2) ---
+# Sobre negociado: el cliente declara en cada request qué codificaciones acepta
+# ("accept_encoding") y solo se comprime si la respuesta supera el umbral.
+# Cabecera mínima: {"encoding": "zlib", "original_length": N, "data": "<base64>"}
 
-                # 2. DETECCIÓN DE PADRE MUERTO (Suicide Protocol)
-                if sys.stdin.closed:
-                    sys.exit(0)
+try:
+    import lz4.frame as lz4_frame # Codec rápido opcional (pip install lz4)
+except ImportError:
+    lz4_frame = None
 
-                # Leer línea de stdin
-                line = sys.stdin.readline()
-                if not line:
-                    # EOF recibido (padre cerró el stream)
-                    sys.exit(0)
-                
-                line = line.strip()
-                if not line:
-                    continue
+COMPRESSION_THRESHOLD = 64 * 1024 # Bytes de JSON a partir de los cuales vale la pena comprimir
+ZLIB_LEVEL = 3 # Nivel bajo: el cuello de botella es el pipe, no el tamaño final
 
-                # Procesar Request
-                try:
-                    req = json.loads(line)
-                    cmd = req.get('command')
-                    payload = req.get('payload', {})
-                    
-                    # Logica de args (shim para compatibilidad con funcion process_command)
-                    # En modo listen, todo viene en payload
-                    
-                    result = process_command(cmd, payload, None)
-                    
-                    # Responder
-                    print(json.dumps(result, default=str))
-                    sys.stdout.flush() # CRITICO: Enviar inmediatamente
+_COMPRESSION_THRESHOLD_CACHE = None
 
-                except json.JSONDecodeError:
-                    print(json.dumps({"status": "error", "message": "JSON invalido"}, default=str))
-                    sys.stdout.flush()
-                    
-            except KeyboardInterrupt:
-                sys.exit(0)
-            except Exception as e:
-                # 3. LOGGING CONTROLADO Y WAIT
-                # Si falla el bucle (ej. stdin roto), esperar antes de reintentar o morir
-                try:
-                    print(json.dumps({"status": "error", "message": f"Loop Error: {str(e)}"}, default=str))
-                    sys.stdout.flush()
-                except:
-                    pass
-                time.sleep(1.0) # Espera larga si hay error grave
+def get_supported_encodings():
+    """Codificaciones disponibles en este bridge, en orden de preferencia."""
+    encodings = ['zlib']
+    if lz4_frame is not None:
+        encodings.insert(0, 'lz4')
+    return encodings
 
-    # --- MODE 2: ONE-SHOT (LEGACY) ---
+def get_compression_threshold():
+    global _COMPRESSION_THRESHOLD_CACHE
+    if _COMPRESSION_THRESHOLD_CACHE is None:
+        try:
+            _COMPRESSION_THRESHOLD_CACHE = int(load_config().get('compression_threshold', COMPRESSION_THRESHOLD))
+        except (TypeError, ValueError):
+            _COMPRESSION_THRESHOLD_CACHE = COMPRESSION_THRESHOLD
+    return _COMPRESSION_THRESHOLD_CACHE
+
+def negotiate_encoding(accepted):
+    """Elige la mejor codificación común con el cliente. None = JSON plano."""
+    if not accepted:
+        return None
+    if isinstance(accepted, str):
+        accepted = accepted.split(',')
+    accepted = [str(a).strip().lower() for a in accepted]
+    for enc in get_supported_encodings():
+        if enc in accepted:
+            return enc
+    return None
+
+def encode_response(result, accept_encoding=None):
+    """Serializa la respuesta a una línea JSON, comprimida si fue negociado y supera el umbral."""
+    body = json.dumps(result, default=str)
+    encoding = negotiate_encoding(accept_encoding)
+    if encoding is None or len(body) < get_compression_threshold():
+        return body
+
+    raw = body.encode('utf-8')
+    if encoding == 'lz4':
+        packed = lz4_frame.compress(raw)
     else:
-        payload = None
-        if args.stdin:
-            try:
-                stdin_data = sys.stdin.read().strip()
-                if stdin_data:
-                    try:
-                        payload = json.loads(base64.b64decode(stdin_data).decode('utf-8'))
-                    except:
-                        payload = json.loads(stdin_data)
-            except:
-                pass
-        
-        # Shim para process_command con CLI args
-        # Convertimos args a objeto compatible o usamos payload
-        # process_command usa args_obj para .code, .id, etc.
-        res = process_command(args.command, payload, args)
-        print(json.dumps(res, default=str))
+        packed = zlib.compress(raw, ZLIB_LEVEL)
 
-# --- ESTÁNDARES DE MATERIALES (v12.0) ---
+    # Si no hay ganancia real (base64 agrega ~33%), enviar plano
+    if len(packed) * 4 // 3 >= len(raw):
+        return body
 
-DEFAULT_STANDARDS = [
-    {"Descripcion": "ACERO ASTM A36 1/8\"", "Categoria": "ACERO"},
+    return json.dumps({
+        "encoding": encoding,
+        "original_length": len(raw),
+        "data": base64.b64encode(packed).decode('ascii')
+    })
+
+_STDOUT_LOCK = threading.Lock() # Eventos de hilos en segundo plano: una línea a la vez
+
+def write_response(result, accept_encoding=None):
+    with measure_phase('json'):
+        line = encode_response(result, accept_encoding)
+    with measure_phase('write'), _STDOUT_LOCK:
+        print(line)
+        sys.stdout.flush() # CRITICO: Enviar inmediatamente
+
+def get_encoding_info():
+    return {"encodings": get_supported_encodings(), "threshold": get_compression_threshold()}
+
+# --- RESPUESTAS EN STREAMING NDJSON (v14.2) ---
+# Para lecturas grandes el bridge emite una línea por lote:
+#   {"request_id": ..., "chunk": n, "rows": [...]}
+# y una línea final {"request_id": ..., "done": true, "chunks": n, "total": N}.
+# La memoria queda acotada a un lote y la UI puede pintar desde el primer chunk.
+
+STREAM_BATCH_SIZE = 1000
+
+# Cada lote se codifica con los mismos codificadores por columna (encode_records), fijados
+# con la columna completa: nulos y precisión de fechas salen de una consulta de agregados,
+# así todos los chunks (y la respuesta sin streaming) usan el mismo formato.
+
+_STREAM_DATETIME_FLAGS = {
+    # (tiene hora, tiene milisegundos, tiene microsegundos) de la columna completa
+    'mssql': ("MAX(CASE WHEN CAST({c} AS TIME) <> '00:00:00' THEN 1 ELSE 0 END)",
+              "MAX(CASE WHEN DATEPART(MICROSECOND, {c}) <> 0 THEN 1 ELSE 0 END)",
+              "MAX(CASE WHEN DATEPART(MICROSECOND, {c}) % 1000 <> 0 THEN 1 ELSE 0 END)"),
+    # El sustituto guarda TIMESTAMP como texto ISO ('YYYY-MM-DD HH:MM:SS[.ffffff]')
+    'sqlite': ("MAX(CASE WHEN substr({c}, 12) NOT IN ('', '00:00:00') THEN 1 ELSE 0 END)",
+               "MAX(CASE WHEN CAST(substr({c} || '.000000', 21, 6) AS INTEGER) <> 0 THEN 1 ELSE 0 END)",
+               "MAX(CASE WHEN CAST(substr({c} || '.000000', 21, 6) AS INTEGER) % 1000 <> 0 THEN 1 ELSE 0 END)"),
+}
+
+# SQLite no fija el tipo por columna: los tipos guardados salen del agregado (typeof)
+_SQLITE_STORAGE_KINDS = {'integer': int, 'real': float, 'text': str}
+
+def stream_column_encoders(query, columns, first_rows, params=None):
+    """Codificadores de encode_records para todo el resultado de query (sin ORDER BY).
+    Los tipos salen del primer lote; nulos y precisión de fechas, de la columna completa."""
+    kinds = [{type(row[i]) for row in first_rows if row[i] is not None} for i in range(len(columns))]
+    names = [f"q.{_quote_identifier(column)}" for column in columns]
+    sqlite = get_dialect() == 'sqlite'
+    with get_engine().connect() as conn:
+        for i, kind in enumerate(kinds):
+            if not kind: # Todo nulo en el primer lote: el tipo lo da una fila cualquiera
+                sample = conn.execute(text(f"SELECT TOP 1 {names[i]} FROM ({query}) q WHERE {names[i]} IS NOT NULL"),
+                                      params or {}).fetchone()
+                kinds[i] = {type(sample[0])} if sample else set()
+        dates = [i for i, kind in enumerate(kinds) if _is_datetime_kinds(kind)]
+        flags = _STREAM_DATETIME_FLAGS[get_dialect()]
+        items = ["COUNT(*)"] + [f"COUNT({name})" for name in names]
+        items += [flag.format(c=names[i]) for i in dates for flag in flags]
+        if sqlite:
+            items += [f"group_concat(DISTINCT typeof({name}))" for name in names]
+        stats = conn.execute(text(f"SELECT {', '.join(items)} FROM ({query}) q"), params or {}).fetchone()
+
+    total, counts = stats[0], stats[1:len(columns) + 1]
+    offset = len(columns) + 1
+    date_flags = {i: [bool(value) for value in stats[offset + 3 * n:offset + 3 * n + 3]] for n, i in enumerate(dates)}
+    if sqlite:
+        for i, stored in enumerate(stats[offset + 3 * len(dates):]):
+            if i not in date_flags: # Las fechas se guardan como texto y el conversor ya las tipó
+                kinds[i] = {_SQLITE_STORAGE_KINDS.get(kind, bytes) for kind in (stored or '').split(',') if kind != 'null'}
+    return [_column_encoder(kinds[i] if counts[i] else set(), counts[i] < total,
+                            _datetime_format(*date_flags[i]) if i in date_flags else None)
+            for i in range(len(columns))]
+
+def iter_query_records(query, order_by='', params=None, batch_size=STREAM_BATCH_SIZE):
+    """Recorre el cursor en lotes de registros ya codificados sin materializar el resultado completo."""
+    engine = get_engine()
+    with engine.connect() as conn:
+        result = conn.execution_options(stream_results=True).execute(text(f"{query} {order_by}".rstrip()), params or {})
+        columns = list(result.keys())
+        rows = result.fetchmany(batch_size)
+        if not rows:
+            return
+        encoders = stream_column_encoders(query, columns, rows, params)
+        while rows:
+            with measure_phase('sanitize'):
+                encoded = [[encoder(row[i]) for row in rows] for i, encoder in enumerate(encoders)]
+                records = [dict(zip(columns, values)) for values in zip(*encoded)]
+            yield records
+            rows = result.fetchmany(batch_size)
+
+def stream_master_catalog(batch_size=STREAM_BATCH_SIZE):
+    return iter_query_records("SELECT * FROM Tbl_Maestro_Piezas", "ORDER BY Codigo_Pieza", batch_size=batch_size)
+
+def stream_pending_tasks(batch_size=STREAM_BATCH_SIZE):
+    return iter_query_records(pending_query(*conflict_summary_source()), batch_size=batch_size)
+
+STREAMABLE_COMMANDS = {
+    'get_all': stream_master_catalog,
+    'catalog': stream_master_catalog,
+    'get_pending': stream_pending_tasks,
+}
+
+def write_stream(cmd, request_id=None, batch_size=None, accept_encoding=None):
+    """Emite el resultado de un comando streamable como frames NDJSON."""
+    chunk = 0
+    total = 0
+    try:
+        batch_size = int(batch_size) if batch_size else STREAM_BATCH_SIZE
+        for rows in STREAMABLE_COMMANDS[cmd](batch_size):
+            write_response({"request_id": request_id, "chunk": chunk, "rows": rows}, accept_encoding)
+            chunk += 1
+            total += len(rows)
+        write_response({"request_id": request_id, "done": True, "status": "success", "chunks": chunk, "total": total})
+    except Exception as e:
+        mark_command_error()
+        write_response({"request_id": request_id, "done": True, "status": "error", "message": str(e), "chunks": chunk, "total": total})
+
+# --- ESTÁNDARES DE MATERIALES (v12.0) ---
+
+DEFAULT_STANDARDS = [
+    {"Descripcion": "ACERO ASTM A36 1/8\"", "Categoria": "ACERO"},
     {"Descripcion": "ACERO ASTM A36 3/16\"", "Categoria": "ACERO"},
     {"Descripcion": "ACERO ASTM A36 C.10", "Categoria": "ACERO"},
     {"Descripcion": "ACERO ASTM A36 C.14", "Categoria": "ACERO"},
@@ -1111,46 +2714,183 @@ DEFAULT_STANDARDS = [
     {"Descripcion": "PERFIL DE ALUMINIO TIPO ESCALON ABATIBLE 3.10 MT 6061-T6", "Categoria": "ALUMINIO"}
 ]
 
-def ensure_standards_table():
-    engine = get_engine()
-    
-    # 1. Crear tabla si no existe
-    create_table_query = """
-    IF NOT EXISTS (SELECT * FROM sysobjects WHERE name='Tbl_Estandares_Materiales' AND xtype='U')
-    BEGIN
-        CREATE TABLE Tbl_Estandares_Materiales (
-            ID INT IDENTITY(1,1) PRIMARY KEY, 
-            Descripcion NVARCHAR(400) UNIQUE NOT NULL, 
-            Categoria NVARCHAR(100)
-        )
-    END
-    """
-    
+# --- ESQUEMA VERSIONADO (v14.2) ---
+# Las migraciones v12/v13.1 se aplican UNA sola vez por base de datos y quedan
+# registradas en Tbl_Version_Esquema. En el proceso se cachea "esquema al día"
+# para no repetir DDL ni COUNT(*) en cada lectura.
+
+_SCHEMA_CURRENT = False
+
+# Errores de "ya existe" que una migración idempotente puede ignorar:
+# 2705 columna duplicada, 2714 objeto ya existe, 1913 índice ya existe (SQL Server)
+_ALREADY_EXISTS_MARKERS = ('2705', '2714', '1913', 'already exists', 'duplicate column name')
+
+def _is_already_exists_error(error):
+    message = str(getattr(error, 'orig', None) or error).lower()
+    return any(marker in message for marker in _ALREADY_EXISTS_MARKERS)
+
+def _add_column_if_missing(conn, table, column, definition):
     try:
-        with engine.begin() as conn:
-            conn.execute(text(create_table_query))
-            
-            # 2. Verificar si está vacía para sembrar datos
-            res = conn.execute(text("SELECT COUNT(*) FROM Tbl_Estandares_Materiales")).fetchone()
-            count = res[0] if res else 0
-            
-            if count == 0:
-                print("Sembrando Tbl_Estandares_Materiales con datos por defecto...")
-                insert_query = text("INSERT INTO Tbl_Estandares_Materiales (Descripcion, Categoria) VALUES (:d, :c)")
-                for item in DEFAULT_STANDARDS:
-                    try:
-                        conn.execute(insert_query, {"d": item["Descripcion"], "c": item["Categoria"]})
-                    except:
-                        pass # Ignorar duplicados si por alguna razón fallara la lógica de conteo
-    except Exception as e:
-        print(f"Error inicializando tabla de estándares: {e}")
+        with conn.begin_nested(): # SAVEPOINT: el error no invalida la transacción
+            conn.execute(text(f"ALTER TABLE {table} ADD {column} {definition}"))
+    except sqlalchemy.exc.DBAPIError as e:
+        if not _is_already_exists_error(e):
+            raise
+
+def _migrate_v12_standards(conn):
+    conn.execute(text("""
+        IF NOT EXISTS (SELECT * FROM sysobjects WHERE name='Tbl_Estandares_Materiales' AND xtype='U')
+        BEGIN
+            CREATE TABLE Tbl_Estandares_Materiales (
+                ID INT IDENTITY(1,1) PRIMARY KEY, 
+                Descripcion NVARCHAR(400) UNIQUE NOT NULL, 
+                Categoria NVARCHAR(100)
+            )
+        END
+    """))
+
+    # Sembrar solo si está vacía (bases que ya tenían la tabla conservan su catálogo)
+    count = conn.execute(text("SELECT COUNT(*) FROM Tbl_Estandares_Materiales")).scalar() or 0
+    if count == 0:
+        merge_standards(conn, DEFAULT_STANDARDS)
+
+def _migrate_v13_1_sources(conn):
+    conn.execute(text("""
+        IF NOT EXISTS (SELECT * FROM sysobjects WHERE name='Tbl_Fuentes_Datos' AND xtype='U')
+        BEGIN
+            CREATE TABLE Tbl_Fuentes_Datos (
+                ID INT IDENTITY(1,1) PRIMARY KEY,
+                Nombre_Logico NVARCHAR(255),
+                Ruta_Actual NVARCHAR(MAX),
+                Ultima_Sincronizacion DATETIME,
+                Estado NVARCHAR(50) DEFAULT 'ACTIVO'
+            )
+        END
+    """))
+
+def _migrate_v13_1_columns(conn):
+    # Columna Simetria en Maestro
+    _add_column_if_missing(conn, 'Tbl_Maestro_Piezas', 'Simetria', 'NVARCHAR(100)')
+    # Columnas de Auditoría Extendida (cada una por separado: antes, si la primera
+    # ya existía, las otras dos nunca se creaban)
+    _add_column_if_missing(conn, 'Tbl_Auditoria_Conflictos', 'Simetria_Excel', 'NVARCHAR(100)')
+    _add_column_if_missing(conn, 'Tbl_Auditoria_Conflictos', 'Proceso_Primario_Excel', 'NVARCHAR(100)')
+    _add_column_if_missing(conn, 'Tbl_Auditoria_Conflictos', 'Tipo_Conflicto', 'NVARCHAR(50)')
+
+def _create_index_if_missing(conn, name, table, columns, optional=False):
+    try:
+        with conn.begin_nested():
+            conn.execute(text(f"CREATE INDEX {name} ON {table} ({columns})"))
+    except sqlalchemy.exc.DBAPIError as e:
+        if _is_already_exists_error(e):
+            return
+        if not optional:
+            raise
+        # p.ej. 1919: la columna es NVARCHAR(MAX) y no admite índice
+        log_update(f"Índice opcional {name} omitido: {e}", 'WARNING')
+
+def _migrate_v14_2_search_indexes(conn):
+    # Índices para search_catalog: prefijo de código (seek) y descripción (scan angosto)
+    _create_index_if_missing(conn, 'IX_Maestro_Codigo_Pieza', 'Tbl_Maestro_Piezas', 'Codigo_Pieza')
+    _create_index_if_missing(conn, 'IX_Maestro_Descripcion', 'Tbl_Maestro_Piezas', 'Descripcion', optional=True)
+
+def _migrate_v14_2_conflict_summary(conn):
+    conn.execute(dialect_text(
+        mssql="""
+        IF NOT EXISTS (SELECT * FROM sysobjects WHERE name='Tbl_Resumen_Conflictos' AND xtype='U')
+        BEGIN
+            CREATE TABLE Tbl_Resumen_Conflictos (
+                Id INT NOT NULL,
+                Codigo_Pieza NVARCHAR(255),
+                Desc_Excel NVARCHAR(MAX),
+                Desc_Master NVARCHAR(MAX),
+                Nombre_Archivo NVARCHAR(255),
+                Nombre_Hoja NVARCHAR(255),
+                Numero_Fila_Excel INT
+            )
+        END
+        """,
+        sqlite="""
+        CREATE TABLE IF NOT EXISTS Tbl_Resumen_Conflictos (
+            Id INTEGER NOT NULL,
+            Codigo_Pieza TEXT COLLATE NOCASE,
+            Desc_Excel TEXT COLLATE NOCASE,
+            Desc_Master TEXT COLLATE NOCASE,
+            Nombre_Archivo TEXT,
+            Nombre_Hoja TEXT,
+            Numero_Fila_Excel INTEGER
+        )
+        """
+    ))
+    _create_index_if_missing(conn, 'IX_Resumen_Conflictos_Id', CONFLICT_SUMMARY_TABLE, 'Id')
+    _create_index_if_missing(conn, 'IX_Resumen_Conflictos_Codigo', CONFLICT_SUMMARY_TABLE, 'Codigo_Pieza')
+    # El refresco por código filtra la vista por Codigo_Pieza + bandera pendiente
+    _create_index_if_missing(conn, 'IX_Historial_Proyectos_Pendientes', 'Tbl_Historial_Proyectos', 'Codigo_Pieza, Requiere_Correccion', optional=True)
+    # Se llena en la primera lectura (ensure_conflict_summary), fuera de la migración
+
+# (versión, descripción, paso). Nunca reordenar ni renumerar: solo agregar al final.
+SCHEMA_MIGRATIONS = [
+    (1, "v12.0 Tbl_Estandares_Materiales + semilla", _migrate_v12_standards),
+    (2, "v13.1 Tbl_Fuentes_Datos", _migrate_v13_1_sources),
+    (3, "v13.1 Simetria y auditoría extendida", _migrate_v13_1_columns),
+    (4, "v14.2 Índices de búsqueda del catálogo", _migrate_v14_2_search_indexes),
+    (5, "v14.2 Resumen de conflictos mantenido", _migrate_v14_2_conflict_summary),
+]
+
+def get_applied_schema_versions(conn):
+    conn.execute(text("""
+        IF NOT EXISTS (SELECT * FROM sysobjects WHERE name='Tbl_Version_Esquema' AND xtype='U')
+        BEGIN
+            CREATE TABLE Tbl_Version_Esquema (
+                Version INT PRIMARY KEY,
+                Descripcion NVARCHAR(255),
+                Fecha_Aplicacion DATETIME
+            )
+        END
+    """))
+    return {row[0] for row in conn.execute(text("SELECT Version FROM Tbl_Version_Esquema"))}
+
+def ensure_schema():
+    """Aplica las migraciones pendientes una sola vez por proceso."""
+    global _SCHEMA_CURRENT
+    if _SCHEMA_CURRENT:
+        return
+
+    engine = get_engine()
+    with engine.begin() as conn:
+        applied = get_applied_schema_versions(conn)
+
+    for version, description, step in SCHEMA_MIGRATIONS:
+        if version in applied:
+            continue
+        log_update(f"Aplicando migración de esquema {version}: {description}")
+        try:
+            with engine.begin() as conn:
+                step(conn)
+                conn.execute(text("INSERT INTO Tbl_Version_Esquema (Version, Descripcion, Fecha_Aplicacion) VALUES (:v, :d, GETDATE())"), {"v": version, "d": description})
+        except sqlalchemy.exc.IntegrityError:
+            pass # Otra estación aplicó la misma versión al mismo tiempo (pasos idempotentes)
+
+    _SCHEMA_CURRENT = True
+
+def get_schema_status():
+    engine = get_engine()
+    with engine.begin() as conn:
+        applied = get_applied_schema_versions(conn)
+    return {
+        "status": "success",
+        "applied": sorted(applied),
+        "latest": SCHEMA_MIGRATIONS[-1][0],
+        "current": all(version in applied for version, _, _ in SCHEMA_MIGRATIONS)
+    }
 
+@served_by_replica(_replica_standards, 'Tbl_Estandares_Materiales')
 def get_standards():
-    ensure_standards_table() # Asegurar existencia antes de leer
+    ensure_schema() # Asegurar existencia antes de leer (una sola vez por proceso)
     engine = get_engine()
     with engine.connect() as conn:
-        df = pd.read_sql("SELECT * FROM Tbl_Estandares_Materiales ORDER BY Descripcion ASC", conn)
-    return sanitize(df).to_dict(orient='records')
+        df = read_sql("SELECT * FROM Tbl_Estandares_Materiales ORDER BY Descripcion ASC", conn)
+    return to_records(df)
 
 def add_standard(desc, cat="GENERAL"):
     engine = get_engine()
@@ -1163,6 +2903,126 @@ def add_standard(desc, cat="GENERAL"):
             return {"status": "error", "message": "El material ya existe en la biblioteca."}
         return {"status": "error", "message": str(e)}
 
+# --- IMPORTACIÓN MASIVA DE ESTÁNDARES (v14.2) ---
+# JSON o CSV -> validación -> tabla staging (#temp, fast_executemany) -> un solo MERGE.
+
+STANDARD_DESC_MAX = 400
+STANDARD_CAT_MAX = 100
+MAX_REJECTED_DETAIL = 50
+
+def _read_standards_file(path):
+    with open(path, 'rb') as f:
+        raw = f.read()
+    try:
+        content = raw.decode('utf-8-sig')
+    except UnicodeDecodeError:
+        content = raw.decode('latin-1') # CSV exportado por Excel en Windows
+    if path.lower().endswith('.json'):
+        return json.loads(content)
+    return content
+
+def _parse_standards_csv(content):
+    try:
+        dialect = csv.Sniffer().sniff(content[:4096], delimiters=',;\t') # Excel en español exporta con ';'
+    except csv.Error:
+        dialect = csv.excel
+    rows = list(csv.reader(io.StringIO(content), dialect))
+    if not rows:
+        return []
+    header = [h.strip().lower() for h in rows[0]]
+    if 'descripcion' in header or 'descripción' in header:
+        desc_idx = header.index('descripcion') if 'descripcion' in header else header.index('descripción')
+        cat_idx = header.index('categoria') if 'categoria' in header else (header.index('categoría') if 'categoría' in header else None)
+        rows = rows[1:]
+    else:
+        desc_idx, cat_idx = 0, 1 # Sin encabezado: Descripcion, Categoria
+    return [{
+        "Descripcion": row[desc_idx] if len(row) > desc_idx else "",
+        "Categoria": row[cat_idx] if cat_idx is not None and len(row) > cat_idx else ""
+    } for row in rows if any(cell.strip() for cell in row)]
+
+def parse_standards_payload(payload):
+    """Acepta {"items": [...]}, {"csv": "..."} o {"path": "archivo.csv|json"}."""
+    source = payload.get('items')
+    if source is None and payload.get('path'):
+        source = _read_standards_file(payload['path'])
+    if source is None:
+        source = payload.get('csv', '')
+
+    if isinstance(source, str):
+        return _parse_standards_csv(source)
+    # JSON: lista de objetos o de descripciones sueltas
+    return [item if isinstance(item, dict) else {"Descripcion": item} for item in source]
+
+def validate_standards(items):
+    """Normaliza y separa en (válidos, duplicados dentro del lote, rechazados)."""
+    valid = []
+    rejected = []
+    duplicates = 0
+    seen = set()
+    for idx, item in enumerate(items):
+        desc = _clean_text(str(item.get('Descripcion') or '')).strip()
+        cat = _clean_text(str(item.get('Categoria') or '')).strip() or 'GENERAL'
+        if not desc:
+            rejected.append({"row": idx, "reason": "Descripción vacía"})
+        elif len(desc) > STANDARD_DESC_MAX:
+            rejected.append({"row": idx, "reason": f"Descripción excede {STANDARD_DESC_MAX} caracteres"})
+        elif len(cat) > STANDARD_CAT_MAX:
+            rejected.append({"row": idx, "reason": f"Categoría excede {STANDARD_CAT_MAX} caracteres"})
+        elif desc.upper() in seen: # La collation del servidor no distingue mayúsculas
+            duplicates += 1
+        else:
+            seen.add(desc.upper())
+            valid.append({"d": desc, "c": cat})
+    return valid, duplicates, rejected
+
+def merge_standards(conn, items):
+    """Carga estándares en staging y hace MERGE en una sola sentencia. Devuelve conteos."""
+    valid, batch_duplicates, rejected = validate_standards(items)
+    inserted = 0
+    if valid:
+        conn.execute(text("CREATE TABLE #Stg_Estandares (Descripcion NVARCHAR(400), Categoria NVARCHAR(100))"))
+        try:
+            conn.execute(text("INSERT INTO #Stg_Estandares (Descripcion, Categoria) VALUES (:d, :c)"), valid)
+            result = conn.execute(dialect_text(
+                mssql="""
+                MERGE Tbl_Estandares_Materiales AS target
+                USING #Stg_Estandares AS source
+                ON (target.Descripcion = source.Descripcion)
+                WHEN NOT MATCHED BY TARGET THEN
+                    INSERT (Descripcion, Categoria) VALUES (source.Descripcion, source.Categoria);
+                """,
+                sqlite="""
+                INSERT INTO Tbl_Estandares_Materiales (Descripcion, Categoria)
+                SELECT source.Descripcion, source.Categoria FROM #Stg_Estandares AS source
+                WHERE NOT EXISTS (SELECT 1 FROM Tbl_Estandares_Materiales target WHERE target.Descripcion = source.Descripcion)
+                """
+            ))
+            inserted = max(result.rowcount, 0)
+        finally:
+            conn.execute(text("DROP TABLE #Stg_Estandares"))
+    return {
+        "received": len(items),
+        "inserted": inserted,
+        "duplicates": batch_duplicates + len(valid) - inserted,
+        "rejected": len(rejected),
+        "rejected_items": rejected[:MAX_REJECTED_DETAIL]
+    }
+
+def import_standards(payload):
+    global _STANDARDS_CACHE
+    try:
+        items = parse_standards_payload(payload or {})
+        ensure_schema()
+        engine = get_bulk_engine()
+        with engine.begin() as conn:
+            summary = merge_standards(conn, items)
+        _STANDARDS_CACHE = None # El homologador debe ver los nuevos materiales
+        log_update(f"import_standards: {summary['inserted']} nuevos, {summary['duplicates']} duplicados, {summary['rejected']} rechazados")
+        return {"status": "success", **summary}
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+
 def edit_standard(id, new_desc):
     engine = get_engine()
     try:
@@ -1184,37 +3044,55 @@ def delete_standard(id):
 # --- SMART HOMOLOGATOR (v12.1) ---
 
 _STANDARDS_CACHE = None
+_STANDARD_MATCHERS = None
+
+SUGGESTION_MIN_RATIO = 0.60
+
+def load_standards_cache():
+    global _STANDARDS_CACHE, _STANDARD_MATCHERS
+    # Cargar estándares si no están en cache (Optimización sugerida)
+    if _STANDARDS_CACHE is None:
+        engine = get_engine()
+        with engine.connect() as conn:
+            df = read_sql("SELECT Descripcion FROM Tbl_Estandares_Materiales", conn)
+            _STANDARDS_CACHE = df['Descripcion'].tolist()
+        _STANDARD_MATCHERS = None
+    return _STANDARDS_CACHE
+
+def best_standard_match(dirty_clean):
+    """Mejor estándar para un texto ya normalizado (strip + upper). Devuelve (estándar, ratio)."""
+    global _STANDARD_MATCHERS
+    standards = load_standards_cache()
+    if _STANDARD_MATCHERS is None:
+        # difflib indexa la segunda secuencia: se indexa cada estándar una sola vez
+        _STANDARD_MATCHERS = [(standard, difflib.SequenceMatcher(None, '', standard.upper())) for standard in standards]
+
+    best_match = None
+    highest_ratio = 0.0
+    for standard, matcher in _STANDARD_MATCHERS:
+        matcher.set_seq1(dirty_clean)
+        # Cotas superiores baratas: si no pueden superar al mejor, no calcular ratio()
+        if matcher.real_quick_ratio() <= highest_ratio or matcher.quick_ratio() <= highest_ratio:
+            continue
+        ratio = matcher.ratio()
+        if ratio > highest_ratio:
+            highest_ratio = ratio
+            best_match = standard
+    return best_match, highest_ratio
 
 def get_match_suggestion(dirty_text):
-    global _STANDARDS_CACHE
     if not dirty_text:
         return None
         
     try:
-        # 1. Cargar estándares si no están en cache (Optimización sugerida)
-        if _STANDARDS_CACHE is None:
-            engine = get_engine()
-            with engine.connect() as conn:
-                df = pd.read_sql("SELECT Descripcion FROM Tbl_Estandares_Materiales", conn)
-                _STANDARDS_CACHE = df['Descripcion'].tolist()
-        
-        if not _STANDARDS_CACHE:
+        if not load_standards_cache():
             return None
             
-        best_match = None
-        highest_ratio = 0.0
-        
-        dirty_clean = dirty_text.strip().upper()
-        
-        # 2. Lógica Fuzzy con SequenceMatcher
-        for standard in _STANDARDS_CACHE:
-            ratio = difflib.SequenceMatcher(None, dirty_clean, standard.upper()).ratio()
-            if ratio > highest_ratio:
-                highest_ratio = ratio
-                best_match = standard
+        # Lógica Fuzzy con SequenceMatcher
+        best_match, highest_ratio = best_standard_match(dirty_text.strip().upper())
                 
-        # 3. Retornar solo si supera el 60% (Umbral CRÍTICO)
-        if highest_ratio >= 0.60:
+        # Retornar solo si supera el 60% (Umbral CRÍTICO)
+        if highest_ratio >= SUGGESTION_MIN_RATIO:
             return {"suggestion": best_match, "ratio": round(highest_ratio, 2)}
         else:
             return None
@@ -1222,83 +3100,2069 @@ def get_match_suggestion(dirty_text):
     except Exception as e:
         return {"status": "error", "message": str(e)}
 
-# --- EXECUTION ---
-if __name__ == "__main__":
-    import argparse
-    parser = argparse.ArgumentParser()
-    parser.add_argument('command', help='API Command')
-    parser.add_argument('--code', help='Part code')
-    parser.add_argument('--id', help='Task ID')
-    parser.add_argument('--stdin', action='store_true', help='Read payload from stdin (base64)')
-    parser.add_argument('--force_resolve', action='store_true', help='Force resolution')
-    parser.add_argument('--status', help='Custom resolution status')
-    
-    args = parser.parse_known_args()[0]
-    
-    payload = None
-    if args.stdin:
+# --- AUTO-RESOLUCIÓN MASIVA DE CONFLICTOS (v14.2) ---
+# resolve_conflicts_bulk evalúa una regla sobre todos los conflictos PENDIENTE y,
+# fuera de dry_run, aplica maestro + auditoría + historial en sentencias de conjunto.
+#   standard_match   -> Desc_Excel es exactamente un estándar: se adopta ese estándar
+#   suggestion_ratio -> el homologador sugiere un estándar con ratio >= min_ratio
+#   whitespace_case  -> Excel y maestro solo difieren en espacios/mayúsculas: se conserva el maestro
+
+CONFLICT_RULES = ('standard_match', 'suggestion_ratio', 'whitespace_case')
+MAX_PREVIEW_ROWS = 500
+
+def _normalize_description(value):
+    return ' '.join(str(value or '').split()).upper()
+
+def evaluate_conflict_rule(rule, conflicts, min_ratio=0.9):
+    """Devuelve las resoluciones que la regla produce para las filas (ID, Codigo, Desc_Excel, Desc_Master)."""
+    resolutions = []
+    standards_by_key = {}
+    if rule == 'standard_match':
+        standards_by_key = {_normalize_description(std): std for std in load_standards_cache()}
+
+    for conflict_id, code, desc_excel, desc_master in conflicts:
+        if not desc_excel:
+            continue
+        new_desc = None
+        status = 'CORREGIDO'
+        ratio = None
+        if rule == 'standard_match':
+            new_desc = standards_by_key.get(_normalize_description(desc_excel))
+        elif rule == 'suggestion_ratio':
+            match, ratio = best_standard_match(desc_excel.strip().upper())
+            if match and ratio >= min_ratio:
+                new_desc = match
+                ratio = round(ratio, 2)
+        elif rule == 'whitespace_case':
+            if desc_master and _normalize_description(desc_excel) == _normalize_description(desc_master):
+                new_desc = desc_master
+                status = 'IGNORADO'
+
+        if new_desc is not None:
+            resolutions.append({
+                "id": conflict_id, "codigo": code,
+                "desc_excel": desc_excel, "desc_master": desc_master,
+                "descripcion_nueva": new_desc, "estado": status,
+                "actualiza_maestro": status == 'CORREGIDO' and new_desc != desc_master,
+                "ratio": ratio
+            })
+    return resolutions
+
+def _apply_conflict_resolutions(conn, resolutions):
+    conn.execute(text("""
+        CREATE TABLE #Auto_Resolucion (
+            ID INT, Codigo_Pieza NVARCHAR(255), Descripcion_Nueva NVARCHAR(MAX),
+            Estado NVARCHAR(50), Actualizar_Maestro BIT
+        )
+    """))
+    try:
+        conn.execute(text("INSERT INTO #Auto_Resolucion VALUES (:id, :c, :d, :s, :u)"), [{
+            'id': r['id'], 'c': r['codigo'], 'd': r['descripcion_nueva'],
+            's': r['estado'], 'u': 1 if r['actualiza_maestro'] else 0
+        } for r in resolutions])
+
+        conn.execute(text("""
+            UPDATE m SET Descripcion = r.Descripcion_Nueva, Ultima_Actualizacion = GETDATE()
+            FROM Tbl_Maestro_Piezas m
+            JOIN #Auto_Resolucion r ON m.Codigo_Pieza = r.Codigo_Pieza
+            WHERE r.Actualizar_Maestro = 1
+        """))
+        conn.execute(text("""
+            UPDATE a SET Estado = r.Estado
+            FROM Tbl_Auditoria_Conflictos a
+            JOIN #Auto_Resolucion r ON a.ID = r.ID
+        """))
+        conn.execute(text("""
+            UPDATE hp SET Requiere_Correccion = 0, Estado_Resolucion = r.Estado
+            FROM Tbl_Historial_Proyectos hp
+            JOIN #Auto_Resolucion r ON hp.Codigo_Pieza = r.Codigo_Pieza
+        """))
+        conn.execute(text("""
+            INSERT INTO Tbl_Historial_Resoluciones
+            (Codigo_Pieza, Descripcion_Final, Estado_Resolucion, Fecha_Resolucion, Usuario)
+            SELECT Codigo_Pieza, Descripcion_Nueva, Estado, GETDATE(), 'SISTEMA' FROM #Auto_Resolucion
+        """))
+    finally:
+        conn.execute(text("DROP TABLE #Auto_Resolucion"))
+
+def resolve_conflicts_bulk(payload):
+    payload = payload or {}
+    rule = payload.get('rule')
+    if rule not in CONFLICT_RULES:
+        return {"status": "error", "message": f"Regla desconocida: {rule}. Use {', '.join(CONFLICT_RULES)}."}
+    dry_run = payload.get('dry_run', True) # Por seguridad, sin dry_run explícito solo se previsualiza
+    try:
+        min_ratio = float(payload.get('min_ratio', 0.9))
+    except (TypeError, ValueError):
+        return {"status": "error", "message": "min_ratio debe ser numérico"}
+
+    try:
+        engine = get_bulk_engine()
+        with engine.begin() as conn:
+            conflicts = conn.execute(text("""
+                SELECT ID, Codigo_Pieza, Desc_Excel, Desc_Master
+                FROM Tbl_Auditoria_Conflictos WHERE Estado = 'PENDIENTE'
+            """)).fetchall()
+            resolutions = evaluate_conflict_rule(rule, conflicts, min_ratio)
+
+            if resolutions and not dry_run:
+                log_update(f"resolve_conflicts_bulk: regla {rule}, {len(resolutions)} conflictos")
+                _apply_conflict_resolutions(conn, resolutions)
+                maintain_conflict_summary(conn, codes=[r['codigo'] for r in resolutions])
+
+        if resolutions and not dry_run:
+            sync_search_index(upserts=[(r['codigo'], r['descripcion_nueva']) for r in resolutions if r['actualiza_maestro']])
+
+        return {
+            "status": "success",
+            "rule": rule,
+            "dry_run": bool(dry_run),
+            "pending": len(conflicts),
+            "matched": len(resolutions),
+            "applied": 0 if dry_run else len(resolutions),
+            "preview": resolutions[:MAX_PREVIEW_ROWS]
+        }
+    except Exception as e:
+        log_update(f"Error in resolve_conflicts_bulk: {e}", 'ERROR')
+        return {"status": "error", "message": str(e)}
+
+# --- RESUMEN DE CONFLICTOS MANTENIDO (v14.2) ---
+# Tbl_Resumen_Conflictos es una copia indexada de V_Auditoria_Conflictos (mismas
+# columnas). Las pantallas de conflictos la leen en vez de re-evaluar la vista
+# (historial + maestro) en cada llamada.
+# - Las columnas salen de la vista real: si el DBA agrega una, se agrega también al
+#   resumen (ALTER TABLE) y se reconstruye. Sin Id o Codigo_Pieza no hay forma de
+#   mantenerlo por partes: las lecturas van directo a la vista.
+# - Las escrituras del bridge la actualizan en su MISMA transacción, solo para los
+#   códigos/Ids que tocaron (borrar + volver a copiar desde la vista).
+# - Los cambios hechos por fuera del bridge se detectan con una huella
+#   COUNT/MAX/BINARY_CHECKSUM (Id + textos) de la vista, como máximo cada
+#   CONFLICT_SUMMARY_CHECK_SECONDS.
+# - rebuild_conflict_summary la reconstruye completa.
+
+CONFLICT_SUMMARY_TABLE = 'Tbl_Resumen_Conflictos'
+CONFLICT_VIEW = 'V_Auditoria_Conflictos'
+CONFLICT_SUMMARY_KEYS = ('Id', 'Codigo_Pieza') # Llaves del refresco incremental
+CONFLICT_SUMMARY_CHECK_SECONDS = 60
+CONFLICT_SUMMARY_CHUNK = 500 # Parámetros por sentencia (SQLite admite 999)
+# Tipos que BINARY_CHECKSUM no acepta: quedan fuera de la huella
+CHECKSUM_EXCLUDED_TYPES = {'text', 'ntext', 'image', 'xml', 'sql_variant', 'geography', 'geometry', 'hierarchyid'}
+
+# get_conflicts: columnas de la vista + alias de compatibilidad con el frontend
+CONFLICT_ALIASES = [
+    ('id', ('Id',)),
+    ('codigo', ('Codigo_Pieza',)),
+    ('descripcion', ('Descripcion_Final', 'Desc_Master')),
+    ('archivo', ('Nombre_Archivo',)),
+    ('hoja', ('Nombre_Hoja',)),
+    ('fila', ('Numero_Fila_Excel',)),
+    ('desc_excel', ('Desc_Excel',)),
+]
+# get_pending: columnas en minúsculas con las llaves que espera Flutter (DATA TRANSLATOR v10.7)
+PENDING_RENAMES = {
+    'archivo_origen': 'archivo', 'nombre_archivo': 'archivo', 'file': 'archivo',
+    'nombre_hoja': 'hoja', 'sheet': 'hoja',
+    'fila_excel': 'fila', 'numero_fila_excel': 'fila', 'row': 'fila',
+    'codigo_pieza': 'codigo', 'parte': 'codigo',
+    'descripcion_excel': 'desc_excel'
+}
+PENDING_DESCRIPTION_CANDIDATES = ['descripcion_final', 'descripcion_base', 'desc_master', 'descripcion', 'desc_oficial', 'desc']
+PENDING_DEFAULTS = {'archivo': "'Desconocido.xlsx'", 'hoja': "'Sheet1'", 'fila': "0"}
+
+_CONFLICT_SUMMARY_STATE = {"checked": 0.0, "dirty": False, "columns": None, "checksum": None, "usable": True}
+_CONFLICT_SUMMARY_LOCK = threading.Lock()
+
+def _sql_literal(value):
+    return "'" + str(value).replace("'", "''") + "'"
+
+@functools.lru_cache(maxsize=32)
+def conflicts_query(source, columns, where=''):
+    """SELECT de get_conflicts: todas las columnas de la vista + alias (columna ausente -> '')."""
+    present = {column.lower(): column for column in columns}
+    items = [_quote_identifier(column) for column in columns]
+    for alias, candidates in CONFLICT_ALIASES:
+        column = next((present[c.lower()] for c in candidates if c.lower() in present), None)
+        items.append(f"{_quote_identifier(column) if column else _sql_literal('')} AS {alias}")
+    return f"SELECT {', '.join(items)} FROM {source} {where}".rstrip()
+
+@functools.lru_cache(maxsize=32)
+def pending_query(source, columns):
+    """SELECT de get_pending: columnas de la vista renombradas y con valores por defecto."""
+    present = {column.lower(): column for column in columns}
+    description = next((present[c] for c in PENDING_DESCRIPTION_CANDIDATES if c in present), None)
+    items, seen = [], set()
+    for column in columns:
+        name = 'descripcion' if column == description else PENDING_RENAMES.get(column.lower(), column.lower())
+        if name in seen or (name == 'descripcion' and column != description):
+            continue # Dos columnas con la misma llave: gana la primera (o la descripción elegida)
+        seen.add(name)
+        expression = _quote_identifier(column)
+        if name in PENDING_DEFAULTS:
+            expression = f"ISNULL({expression}, {PENDING_DEFAULTS[name]})"
+        items.append(f"{expression} AS {_quote_identifier(name)}")
+    if 'descripcion' not in seen:
+        items.append(f"{_sql_literal('Columna Descripción No Encontrada en SQL')} AS descripcion")
+    for name, default in PENDING_DEFAULTS.items():
+        if name not in seen:
+            items.append(f"{default} AS {name}")
+    return f"SELECT {', '.join(items)} FROM {source}"
+
+@functools.lru_cache(maxsize=32)
+def conflict_rows_query(source, columns, where=''):
+    """Filas de la vista tal cual (homologación)."""
+    return f"SELECT {', '.join(_quote_identifier(c) for c in columns)} FROM {source} {where}".rstrip()
+
+def _view_column_types(conn):
+    """Columna -> tipo SQL declarado de la vista, para ALTER TABLE ADD."""
+    if get_dialect() == 'sqlite':
+        return {row[1]: row[2] or '' for row in conn.exec_driver_sql(f"PRAGMA table_info({CONFLICT_VIEW})")}
+    types = {}
+    for name, data_type, length, precision, scale in conn.execute(text("""
+        SELECT COLUMN_NAME, DATA_TYPE, CHARACTER_MAXIMUM_LENGTH, NUMERIC_PRECISION, NUMERIC_SCALE
+        FROM INFORMATION_SCHEMA.COLUMNS WHERE TABLE_NAME = :t ORDER BY ORDINAL_POSITION
+    """), {"t": CONFLICT_VIEW}):
+        if length is not None and data_type.lower() not in CHECKSUM_EXCLUDED_TYPES:
+            data_type = f"{data_type}({'MAX' if length == -1 else length})"
+        elif data_type.lower() in ('decimal', 'numeric'):
+            data_type = f"{data_type}({precision}, {scale})"
+        types[name] = data_type
+    return types
+
+def _sync_summary_columns(conn):
+    """Lee las columnas reales de la vista y agrega al resumen las que falten. True si agregó alguna."""
+    state = _CONFLICT_SUMMARY_STATE
+    columns = list(conn.execute(text(f"SELECT TOP 0 * FROM {CONFLICT_VIEW}")).keys())
+    usable = all(key in columns for key in CONFLICT_SUMMARY_KEYS)
+    types = _view_column_types(conn)
+    added = []
+    if usable:
+        existing = {c.lower() for c in conn.execute(text(f"SELECT TOP 0 * FROM {CONFLICT_SUMMARY_TABLE}")).keys()}
+        for column in columns:
+            if column.lower() not in existing:
+                conn.execute(text(f"ALTER TABLE {CONFLICT_SUMMARY_TABLE} ADD {_quote_identifier(column)} {types.get(column, '')}".rstrip()))
+                added.append(column)
+        if added:
+            log_update(f"Resumen de conflictos: columnas nuevas de la vista {added}", 'INFO')
+    checksum = columns if get_dialect() == 'sqlite' else [
+        c for c in columns if str(types.get(c, '')).split('(')[0].lower() not in CHECKSUM_EXCLUDED_TYPES]
+    state.update(columns=tuple(columns), checksum=tuple(checksum), usable=usable)
+    return bool(added)
+
+def _conflict_summary_fingerprint(conn, source):
+    # BINARY_CHECKSUM (no CHECKSUM): distingue mayúsculas en columnas con intercalación CI
+    checksum = ', '.join(_quote_identifier(c) for c in _CONFLICT_SUMMARY_STATE['checksum'])
+    row = conn.execute(text(f"SELECT COUNT(*), MAX(Id), CHECKSUM_AGG(BINARY_CHECKSUM({checksum})) FROM {source}")).fetchone()
+    return [_replica_value(value) for value in row]
+
+def rebuild_conflict_summary_in(conn):
+    """Reconstrucción completa dentro de la transacción conn. Devuelve las filas copiadas."""
+    _sync_summary_columns(conn)
+    if not _CONFLICT_SUMMARY_STATE['usable']:
+        return 0
+    columns = ', '.join(_quote_identifier(c) for c in _CONFLICT_SUMMARY_STATE['columns'])
+    conn.execute(text(f"DELETE FROM {CONFLICT_SUMMARY_TABLE}"))
+    conn.execute(text(f"INSERT INTO {CONFLICT_SUMMARY_TABLE} ({columns}) SELECT {columns} FROM {CONFLICT_VIEW}"))
+    return conn.execute(text(f"SELECT COUNT(*) FROM {CONFLICT_SUMMARY_TABLE}")).scalar() or 0
+
+def _refresh_summary_keys(conn, column, keys):
+    columns = ', '.join(_quote_identifier(c) for c in _CONFLICT_SUMMARY_STATE['columns'])
+    for i in range(0, len(keys), CONFLICT_SUMMARY_CHUNK):
+        chunk = keys[i:i + CONFLICT_SUMMARY_CHUNK]
+        names = {f"k{n}": key for n, key in enumerate(chunk)}
+        in_list = ', '.join(':' + name for name in names)
+        conn.execute(text(f"DELETE FROM {CONFLICT_SUMMARY_TABLE} WHERE {column} IN ({in_list})"), names)
+        conn.execute(text(f"INSERT INTO {CONFLICT_SUMMARY_TABLE} ({columns}) SELECT {columns} FROM {CONFLICT_VIEW} WHERE {column} IN ({in_list})"), names)
+
+def maintain_conflict_summary(conn, codes=(), ids=()):
+    """Actualiza el resumen para los códigos/Ids tocados, dentro de la transacción de la escritura.
+    Si falla (p.ej. tabla aún sin migrar), se marca para reconstruir y la escritura sigue."""
+    codes = sorted({str(code) for code in codes if code})
+    ids = sorted({str(i) for i in ids if i is not None})
+    if not codes and not ids:
+        return
+    try:
+        ids = [int(i) for i in ids]
+        with conn.begin_nested(): # SAVEPOINT: un error aquí no revierte la escritura
+            if _CONFLICT_SUMMARY_STATE['columns'] is None and _sync_summary_columns(conn):
+                _CONFLICT_SUMMARY_STATE['dirty'] = True # Columnas recién agregadas: falta llenarlas
+            if not _CONFLICT_SUMMARY_STATE['usable']:
+                return # Las lecturas van directo a la vista
+            if codes:
+                _refresh_summary_keys(conn, 'Codigo_Pieza', codes)
+            if ids:
+                _refresh_summary_keys(conn, 'Id', ids)
+    except Exception as e:
+        _CONFLICT_SUMMARY_STATE['dirty'] = True
+        log_update(f"Resumen de conflictos: actualización incremental fallida, se reconstruirá: {e}", 'WARNING')
+
+def ensure_conflict_summary(force=False):
+    """Antes de leer el resumen: reconstruye si está marcado, si la vista cambió de columnas
+    o si sus datos cambiaron por fuera del bridge."""
+    ensure_schema()
+    state = _CONFLICT_SUMMARY_STATE
+    if not force and not state['dirty'] and time.time() - state['checked'] < CONFLICT_SUMMARY_CHECK_SECONDS:
+        return None
+
+    with _CONFLICT_SUMMARY_LOCK:
+        with get_engine().begin() as conn:
+            rows = None
+            added = _sync_summary_columns(conn)
+            if state['usable'] and (force or added or state['dirty']
+                                    or (_conflict_summary_fingerprint(conn, CONFLICT_VIEW)
+                                        != _conflict_summary_fingerprint(conn, CONFLICT_SUMMARY_TABLE))):
+                rows = rebuild_conflict_summary_in(conn)
+                log_update(f"Resumen de conflictos reconstruido: {rows} filas", 'INFO' if force else 'DEBUG')
+        state.update(checked=time.time(), dirty=False)
+    return rows
+
+def conflict_summary_source():
+    """(tabla, columnas) de donde leen las pantallas de conflictos, con el resumen al día."""
+    ensure_conflict_summary()
+    state = _CONFLICT_SUMMARY_STATE
+    return (CONFLICT_SUMMARY_TABLE if state['usable'] else CONFLICT_VIEW), state['columns']
+
+def rebuild_conflict_summary():
+    t0 = time.perf_counter()
+    try:
+        rows = ensure_conflict_summary(force=True)
+        result = {"status": "success", "rows": rows, "elapsed_ms": round((time.perf_counter() - t0) * 1000, 1)}
+        if not _CONFLICT_SUMMARY_STATE['usable']:
+            result['message'] = f"{CONFLICT_VIEW} no tiene {' / '.join(CONFLICT_SUMMARY_KEYS)}: se lee la vista directamente"
+        return result
+    except Exception as e:
+        log_update(f"Error in rebuild_conflict_summary: {e}", 'ERROR')
+        return {"status": "error", "message": str(e)}
+
+# --- ÍNDICE DE TRIGRAMAS PARA TYPE-AHEAD (v14.2) ---
+# El listener mantiene en memoria un índice de trigramas sobre código + descripción
+# de Tbl_Maestro_Piezas. quick_search responde en milisegundos sin ir a SQL.
+# Se construye al arrancar el listener (en segundo plano) y los comandos de
+# escritura lo mantienen al día.
+
+QUICK_SEARCH_LIMIT = 20
+QUICK_SEARCH_MIN_OVERLAP = 0.6 # Fracción mínima de trigramas de la consulta presentes
+
+def _search_normalize(value):
+    return ' '.join(str(value or '').upper().split())
+
+def _trigrams(normalized, pad_end=True):
+    padded = f" {normalized} " if pad_end else f" {normalized}"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+def _highlight_spans(field, tokens):
+    """Offsets [inicio, fin) de cada token dentro del texto original (sin distinguir mayúsculas)."""
+    upper = field.upper()
+    spans = []
+    for token in tokens:
+        start = upper.find(token)
+        while start != -1:
+            spans.append([start, start + len(token)])
+            start = upper.find(token, start + 1)
+    spans.sort()
+    merged = []
+    for span in spans:
+        if merged and span[0] <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], span[1])
+        else:
+            merged.append(span)
+    return merged
+
+class TrigramIndex:
+    """Índice invertido trigrama -> ids de documento (array compacto de uint32)."""
+
+    def __init__(self):
+        self._codes = []
+        self._descriptions = []
+        self._normalized = []
+        self._alive = bytearray()
+        self._doc_by_code = {}
+        self._postings = {}
+        self._dead = 0
+        self.built_ms = None
+        self.built_at = None
+
+    @classmethod
+    def build(cls, rows):
+        start = time.perf_counter()
+        index = cls()
+        for code, description in rows:
+            index._add(code, description)
+        index.built_ms = round((time.perf_counter() - start) * 1000, 1)
+        index.built_at = datetime.datetime.now().isoformat(timespec='seconds')
+        return index
+
+    def __len__(self):
+        return len(self._doc_by_code)
+
+    def _add(self, code, description):
+        code = str(code or '').strip()
+        if not code:
+            return
+        doc = len(self._codes)
+        normalized = _search_normalize(f"{code} {description or ''}")
+        self._codes.append(code)
+        self._descriptions.append(description or '')
+        self._normalized.append(normalized)
+        self._alive.append(1)
+        self._doc_by_code[code.upper()] = doc
+        for gram in _trigrams(normalized):
+            posting = self._postings.get(gram)
+            if posting is None:
+                self._postings[gram] = array.array('I', (doc,))
+            else:
+                posting.append(doc)
+
+    def remove(self, code):
+        doc = self._doc_by_code.pop(str(code or '').strip().upper(), None)
+        if doc is not None:
+            self._alive[doc] = 0
+            self._dead += 1
+
+    def upsert(self, code, description):
+        self.remove(code)
+        self._add(code, description)
+
+    def needs_compaction(self):
+        return self._dead > 1000 and self._dead > len(self._codes) // 4
+
+    def compact(self):
+        """Reconstruye sin documentos borrados (las postings solo crecen con los updates)."""
+        rows = [(self._codes[d], self._descriptions[d]) for d in range(len(self._codes)) if self._alive[d]]
+        fresh = TrigramIndex.build(rows)
+        self.__dict__.update(fresh.__dict__)
+
+    def search(self, query, limit=QUICK_SEARCH_LIMIT):
+        normalized = _search_normalize(query)
+        if not normalized:
+            return []
+
+        if len(normalized) < 3:
+            # Muy corto para trigramas: prefijo de código o subcadena (lineal). A igual puntaje
+            # gana el doc menor, así bastan los primeros 'limit' de cada tipo; solo se corta
+            # antes de terminar cuando ya hay 'limit' prefijos (el puntaje máximo posible)
+            prefixes, substrings = [], []
+            for doc, text_norm in enumerate(self._normalized):
+                if not self._alive[doc] or normalized not in text_norm:
+                    continue
+                if text_norm.startswith(normalized):
+                    prefixes.append((2.0, doc))
+                    if len(prefixes) >= limit:
+                        break
+                elif len(substrings) < limit:
+                    substrings.append((1.0, doc))
+            scored = prefixes + substrings
+        else:
+            # Sin trigrama final: el usuario suele estar a mitad de palabra
+            grams = _trigrams(normalized, pad_end=False)
+            postings = [np.frombuffer(self._postings[gram], dtype=np.uint32) for gram in grams if gram in self._postings]
+            if not postings:
+                return []
+            # Conteo vectorizado de trigramas compartidos por documento
+            counts = np.bincount(np.concatenate(postings), minlength=len(self._codes))
+            counts[np.frombuffer(self._alive, dtype=np.uint8) == 0] = 0
+            total = len(grams)
+            needed = max(1, int(total * QUICK_SEARCH_MIN_OVERLAP))
+
+            # Solo quien tiene todos los trigramas puede contener la frase (bonos)
+            scored = []
+            top_hits = 0
+            for doc in np.flatnonzero(counts == total).tolist():
+                text_norm = self._normalized[doc]
+                score = 1.0
+                if normalized in text_norm:
+                    score += 1.0 # Coincidencia exacta de la frase
+                if text_norm.startswith(normalized):
+                    score += 0.5 # Prefijo de código
+                    top_hits += 1
+                scored.append((score, doc))
+                if top_hits >= limit:
+                    break # Ya hay 'limit' resultados con el puntaje máximo posible
+
+            if len(scored) < limit:
+                partial = np.flatnonzero((counts >= needed) & (counts < total))
+                best = partial[np.argsort(-counts[partial], kind='stable')[:limit - len(scored)]]
+                scored.extend((int(counts[doc]) / total, int(doc)) for doc in best)
+
+        tokens = normalized.split()
+        results = []
+        for score, doc in heapq.nlargest(limit, scored, key=lambda item: (item[0], -item[1])):
+            code = self._codes[doc]
+            description = self._descriptions[doc]
+            results.append({
+                "codigo": code,
+                "descripcion": description,
+                "score": round(score, 3),
+                "highlights": {
+                    "codigo": _highlight_spans(code, tokens),
+                    "descripcion": _highlight_spans(description, tokens)
+                }
+            })
+        return results
+
+    def memory_bytes(self):
+        total = sys.getsizeof(self._postings) + sys.getsizeof(self._doc_by_code) + sys.getsizeof(self._alive)
+        total += sum(sys.getsizeof(gram) + sys.getsizeof(posting) for gram, posting in self._postings.items())
+        for column in (self._codes, self._descriptions, self._normalized):
+            total += sys.getsizeof(column) + sum(sys.getsizeof(value) for value in column)
+        return total
+
+_SEARCH_INDEX = None
+_SEARCH_INDEX_LOCK = threading.Lock()
+_SEARCH_INDEX_JOURNAL = None # Cambios recibidos mientras se construye el índice
+_SEARCH_INDEX_BUILDING = None # Event de la construcción en curso (una sola a la vez)
+_SEARCH_INDEX_RELOAD = False # Se pidió recargar mientras había una construcción en curso
+
+def build_search_index():
+    """Carga el maestro y reemplaza el índice (reaplica los cambios llegados durante la carga).
+    Si ya hay una construcción en curso, espera a que termine y devuelve ese índice."""
+    global _SEARCH_INDEX, _SEARCH_INDEX_JOURNAL, _SEARCH_INDEX_BUILDING, _SEARCH_INDEX_RELOAD
+    with _SEARCH_INDEX_LOCK:
+        building = _SEARCH_INDEX_BUILDING
+        if building is None:
+            _SEARCH_INDEX_BUILDING = done = threading.Event()
+    if building is not None:
+        building.wait()
+        if _SEARCH_INDEX is None:
+            raise RuntimeError("No se pudo construir el índice de búsqueda (ver log)")
+        return _SEARCH_INDEX
+
+    try:
+        while True:
+            with _SEARCH_INDEX_LOCK:
+                _SEARCH_INDEX_JOURNAL = []
+                _SEARCH_INDEX_RELOAD = False
+            engine = get_engine()
+            with engine.connect() as conn:
+                rows = conn.execute(text("SELECT Codigo_Pieza, Descripcion FROM Tbl_Maestro_Piezas")).fetchall()
+            index = TrigramIndex.build(rows)
+            np._load() # Las consultas usan numpy: cargarlo aquí y no en la primera tecla
+            with _SEARCH_INDEX_LOCK:
+                for upserts, deletes in _SEARCH_INDEX_JOURNAL:
+                    _apply_search_changes(index, upserts, deletes)
+                _SEARCH_INDEX = index
+                if not _SEARCH_INDEX_RELOAD:
+                    return index
+            # Una escritura masiva llegó durante la carga: lo leído puede estar viejo
+    finally:
+        with _SEARCH_INDEX_LOCK:
+            _SEARCH_INDEX_JOURNAL = None
+            _SEARCH_INDEX_BUILDING = None
+        done.set()
+
+def start_search_index_build():
+    """Construye en segundo plano; si ya hay una construcción en curso, le pide recargar al terminar."""
+    global _SEARCH_INDEX_RELOAD
+    with _SEARCH_INDEX_LOCK:
+        if _SEARCH_INDEX_BUILDING is not None:
+            _SEARCH_INDEX_RELOAD = True
+            return
+    threading.Thread(target=_build_search_index_quietly, name='search-index', daemon=True).start()
+
+def _build_search_index_quietly():
+    try:
+        build_search_index()
+    except Exception as e:
+        log_update(f"No se pudo construir el índice de búsqueda: {e}", 'WARNING')
+
+def _apply_search_changes(index, upserts, deletes):
+    for code in deletes:
+        index.remove(code)
+    for code, description in upserts:
+        index.upsert(code, description)
+    if index.needs_compaction():
+        index.compact()
+
+def sync_search_index(upserts=(), deletes=()):
+    """Llamado por los comandos de escritura. upserts: [(codigo, descripcion)], deletes: [codigo]."""
+    upserts = list(upserts)
+    deletes = list(deletes)
+    with _SEARCH_INDEX_LOCK:
+        if _SEARCH_INDEX_JOURNAL is not None:
+            _SEARCH_INDEX_JOURNAL.append((upserts, deletes))
+        if _SEARCH_INDEX is not None:
+            _apply_search_changes(_SEARCH_INDEX, upserts, deletes)
+    note_catalog_changes([code for code, _ in upserts] + deletes)
+
+def invalidate_search_index():
+    """Para escrituras masivas sin detalle por código (ingesta): reconstruir en segundo plano."""
+    if _SEARCH_INDEX is not None:
+        start_search_index_build()
+    invalidate_catalog_store()
+
+def quick_search(payload):
+    query = (payload or {}).get('query') or (payload or {}).get('text') or ''
+    try:
+        limit = max(1, min(int((payload or {}).get('limit') or QUICK_SEARCH_LIMIT), 200))
+    except (TypeError, ValueError):
+        limit = QUICK_SEARCH_LIMIT
+    try:
+        index = _SEARCH_INDEX if _SEARCH_INDEX is not None else build_search_index()
+        start = time.perf_counter()
+        with _SEARCH_INDEX_LOCK:
+            results = index.search(query, limit)
+        return {
+            "status": "success",
+            "query": query,
+            "elapsed_ms": round((time.perf_counter() - start) * 1000, 2),
+            "results": results
+        }
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+
+def get_search_index_stats():
+    index = _SEARCH_INDEX
+    if index is None:
+        return {"status": "success", "built": False}
+    with _SEARCH_INDEX_LOCK:
+        parts = len(index)
+        memory = index.memory_bytes()
+        trigrams = len(index._postings)
+    return {
+        "status": "success",
+        "built": True,
+        "parts": parts,
+        "trigrams": trigrams,
+        "memory_bytes": memory,
+        "bytes_per_10k_parts": round(memory * 10000 / parts) if parts else 0,
+        "built_ms": index.built_ms,
+        "built_at": index.built_at
+    }
+
+# --- CATÁLOGO COMPACTO EN MEMORIA (v14.2) ---
+# CatalogStore guarda Tbl_Maestro_Piezas por columnas en arreglos en vez de un
+# DataFrame de objetos str o una lista de dicts:
+# - Textos únicos por pieza (código, descripción, medida): UTF-8 concatenado + offsets.
+# - Columnas de pocos valores (material, procesos, simetría): diccionario de valores
+#   internados + índice uint16 por fila.
+# - Código -> fila: tabla hash de direccionamiento abierto (array de int32).
+# Se carga en lotes desde el cursor del servidor y los comandos de escritura lo
+# mantienen al día igual que el índice de type-ahead (los códigos tocados se releen
+# en bloque en la siguiente lectura). Opcional en el listener (config "catalog_store").
+# Medido con scripts/bench_catalog_store.py: ~1 MB por 10k piezas (200k ~ 20 MB,
+# contra ~120 MB del DataFrame y ~200 MB de la lista de dicts).
+
+CATALOG_DICT_COLUMNS = ('Material', 'Simetria', 'Proceso_Primario', 'Proceso_1', 'Proceso_2', 'Proceso_3')
+CATALOG_INT_COLUMNS = ('ID',)
+CATALOG_DATE_COLUMNS = ('Ultima_Actualizacion',)
+CATALOG_LOAD_BATCH = 5000
+
+class _TextColumn:
+    """Textos UTF-8 concatenados; offsets[i]..offsets[i+1] delimitan la fila i."""
+
+    def __init__(self):
+        self.data = bytearray()
+        self.offsets = array.array('I', (0,))
+        self.nulls = bytearray()
+
+    def append(self, value):
+        self.nulls.append(value is None)
+        if value is not None:
+            self.data += str(value).encode('utf-8')
+        self.offsets.append(len(self.data))
+
+    def get(self, row):
+        if self.nulls[row]:
+            return None
+        return self.data[self.offsets[row]:self.offsets[row + 1]].decode('utf-8')
+
+    def memory_bytes(self):
+        return sys.getsizeof(self.data) + sys.getsizeof(self.offsets) + sys.getsizeof(self.nulls)
+
+class _DictColumn:
+    """Valores repetidos: tabla de valores internados + índice por fila (uint16, crece a uint32)."""
+
+    def __init__(self):
+        self.values = [None]
+        self.lookup = {None: 0}
+        self.codes = array.array('H')
+
+    def append(self, value):
+        key = self.lookup.get(value)
+        if key is None:
+            key = len(self.values)
+            if key > 0xFFFF and self.codes.typecode == 'H':
+                self.codes = array.array('I', self.codes)
+            self.values.append(sys.intern(value) if isinstance(value, str) else value)
+            self.lookup[value] = key
+        self.codes.append(key)
+
+    def get(self, row):
+        return self.values[self.codes[row]]
+
+    def memory_bytes(self):
+        total = sys.getsizeof(self.codes) + sys.getsizeof(self.values) + sys.getsizeof(self.lookup)
+        return total + sum(sys.getsizeof(value) for value in self.values)
+
+_CATALOG_EPOCH = datetime.datetime(1970, 1, 1)
+_MICROSECOND = datetime.timedelta(microseconds=1)
+
+class _NumberColumn:
+    """Enteros (int64) o fechas (microsegundos desde 1970 en int64, sin pasar por hora local:
+    timestamp()/fromtimestamp() no devuelven la misma fecha en los cambios de horario);
+    None -> bandera en nulls."""
+
+    def __init__(self, dates=False):
+        self.dates = dates
+        self.values = array.array('q')
+        self.nulls = bytearray()
+
+    def append(self, value):
+        if isinstance(value, str) and self.dates:
+            value = datetime.datetime.fromisoformat(value)
+        self.nulls.append(value is None)
+        if value is None:
+            self.values.append(0)
+        elif self.dates:
+            self.values.append((value - _CATALOG_EPOCH) // _MICROSECOND)
+        else:
+            self.values.append(int(value))
+
+    def get(self, row):
+        if self.nulls[row]:
+            return None
+        value = self.values[row]
+        return _CATALOG_EPOCH + value * _MICROSECOND if self.dates else value
+
+    def memory_bytes(self):
+        return sys.getsizeof(self.values) + sys.getsizeof(self.nulls)
+
+def _catalog_column(name):
+    if name in CATALOG_DICT_COLUMNS:
+        return _DictColumn()
+    if name in CATALOG_INT_COLUMNS:
+        return _NumberColumn()
+    if name in CATALOG_DATE_COLUMNS:
+        return _NumberColumn(dates=True)
+    return _TextColumn()
+
+class CatalogStore:
+    """Maestro de piezas en arreglos columnares con índice hash código -> fila."""
+
+    def __init__(self, columns):
+        self.columns = list(columns)
+        self._data = [_catalog_column(name) for name in self.columns]
+        self._code_column = self._data[self.columns.index('Codigo_Pieza')]
+        self._alive = bytearray()
+        self._slots = array.array('i', (-1,)) * 1024
+        self._used_slots = 0
+        self._dead = 0
+        self.built_ms = None
+        self.built_at = None
+
+    @classmethod
+    def from_result(cls, result, batch_size=CATALOG_LOAD_BATCH):
+        """Carga en lotes desde un resultado de SQLAlchemy (sin materializar todas las filas)."""
+        start = time.perf_counter()
+        store = cls(result.keys())
+        while True:
+            rows = result.fetchmany(batch_size)
+            if not rows:
+                break
+            for row in rows:
+                store._append(row)
+        store.built_ms = round((time.perf_counter() - start) * 1000, 1)
+        store.built_at = datetime.datetime.now().isoformat(timespec='seconds')
+        return store
+
+    def __len__(self):
+        return len(self._alive) - self._dead
+
+    @staticmethod
+    def _key(code):
+        return str(code or '').strip().upper()
+
+    def _find_slot(self, key):
+        mask = len(self._slots) - 1
+        slot = hash(key) & mask
+        while True:
+            row = self._slots[slot]
+            if row == -1 or self._code_column.get(row).strip().upper() == key:
+                return slot
+            slot = (slot + 1) & mask
+
+    def _grow(self):
+        rows = [row for row in self._slots if row != -1]
+        self._slots = array.array('i', (-1,)) * (len(self._slots) * 2)
+        for row in rows:
+            self._slots[self._find_slot(self._key(self._code_column.get(row)))] = row
+
+    def _append(self, values):
+        key = self._key(values[self.columns.index('Codigo_Pieza')])
+        if not key:
+            return
+        if (self._used_slots + 1) * 2 > len(self._slots):
+            self._grow()
+        row = len(self._alive)
+        for column, value in zip(self._data, values):
+            column.append(value)
+        self._alive.append(1)
+        slot = self._find_slot(key)
+        previous = self._slots[slot]
+        if previous == -1:
+            self._used_slots += 1
+        elif self._alive[previous]:
+            self._alive[previous] = 0 # Código repetido: gana la última fila
+            self._dead += 1
+        self._slots[slot] = row
+
+    def row_index(self, code):
+        row = self._slots[self._find_slot(self._key(code))]
+        return row if row != -1 and self._alive[row] else None
+
+    def row(self, index):
+        return {name: column.get(index) for name, column in zip(self.columns, self._data)}
+
+    def get(self, code):
+        index = self.row_index(code)
+        return None if index is None else self.row(index)
+
+    def column(self, name):
+        """Valores de una columna para las filas vivas, en orden de carga."""
+        data = self._data[self.columns.index(name)]
+        return [data.get(row) for row in range(len(self._alive)) if self._alive[row]]
+
+    def upsert(self, values):
+        """values: dict columna -> valor o secuencia en el orden de self.columns."""
+        if isinstance(values, dict):
+            values = [values.get(name) for name in self.columns]
+        self._append(values)
+
+    def delete(self, code):
+        index = self.row_index(code)
+        if index is not None:
+            self._alive[index] = 0 # La ranura queda apuntando a la fila muerta (sondeo lineal)
+            self._dead += 1
+
+    def needs_compaction(self):
+        return self._dead > 1000 and self._dead > len(self._alive) // 4
+
+    def compact(self):
+        fresh = CatalogStore(self.columns)
+        for row in range(len(self._alive)):
+            if self._alive[row]:
+                fresh._append([column.get(row) for column in self._data])
+        fresh.built_ms, fresh.built_at = self.built_ms, self.built_at
+        self.__dict__.update(fresh.__dict__)
+
+    def memory_bytes(self):
+        total = sys.getsizeof(self._alive) + sys.getsizeof(self._slots)
+        return total + sum(column.memory_bytes() for column in self._data)
+
+    def memory_by_column(self):
+        return {name: column.memory_bytes() for name, column in zip(self.columns, self._data)}
+
+_CATALOG_STORE = None
+_CATALOG_STORE_LOCK = threading.Lock()
+_CATALOG_STORE_PENDING = set() # Códigos escritos desde la última lectura del store
+
+def build_catalog_store(batch_size=CATALOG_LOAD_BATCH):
+    global _CATALOG_STORE
+    with get_engine().connect() as conn:
+        result = conn.execution_options(stream_results=True).execute(text("SELECT * FROM Tbl_Maestro_Piezas"))
+        store = CatalogStore.from_result(result, batch_size)
+    with _CATALOG_STORE_LOCK:
+        _CATALOG_STORE_PENDING.clear()
+        _CATALOG_STORE = store
+    return store
+
+def get_catalog_store():
+    """Store al día: lo construye la primera vez y relee en bloque los códigos escritos."""
+    store = _CATALOG_STORE if _CATALOG_STORE is not None else build_catalog_store()
+    with _CATALOG_STORE_LOCK:
+        codes = normalize_codes(_CATALOG_STORE_PENDING)
+        _CATALOG_STORE_PENDING.clear()
+    if codes:
+        rows = {}
+        with get_engine().connect() as conn:
+            for in_list, names in _code_chunks(codes):
+                for row in conn.execute(text(f"SELECT * FROM Tbl_Maestro_Piezas WHERE Codigo_Pieza IN ({in_list})"), names):
+                    rows[CatalogStore._key(row[store.columns.index('Codigo_Pieza')])] = row
+        with _CATALOG_STORE_LOCK:
+            for code in codes:
+                row = rows.get(CatalogStore._key(code))
+                if row is None:
+                    store.delete(code)
+                else:
+                    store.upsert(list(row))
+            if store.needs_compaction():
+                store.compact()
+    return store
+
+def note_catalog_changes(codes):
+    if _CATALOG_STORE is not None:
+        with _CATALOG_STORE_LOCK:
+            _CATALOG_STORE_PENDING.update(str(code) for code in codes if code)
+
+def invalidate_catalog_store():
+    """Escrituras masivas o externas: se reconstruye en la siguiente lectura."""
+    global _CATALOG_STORE
+    _CATALOG_STORE = None
+
+def get_catalog_store_stats():
+    store = _CATALOG_STORE
+    if store is None:
+        return {"status": "success", "built": False}
+    with _CATALOG_STORE_LOCK:
+        parts = len(store)
+        memory = store.memory_bytes()
+        by_column = store.memory_by_column()
+    return {
+        "status": "success",
+        "built": True,
+        "parts": parts,
+        "memory_bytes": memory,
+        "bytes_per_10k_parts": round(memory * 10000 / parts) if parts else 0,
+        "columns": by_column,
+        "built_ms": store.built_ms,
+        "built_at": store.built_at
+    }
+
+# --- DETECCIÓN DE PIEZAS DUPLICADAS (v14.2) ---
+# find_duplicates busca la misma pieza dada de alta con códigos distintos y
+# descripciones casi iguales, sin comparar todos los pares (O(n²)):
+# 1. Descripciones normalizadas idénticas se agrupan directo (similitud 1.0).
+# 2. Cada descripción única se parte en shingles de caracteres (3-gramas) y se
+#    resume en una firma MinHash; las firmas se calculan por bloques en un pool de
+#    procesos (numpy vectoriza cada permutación sobre todo el bloque).
+# 3. LSH: la firma se corta en bandas; dos descripciones que comparten una banda son
+#    candidatas. Buckets enormes solo emparejan vecinos cercanos (costo lineal).
+#    Los candidatos cuya similitud estimada por la firma queda lejos del umbral se
+#    descartan sin verificar.
+# 4. El resto se verifica con Jaccard exacto sobre los shingles y los pares que
+#    pasan el umbral se unen en clusters (union-find).
+# Lee el maestro desde el catálogo compacto en memoria (CatalogStore).
+
+DUPLICATE_THRESHOLD = 0.85
+DUPLICATE_SHINGLE = 3
+DUPLICATE_PERMUTATIONS = 128
+DUPLICATE_RECALL = 0.99 # Probabilidad de que LSH proponga un par justo en el umbral
+DUPLICATE_CHUNK = 5000 # Descripciones por bloque enviado a un proceso
+DUPLICATE_PARALLEL_MIN = 20000 # Por debajo de esto el pool cuesta más de lo que ahorra
+DUPLICATE_BUCKET_WINDOW = 50 # Vecinos emparejados dentro de un bucket LSH grande
+DUPLICATE_ESTIMATE_MARGIN = 0.1 # Holgura de la estimación MinHash antes de verificar (~3 desviaciones con 128)
+DUPLICATE_MAX_CLUSTERS = 200
+DUPLICATE_PRIME = 4294967291 # Primo < 2^32: (a*h + b) mod p cabe en uint64 sin desbordar
+DUPLICATE_SEED = 1442
+
+def duplicate_shingles(text, size=DUPLICATE_SHINGLE):
+    text = _normalize_description(text)
+    if len(text) <= size:
+        return {text} if text else set()
+    return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+def _minhash_params(permutations):
+    # Semilla fija: todos los procesos deben generar las mismas permutaciones
+    rng = np.random.RandomState(DUPLICATE_SEED)
+    a = rng.randint(1, 2 ** 31, size=permutations).astype(np.uint64)
+    b = rng.randint(0, 2 ** 31, size=permutations).astype(np.uint64)
+    return a, b
+
+def minhash_signatures(texts, permutations, size=DUPLICATE_SHINGLE):
+    """Firmas MinHash (uint32) de un bloque de descripciones.
+    Función de módulo (no closure) para poder ejecutarse en un ProcessPoolExecutor."""
+    a, b = _minhash_params(permutations)
+    hashes, starts = [], []
+    for text in texts:
+        starts.append(len(hashes))
+        # crc32 y no hash(): estable entre procesos (PYTHONHASHSEED)
+        hashes.extend(zlib.crc32(shingle.encode('utf-8')) for shingle in duplicate_shingles(text, size) or {''})
+    hashes = np.asarray(hashes, dtype=np.uint64)
+    starts = np.asarray(starts, dtype=np.intp)
+
+    signatures = np.empty((len(texts), permutations), dtype=np.uint32)
+    for p in range(permutations):
+        values = (a[p] * hashes + b[p]) % np.uint64(DUPLICATE_PRIME)
+        signatures[:, p] = np.minimum.reduceat(values, starts)
+    return signatures
+
+def lsh_band_keys(signatures, bands, rows):
+    """Una clave uint64 por banda (combinación lineal con desborde; colisiones despreciables)."""
+    mix = np.random.RandomState(DUPLICATE_SEED).randint(1, 2 ** 62, size=rows, dtype=np.int64).astype(np.uint64) | np.uint64(1)
+    banded = signatures[:, :bands * rows].astype(np.uint64).reshape(len(signatures), bands, rows)
+    return (banded * mix).sum(axis=2, dtype=np.uint64)
+
+def duplicate_jaccard_pairs(pairs, threshold, size=DUPLICATE_SHINGLE):
+    """[(i, j, texto_i, texto_j)] -> [(i, j, jaccard)] de los pares que pasan el umbral."""
+    verified = []
+    cache = {}
+    for i, j, left, right in pairs:
+        if i not in cache:
+            cache[i] = duplicate_shingles(left, size)
+        if j not in cache:
+            cache[j] = duplicate_shingles(right, size)
+        left, right = cache[i], cache[j]
+        union = len(left | right)
+        score = len(left & right) / union if union else 0.0
+        if score >= threshold:
+            verified.append((i, j, score))
+    return verified
+
+def lsh_parameters(threshold, permutations=DUPLICATE_PERMUTATIONS):
+    """(bandas, filas) con menos candidatos (más filas por banda) que aún detecta un par con
+    similitud = threshold con probabilidad >= DUPLICATE_RECALL: 1 - (1 - t^r)^b.
+    Usa las primeras b*r permutaciones de la firma."""
+    best = (permutations, 1)
+    for rows in range(1, permutations + 1):
+        bands = permutations // rows
+        if 1 - (1 - threshold ** rows) ** bands >= DUPLICATE_RECALL:
+            best = (bands, rows)
+    return best
+
+def lsh_candidates(keys, window=DUPLICATE_BUCKET_WINDOW):
+    """Pares (i < j) que comparten al menos una banda, como dos arreglos int64.
+    Dentro de cada bucket (claves ordenadas) cada elemento se empareja con los
+    `window` siguientes del mismo bucket: vectorizado y acotado a n*window por banda."""
+    count = len(keys)
+    found = []
+    for band in range(keys.shape[1]):
+        order = np.argsort(keys[:, band], kind='stable')
+        ordered = keys[order, band]
+        for offset in range(1, min(window, count - 1) + 1):
+            same = np.flatnonzero(ordered[:-offset] == ordered[offset:])
+            if not len(same):
+                break # Ningún bucket tiene más de `offset` elementos
+            left, right = order[same], order[same + offset]
+            found.append(np.minimum(left, right).astype(np.int64) * count + np.maximum(left, right))
+    if not found:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    pairs = np.sort(np.concatenate(found)) # sort + máscara: más rápido que np.unique en numpy 2.x
+    pairs = pairs[np.concatenate(([True], pairs[1:] != pairs[:-1]))]
+    return pairs // count, pairs % count
+
+def estimate_similarity(signatures, left, right, chunk=200000):
+    """Jaccard estimado por MinHash (fracción de posiciones iguales) para cada par."""
+    estimates = np.empty(len(left), dtype=np.float32)
+    for start in range(0, len(left), chunk):
+        stop = start + chunk
+        equal = signatures[left[start:stop]] == signatures[right[start:stop]]
+        estimates[start:stop] = equal.mean(axis=1)
+    return estimates
+
+def _duplicate_pool(workers, jobs):
+    """Ejecuta jobs [(func, args)] en un pool de procesos; None si el pool no está disponible."""
+    import concurrent.futures
+    try:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(func, *args) for func, args in jobs]
+            return [future.result() for future in futures]
+    except (OSError, RuntimeError, concurrent.futures.process.BrokenProcessPool) as e:
+        log_update("Pool de procesos no disponible, find_duplicates sigue en serie", 'WARNING', error=str(e))
+        return None
+
+def _run_duplicate_jobs(jobs, parallel, workers):
+    results = _duplicate_pool(workers, jobs) if parallel else None
+    if results is None:
+        results = [func(*args) for func, args in jobs]
+    return results
+
+class _UnionFind:
+    def __init__(self, size):
+        self.parent = list(range(size))
+
+    def find(self, item):
+        while self.parent[item] != item:
+            self.parent[item] = self.parent[self.parent[item]]
+            item = self.parent[item]
+        return item
+
+    def union(self, left, right):
+        left, right = self.find(left), self.find(right)
+        if left != right:
+            self.parent[max(left, right)] = min(left, right)
+
+def find_duplicates(payload=None):
+    payload = payload or {}
+    try:
+        threshold = float(payload.get('threshold', DUPLICATE_THRESHOLD))
+        limit = int(payload.get('limit', DUPLICATE_MAX_CLUSTERS))
+        workers = max(1, int(payload.get('workers') or os.cpu_count() or 1))
+        if not 0 < threshold <= 1:
+            return {"status": "error", "message": "threshold debe estar entre 0 y 1"}
+        timings = {}
+
+        start = time.perf_counter()
+        store = get_catalog_store()
+        with _CATALOG_STORE_LOCK:
+            codes = store.column('Codigo_Pieza')
+            descriptions = store.column('Descripcion')
+        # 1. Descripciones idénticas tras normalizar: un solo documento para LSH
+        by_text = {}
+        for index, desc in enumerate(descriptions):
+            key = _normalize_description(desc)
+            if key:
+                by_text.setdefault(key, []).append(index)
+        texts = list(by_text)
+        timings['load_ms'] = round((time.perf_counter() - start) * 1000, 1)
+
+        # 2-3. Firmas MinHash por bloques (en paralelo) y candidatos LSH
+        start = time.perf_counter()
+        bands, rows = lsh_parameters(threshold)
+        parallel = workers > 1 and len(texts) >= DUPLICATE_PARALLEL_MIN
+        chunk = max(1, min(DUPLICATE_CHUNK, -(-len(texts) // workers)))
+        jobs = [(minhash_signatures, (texts[i:i + chunk], bands * rows)) for i in range(0, len(texts), chunk)]
+        signatures = _run_duplicate_jobs(jobs, parallel, workers)
+        signatures = np.concatenate(signatures) if signatures else np.empty((0, bands * rows), dtype=np.uint32)
+        timings['minhash_ms'] = round((time.perf_counter() - start) * 1000, 1)
+
+        start = time.perf_counter()
+        left, right = lsh_candidates(lsh_band_keys(signatures, bands, rows))
+        candidates = len(left)
+        # Descarta con la estimación de la firma lo que no puede llegar al umbral
+        keep = estimate_similarity(signatures, left, right) >= threshold - DUPLICATE_ESTIMATE_MARGIN
+        left, right = left[keep].tolist(), right[keep].tolist()
+        timings['lsh_ms'] = round((time.perf_counter() - start) * 1000, 1)
+
+        # 4. Verificación exacta (en paralelo) y clusters
+        start = time.perf_counter()
+        pairs = [(i, j, texts[i], texts[j]) for i, j in zip(left, right)]
+        step = max(1, -(-len(pairs) // workers))
+        jobs = [(duplicate_jaccard_pairs, (pairs[i:i + step], threshold)) for i in range(0, len(pairs), step)]
+        verified = [edge for part in _run_duplicate_jobs(jobs, parallel and len(pairs) >= DUPLICATE_PARALLEL_MIN, workers)
+                    for edge in part]
+        timings['verify_ms'] = round((time.perf_counter() - start) * 1000, 1)
+
+        groups = _UnionFind(len(texts))
+        for i, j, _ in verified:
+            groups.union(i, j)
+        clusters = {}
+        for index, text_key in enumerate(texts):
+            root = groups.find(index)
+            if root != index or len(by_text[text_key]) > 1:
+                clusters.setdefault(root, {"texts": [], "edges": []})
+        for index in range(len(texts)):
+            cluster = clusters.get(groups.find(index))
+            if cluster is not None:
+                cluster['texts'].append(index)
+        for i, j, score in verified:
+            clusters[groups.find(i)]['edges'].append((i, j, score))
+
+        results = []
+        for cluster in clusters.values():
+            members = [row for index in cluster['texts'] for row in by_text[texts[index]]]
+            scores = [score for _, _, score in cluster['edges']]
+            if any(len(by_text[texts[index]]) > 1 for index in cluster['texts']):
+                scores.append(1.0)
+            results.append({
+                "size": len(members),
+                "score": round(max(scores), 4),
+                "min_score": round(min(scores), 4),
+                "parts": [{"codigo": codes[row], "descripcion": descriptions[row]} for row in members],
+                "pairs": [{"a": texts[i], "b": texts[j], "score": round(score, 4)}
+                          for i, j, score in sorted(cluster['edges'], key=lambda edge: -edge[2])[:20]]
+            })
+        results.sort(key=lambda item: (-item['score'], -item['size'], item['parts'][0]['codigo']))
+
+        return {
+            "status": "success",
+            "threshold": threshold,
+            "parts": len(codes),
+            "unique_descriptions": len(texts),
+            "lsh": {"bands": bands, "rows": rows, "candidates": candidates, "estimated": len(pairs), "verified": len(verified)},
+            "workers": workers if parallel else 1,
+            "total_clusters": len(results),
+            "clusters": results[:limit],
+            "timings": timings
+        }
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+
+# --- MÉTRICAS DE LATENCIA POR COMANDO (v14.2) ---
+# Cada request del listener registra cuánto tiempo pasó en cada fase:
+#   engine   -> create_engine + apertura de conexiones DBAPI (login ODBC)
+#   query    -> cursor.execute (eventos de SQLAlchemy)
+#   pandas   -> read_sql (incluye la descarga de filas del cursor)
+#   sanitize -> limpieza y conversión a registros
+#   json     -> serialización (y compresión) de la respuesta
+#   write    -> escritura en stdout + flush
+#   other    -> el resto (lógica del comando, Excel, etc.)
+# Los tiempos son exclusivos: una fase anidada se descuenta de la que la contiene.
+# Histogramas logarítmicos en memoria: costo fijo por comando sin importar el volumen.
+
+METRIC_PHASES = ('engine', 'query', 'pandas', 'sanitize', 'json', 'write', 'other')
+HISTOGRAM_MIN_MS = 0.01
+HISTOGRAM_STEPS_PER_DOUBLING = 8 # ~9% de error relativo en los percentiles
+HISTOGRAM_MAX_BUCKET = HISTOGRAM_STEPS_PER_DOUBLING * 24 # 0.01 ms * 2^24 ~ 168 s
+
+class LatencyHistogram:
+    """Histograma de latencias (ms) con cubetas logarítmicas dispersas."""
+    __slots__ = ('count', 'total', 'max', 'buckets')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = {}
+
+    def record(self, ms):
+        self.count += 1
+        self.total += ms
+        if ms > self.max:
+            self.max = ms
+        if ms <= HISTOGRAM_MIN_MS:
+            bucket = 0
+        else:
+            bucket = min(HISTOGRAM_MAX_BUCKET, int(math.log2(ms / HISTOGRAM_MIN_MS) * HISTOGRAM_STEPS_PER_DOUBLING))
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+
+    def percentile(self, fraction):
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(fraction * self.count))
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                # Punto medio geométrico de la cubeta, sin pasar del máximo observado
+                value = HISTOGRAM_MIN_MS * 2 ** ((bucket + 0.5) / HISTOGRAM_STEPS_PER_DOUBLING)
+                return min(value, self.max)
+        return self.max
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total / self.count, 3) if self.count else 0.0,
+            "p50_ms": round(self.percentile(0.50), 3),
+            "p95_ms": round(self.percentile(0.95), 3),
+            "p99_ms": round(self.percentile(0.99), 3),
+            "max_ms": round(self.max, 3)
+        }
+
+_METRICS_LOCAL = threading.local()
+_METRICS_LOCK = threading.Lock()
+_COMMAND_METRICS = {}
+_METRICS_SINCE = datetime.datetime.now()
+
+def _current_request():
+    return getattr(_METRICS_LOCAL, 'request', None)
+
+def add_phase_time(name, exclusive_ms, inclusive_ms=None):
+    """Suma tiempo a una fase del request en curso (no hace nada fuera de un request)."""
+    request = _current_request()
+    if request is None:
+        return
+    request['phases'][name] = request['phases'].get(name, 0.0) + exclusive_ms
+    if request['stack']:
+        request['stack'][-1] += exclusive_ms if inclusive_ms is None else inclusive_ms
+
+@contextlib.contextmanager
+def measure_phase(name):
+    request = _current_request()
+    if request is None:
+        yield
+        return
+    request['stack'].append(0.0)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = (time.perf_counter() - start) * 1000
+        nested = request['stack'].pop()
+        add_phase_time(name, max(0.0, elapsed - nested), elapsed)
+
+@contextlib.contextmanager
+def track_command(cmd):
+    """Abre el request de métricas de un comando. Si ya hay uno abierto (listener), lo reutiliza."""
+    request = _current_request()
+    if request is not None:
+        yield request
+        return
+    start = time.perf_counter()
+    request = {'cmd': cmd, 'start': start, 'phases': {}, 'stack': [], 'error': False, 'queries': 0}
+    _METRICS_LOCAL.request = request
+    try:
+        yield request
+    finally:
+        _METRICS_LOCAL.request = None
+        total_ms = (time.perf_counter() - start) * 1000
+        record_command(cmd, total_ms, request['phases'], bool(request['error']))
+        if request['error']:
+            error = request['error'] if isinstance(request['error'], str) else None
+            log_update("Comando con error", 'WARNING', command=cmd, duration_ms=round(total_ms, 3), error=error)
+        else:
+            log_update("Comando completado", 'DEBUG', command=cmd, duration_ms=round(total_ms, 3))
+        if _QUERY_TRACE['enabled']:
+            record_command_queries(cmd, request['queries'])
+
+def mark_command_error():
+    request = _current_request()
+    if request is not None:
+        request['error'] = True
+
+def record_command(cmd, total_ms, phases, error=False):
+    phases = dict(phases)
+    phases['other'] = max(0.0, total_ms - sum(phases.values()))
+    with _METRICS_LOCK:
+        entry = _COMMAND_METRICS.get(cmd)
+        if entry is None:
+            entry = _COMMAND_METRICS[cmd] = {'errors': 0, 'total': LatencyHistogram(), 'phases': {}}
+        entry['total'].record(total_ms)
+        if error:
+            entry['errors'] += 1
+        for name, ms in phases.items():
+            histogram = entry['phases'].get(name)
+            if histogram is None:
+                histogram = entry['phases'][name] = LatencyHistogram()
+            histogram.record(ms)
+
+def reset_command_stats():
+    global _METRICS_SINCE
+    with _METRICS_LOCK:
+        _COMMAND_METRICS.clear()
+        _METRICS_SINCE = datetime.datetime.now()
+
+def get_command_stats(payload=None):
+    """Conteos, errores y p50/p95/p99 por comando y por fase. {"reset": true} limpia después de leer."""
+    payload = payload or {}
+    only = payload.get('command')
+    with _METRICS_LOCK:
+        commands = {}
+        for cmd, entry in sorted(_COMMAND_METRICS.items()):
+            if only and cmd != only:
+                continue
+            stats = entry['total'].summary()
+            stats['errors'] = entry['errors']
+            stats['phases'] = {}
+            for name in METRIC_PHASES:
+                histogram = entry['phases'].get(name)
+                if histogram is None or not histogram.count:
+                    continue
+                phase = histogram.summary()
+                phase['share'] = round(histogram.total / entry['total'].total, 3) if entry['total'].total else 0.0
+                stats['phases'][name] = phase
+            commands[cmd] = stats
+        since = _METRICS_SINCE
+    result = {
+        "status": "success",
+        "since": since.isoformat(timespec='seconds'),
+        "uptime_ms": round((time.perf_counter() - _BRIDGE_START) * 1000, 1),
+        "commands": commands
+    }
+    if payload.get('reset'):
+        reset_command_stats()
+        result['reset'] = True
+    return result
+
+def _on_do_connect(dialect, connection_record, cargs, cparams):
+    connection_record.info['_connect_start'] = time.perf_counter()
+
+def _on_pool_connect(dbapi_connection, connection_record):
+    start = connection_record.info.pop('_connect_start', None)
+    if start is not None:
+        add_phase_time('engine', (time.perf_counter() - start) * 1000)
+
+def _on_before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('_query_start', []).append(time.perf_counter())
+
+def _on_after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get('_query_start')
+    if not starts:
+        return
+    elapsed = (time.perf_counter() - starts.pop()) * 1000
+    add_phase_time('query', elapsed)
+    request = _current_request()
+    if request is not None:
+        request['queries'] += 1
+    if _QUERY_TRACE['enabled']:
+        trace_query(statement, elapsed, cursor.rowcount, executemany, request)
+
+def instrument_engine(engine):
+    """Eventos de SQLAlchemy que alimentan las fases 'engine' y 'query' (y la traza de consultas)."""
+    if not _QUERY_TRACE['loaded']:
+        load_query_trace_settings()
+    sqlalchemy.event.listen(engine, 'do_connect', _on_do_connect)
+    sqlalchemy.event.listen(engine, 'connect', _on_pool_connect)
+    sqlalchemy.event.listen(engine, 'before_cursor_execute', _on_before_cursor_execute)
+    sqlalchemy.event.listen(engine, 'after_cursor_execute', _on_after_cursor_execute)
+
+# --- TRAZA DE CONSULTAS LENTAS (v14.2) ---
+# Opcional ("query_trace": true en config.json, o {"enable": true} en query_stats).
+# Cuelga de los mismos eventos de cursor que las métricas: por cada sentencia guarda
+# su huella (SQL sin literales ni parámetros), filas, duración y el comando que la
+# emitió. Lo que supera "slow_query_ms" se agrega como línea JSON a slow_queries.log.
+
+SLOW_QUERY_MS = 200
+SLOW_QUERY_FILE = "slow_queries.log"
+SLOW_QUERY_SQL_MAX = 2000 # Caracteres de la sentencia original en el log
+MAX_QUERY_FINGERPRINTS = 500 # Huellas distintas retenidas; el resto se agrupa
+QUERY_STATS_TOP = 20
+QUERY_STATS_ORDERS = ('total_ms', 'max_ms', 'calls', 'rows')
+OVERFLOW_FINGERPRINT = '(otras sentencias)'
+
+_QUERY_TRACE = {'enabled': False, 'threshold_ms': SLOW_QUERY_MS, 'log_path': None, 'loaded': False}
+_QUERY_TRACE_LOCK = threading.Lock()
+_QUERY_STATS = {}
+_QUERY_COMMANDS = {}
+_QUERY_TRACE_SINCE = datetime.datetime.now()
+_SLOW_QUERY_COUNT = 0
+
+_SQL_COMMENTS_RE = re.compile(r"--[^\n]*|/\*.*?\*/", re.S)
+_SQL_STRING_RE = re.compile(r"N?'(?:[^']|'')*'")
+_SQL_NUMBER_RE = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")
+_SQL_PARAM_RE = re.compile(r"\?|:\w+|%\(\w+\)s")
+_SQL_LIST_RE = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+
+def load_query_trace_settings():
+    config = load_config()
+    with _QUERY_TRACE_LOCK:
+        _QUERY_TRACE['enabled'] = bool(config.get('query_trace', False))
+        _QUERY_TRACE['threshold_ms'] = float(config.get('slow_query_ms', SLOW_QUERY_MS))
+        _QUERY_TRACE['log_path'] = config.get('slow_query_log') or os.path.join(get_base_path(), SLOW_QUERY_FILE)
+        _QUERY_TRACE['loaded'] = True
+    return _QUERY_TRACE
+
+@functools.lru_cache(maxsize=1024)
+def fingerprint_sql(statement):
+    """SQL normalizado: sin comentarios, literales ni parámetros, listas IN colapsadas."""
+    sql = _SQL_COMMENTS_RE.sub(' ', statement)
+    sql = _SQL_STRING_RE.sub('?', sql)
+    sql = _SQL_NUMBER_RE.sub('?', sql)
+    sql = _SQL_PARAM_RE.sub('?', sql)
+    sql = ' '.join(sql.split())
+    return _SQL_LIST_RE.sub('(?+)', sql)
+
+def _query_owner(request):
+    # Fuera de un comando: hilos de fondo (índice de búsqueda, réplica)
+    return request['cmd'] if request is not None else f"({threading.current_thread().name})"
+
+def trace_query(statement, elapsed_ms, rowcount, executemany, request=None):
+    global _SLOW_QUERY_COUNT
+    fingerprint = fingerprint_sql(statement)
+    owner = _query_owner(request)
+    rows = rowcount if rowcount is not None and rowcount >= 0 else 0
+    with _QUERY_TRACE_LOCK:
+        entry = _QUERY_STATS.get(fingerprint)
+        if entry is None:
+            if len(_QUERY_STATS) >= MAX_QUERY_FINGERPRINTS:
+                fingerprint = OVERFLOW_FINGERPRINT
+                entry = _QUERY_STATS.get(fingerprint)
+            if entry is None:
+                entry = _QUERY_STATS[fingerprint] = {'calls': 0, 'total_ms': 0.0, 'max_ms': 0.0, 'rows': 0, 'batches': 0, 'commands': {}}
+        entry['calls'] += 1
+        entry['total_ms'] += elapsed_ms
+        entry['rows'] += rows
+        if executemany:
+            entry['batches'] += 1
+        if elapsed_ms > entry['max_ms']:
+            entry['max_ms'] = elapsed_ms
+        entry['commands'][owner] = entry['commands'].get(owner, 0) + 1
+        slow = elapsed_ms >= _QUERY_TRACE['threshold_ms']
+        if slow:
+            _SLOW_QUERY_COUNT += 1
+    if slow:
+        write_slow_query({
+            "timestamp": datetime.datetime.now().isoformat(timespec='milliseconds'),
+            "command": owner,
+            "ms": round(elapsed_ms, 3),
+            "rows": rowcount,
+            "executemany": bool(executemany),
+            "fingerprint": fingerprint,
+            "sql": ' '.join(statement.split())[:SLOW_QUERY_SQL_MAX]
+        })
+
+_SLOW_QUERY_WRITER = None
+
+def write_slow_query(entry):
+    global _SLOW_QUERY_WRITER
+    writer = _SLOW_QUERY_WRITER
+    if writer is None or writer.path != _QUERY_TRACE['log_path']:
+        settings = get_log_settings()
+        writer = _SLOW_QUERY_WRITER = open_log_writer(_QUERY_TRACE['log_path'], settings['max_bytes'], settings['backups'])
+    writer.write(entry)
+
+def record_command_queries(cmd, statements):
+    with _QUERY_TRACE_LOCK:
+        entry = _QUERY_COMMANDS.get(cmd)
+        if entry is None:
+            entry = _QUERY_COMMANDS[cmd] = {'requests': 0, 'statements': 0, 'max_statements': 0}
+        entry['requests'] += 1
+        entry['statements'] += statements
+        if statements > entry['max_statements']:
+            entry['max_statements'] = statements
+
+def reset_query_stats():
+    global _QUERY_TRACE_SINCE, _SLOW_QUERY_COUNT
+    with _QUERY_TRACE_LOCK:
+        _QUERY_STATS.clear()
+        _QUERY_COMMANDS.clear()
+        _QUERY_TRACE_SINCE = datetime.datetime.now()
+        _SLOW_QUERY_COUNT = 0
+
+def get_query_stats(payload=None):
+    """Top-N de sentencias por tiempo total (u otro orden). También activa/desactiva la traza en caliente."""
+    payload = payload or {}
+    if not _QUERY_TRACE['loaded']:
+        load_query_trace_settings()
+    if 'enable' in payload:
+        _QUERY_TRACE['enabled'] = bool(payload['enable'])
+    if payload.get('threshold_ms') is not None:
         try:
-            stdin_data = sys.stdin.read().strip()
-            if stdin_data:
-                try:
-                    payload = json.loads(base64.b64decode(stdin_data).decode('utf-8'))
-                except:
-                    payload = json.loads(stdin_data)
-        except:
-            pass
+            _QUERY_TRACE['threshold_ms'] = float(payload['threshold_ms'])
+        except (TypeError, ValueError):
+            return {"status": "error", "message": "threshold_ms debe ser numérico"}
+    order = payload.get('order') or 'total_ms'
+    if order not in QUERY_STATS_ORDERS:
+        return {"status": "error", "message": f"Orden inválido: {order}. Use {', '.join(QUERY_STATS_ORDERS)}."}
+    try:
+        top = max(1, int(payload.get('top') or QUERY_STATS_TOP))
+    except (TypeError, ValueError):
+        top = QUERY_STATS_TOP
 
-    cmd = args.command
-    
+    with _QUERY_TRACE_LOCK:
+        ranked = heapq.nlargest(top, _QUERY_STATS.items(), key=lambda item: item[1][order])
+        statements = [{
+            "fingerprint": fingerprint,
+            "calls": entry['calls'],
+            "total_ms": round(entry['total_ms'], 3),
+            "mean_ms": round(entry['total_ms'] / entry['calls'], 3),
+            "max_ms": round(entry['max_ms'], 3),
+            "rows": entry['rows'],
+            "batches": entry['batches'],
+            "commands": dict(entry['commands'])
+        } for fingerprint, entry in ranked]
+        commands = {cmd: {
+            "requests": entry['requests'],
+            "statements": entry['statements'],
+            "per_request_mean": round(entry['statements'] / entry['requests'], 2) if entry['requests'] else 0.0,
+            "per_request_max": entry['max_statements']
+        } for cmd, entry in sorted(_QUERY_COMMANDS.items())}
+        distinct = len(_QUERY_STATS)
+        slow_count = _SLOW_QUERY_COUNT
+        since = _QUERY_TRACE_SINCE
+
+    result = {
+        "status": "success",
+        "enabled": _QUERY_TRACE['enabled'],
+        "threshold_ms": _QUERY_TRACE['threshold_ms'],
+        "log_path": _QUERY_TRACE['log_path'],
+        "since": since.isoformat(timespec='seconds'),
+        "distinct_statements": distinct,
+        "slow_queries": slow_count,
+        "order": order,
+        "statements": statements,
+        "commands": commands
+    }
+    if payload.get('reset'):
+        reset_query_stats()
+        result['reset'] = True
+    return result
+
+# Tiempo de carga del módulo sin librerías pesadas (base del perfil de arranque)
+_BRIDGE_LOAD_MS = round((time.perf_counter() - _BRIDGE_START) * 1000, 1)
+
+# --- ARRANQUE EN CALIENTE DEL LISTENER (v14.2) ---
+# Al iniciar --listen, un hilo paga por adelantado lo que antes pagaba el primer
+# clic: librerías, driver ODBC, login y conexiones del pool, migraciones, estándares,
+# resumen de conflictos, índice de type-ahead, catálogo compacto (opcional) e índice de planos. El loop atiende
+# comandos desde el primer momento (lo que aún no esté listo se carga bajo demanda).
+# Después, un ping "SELECT 1" mantiene viva la conexión cuando el listener está ocioso.
+# Con --events el listener emite {"event": "ready", ...} al terminar el calentamiento.
+
+WARMUP_POOL_CONNECTIONS = 2
+KEEPALIVE_SECONDS = 240 # Menor que el corte de conexiones ociosas de la red
+WARMUP_DB_STEPS = ('schema', 'standards', 'conflict_summary', 'search_index', 'catalog_store')
+
+_LISTENER = {"events": False, "last_activity": time.time()}
+_WARMUP = {"state": "pendiente", "elapsed_ms": None, "timings": {}, "errors": {}, "keepalive": None}
+
+def write_event(event, **fields):
+    """Línea no solicitada para el cliente; solo si el listener se abrió con --events."""
+    if _LISTENER['events']:
+        write_response({"event": event, **fields})
+
+def note_listener_activity():
+    _LISTENER['last_activity'] = time.time()
+
+def _open_pool_connections(count=WARMUP_POOL_CONNECTIONS):
+    """Login + SELECT 1 en `count` conexiones; al cerrarlas quedan abiertas en el pool."""
+    engine = get_engine()
+    connections = []
+    try:
+        for _ in range(count):
+            conn = engine.connect()
+            connections.append(conn)
+            conn.execute(text("SELECT 1"))
+    finally:
+        for conn in connections:
+            conn.close()
+
+def _warm_standards():
+    load_standards_cache()
+    best_standard_match('') # Arma los SequenceMatcher de los estándares
+
+def warm_up_listener():
+    """Calienta el bridge paso por paso; los errores se reportan y no detienen el resto."""
+    steps = [
+        ('imports', lambda: get_startup_profile(load_all=True)),
+        ('driver', get_best_driver if get_dialect() != 'sqlite' else None),
+        ('pool', _open_pool_connections),
+        ('schema', ensure_schema),
+        ('standards', _warm_standards),
+        ('conflict_summary', ensure_conflict_summary),
+        ('search_index', build_search_index),
+        ('catalog_store', build_catalog_store if load_config().get('catalog_store', False) else None),
+        ('blueprints', build_blueprint_index),
+    ]
+    _WARMUP['state'] = 'en_curso'
+    started = time.perf_counter()
+    for name, step in steps:
+        if step is None:
+            continue
+        if name in WARMUP_DB_STEPS and 'pool' in _WARMUP['errors']:
+            _WARMUP['errors'][name] = "omitido: sin conexión al servidor"
+            continue
+        t0 = time.perf_counter()
+        try:
+            step()
+        except Exception as e:
+            _WARMUP['errors'][name] = str(e)
+            log_update(f"Arranque en caliente: {name} falló: {e}", 'WARNING')
+        _WARMUP['timings'][name] = round((time.perf_counter() - t0) * 1000, 1)
+    _WARMUP['elapsed_ms'] = round((time.perf_counter() - started) * 1000, 1)
+    _WARMUP['state'] = 'listo'
+    log_update("Arranque en caliente terminado", 'INFO', duration_ms=_WARMUP['elapsed_ms'], errors=list(_WARMUP['errors']))
+    write_event("ready", elapsed_ms=_WARMUP['elapsed_ms'], timings=dict(_WARMUP['timings']), errors=dict(_WARMUP['errors']))
+
+def _keepalive_loop(interval):
+    last_ping = time.time()
+    while True:
+        time.sleep(max(1.0, interval - (time.time() - max(_LISTENER['last_activity'], last_ping))))
+        if time.time() - max(_LISTENER['last_activity'], last_ping) < interval:
+            continue # Hubo comandos: la conexión está viva
+        t0 = time.perf_counter()
+        try:
+            with get_engine().connect() as conn:
+                conn.execute(text("SELECT 1"))
+            error = None
+        except Exception as e:
+            error = str(e)
+            log_update(f"Keep-alive: ping fallido: {e}", 'WARNING')
+        last_ping = time.time()
+        previous = _WARMUP['keepalive'] or {"pings": 0, "failures": 0}
+        _WARMUP['keepalive'] = {
+            "pings": previous['pings'] + 1,
+            "failures": previous['failures'] + (1 if error else 0),
+            "last_ms": round((time.perf_counter() - t0) * 1000, 1),
+            "last_at": datetime.datetime.now().isoformat(timespec='seconds'),
+            "last_error": error
+        }
+
+def start_listener_warmup():
+    """Hilos de fondo del listener: calentamiento, réplica local y keep-alive."""
+    config = load_config()
+    if config.get('warm_start', True):
+        threading.Thread(target=warm_up_listener, name='warm-start', daemon=True).start()
+    else:
+        _WARMUP['state'] = 'deshabilitado'
+        start_search_index_build() # Como antes: solo el índice de type-ahead
+        write_event("ready", elapsed_ms=0, timings={}, errors={})
+    start_replica_refresher() # Réplica SQLite local (solo si está habilitada)
+
+    try:
+        interval = float(config.get('keepalive_seconds', KEEPALIVE_SECONDS))
+    except (TypeError, ValueError):
+        interval = KEEPALIVE_SECONDS
+    if interval > 0:
+        threading.Thread(target=_keepalive_loop, args=(interval,), name='keep-alive', daemon=True).start()
+
+def get_warmup_status():
+    return {"status": "success", "events": _LISTENER['events'], **_WARMUP,
+            "idle_seconds": round(time.time() - _LISTENER['last_activity'], 1)}
+
+# --- AVISOS DE CAMBIOS EN EL SERVIDOR (v14.2) ---
+# Opcional (--watch o config.json "change_watch": true; requiere --events). Un hilo
+# lee marcadores baratos (conteos, máximos, CHECKSUM_AGG) de las tablas que ven las
+# pantallas y, si cambian, emite UNA línea no solicitada:
+#   {"event": "catalog_changed", "since": ..., "at": ..., "tables": [...], "local_writes": n}
+# Cambios seguidos (p.ej. una ingesta) se agrupan: tras detectar uno se relee cada
+# CHANGE_COALESCE_SECONDS hasta que se estabilice (tope CHANGE_COALESCE_MAX_SECONDS).
+# local_writes > 0: en la ventana hubo escrituras de este mismo listener. Las copias
+# locales (índice de type-ahead, catálogo compacto, resumen de conflictos) se invalidan
+# por cada tabla cambiada que no escribió este listener (LOCAL_WRITE_TABLES).
+
+CHANGE_WATCH_SECONDS = 10
+CHANGE_COALESCE_SECONDS = 2
+CHANGE_COALESCE_MAX_SECONDS = 15
+
+# Sin columnas rowversion en el esquema: conteo + máximos + CHECKSUM_AGG por tabla
+CHANGE_MARKERS = {
+    'Tbl_Maestro_Piezas': "SELECT COUNT(*), MAX(Ultima_Actualizacion), CHECKSUM_AGG(CHECKSUM(Codigo_Pieza)) FROM Tbl_Maestro_Piezas",
+    'Tbl_Auditoria_Conflictos': "SELECT COUNT(*), MAX(ID), SUM(CASE WHEN Estado = 'PENDIENTE' THEN 1 ELSE 0 END) FROM Tbl_Auditoria_Conflictos",
+    'Tbl_Historial_Proyectos': "SELECT COUNT(*), MAX(Id) FROM Tbl_Historial_Proyectos WHERE Requiere_Correccion = 1",
+    'Tbl_Estandares_Materiales': "SELECT COUNT(*), MAX(ID), CHECKSUM_AGG(CHECKSUM(Descripcion)) FROM Tbl_Estandares_Materiales",
+}
+CONFLICT_MARKER_TABLES = {'Tbl_Auditoria_Conflictos', 'Tbl_Historial_Proyectos'}
+
+# Tablas con marcador que cada comando de escritura modifica siempre que termina bien.
+# Solo lo seguro: una tabla de más haría ignorar un cambio de otra estación en la misma ventana.
+LOCAL_WRITE_TABLES = {
+    'update': {'Tbl_Maestro_Piezas'},
+    'insert': {'Tbl_Maestro_Piezas'},
+    'delete': {'Tbl_Maestro_Piezas'},
+    'batch_apply': {'Tbl_Maestro_Piezas'},
+    'mark_corrected': {'Tbl_Historial_Proyectos'},
+    'mark_solved': {'Tbl_Historial_Proyectos'},
+    'save_correction': {'Tbl_Auditoria_Conflictos'},
+    'resolve_conflicts_bulk': {'Tbl_Auditoria_Conflictos'},
+    'add_standard': {'Tbl_Estandares_Materiales'},
+    'import_standards': {'Tbl_Estandares_Materiales'},
+    'edit_standard': {'Tbl_Estandares_Materiales'},
+    'delete_standard': {'Tbl_Estandares_Materiales'},
+}
+
+_CHANGE_WATCH = {"running": False, "interval": None, "since": None, "notifications": 0, "local_writes": 0,
+                 "last_poll_ms": None, "last_change": None, "last_error": None}
+_LOCAL_CHANGED_TABLES = set() # Tablas escritas por este listener desde el último aviso
+
+def note_local_write(cmd, result):
+    _CHANGE_WATCH['local_writes'] += 1
+    if isinstance(result, dict) and result.get('status') == 'success':
+        _LOCAL_CHANGED_TABLES.update(LOCAL_WRITE_TABLES.get(cmd, ()))
+
+def _take_local_changes():
+    global _LOCAL_CHANGED_TABLES
+    local_writes, local_tables = _CHANGE_WATCH['local_writes'], _LOCAL_CHANGED_TABLES
+    _CHANGE_WATCH['local_writes'], _LOCAL_CHANGED_TABLES = 0, set()
+    return local_writes, local_tables
+
+def read_change_markers():
+    t0 = time.perf_counter()
+    with get_engine().connect() as conn:
+        markers = {table: [_replica_value(value) for value in conn.execute(text(query)).fetchone()]
+                   for table, query in CHANGE_MARKERS.items()}
+    _CHANGE_WATCH['last_poll_ms'] = round((time.perf_counter() - t0) * 1000, 1)
+    return markers
+
+def _changed_tables(before, after):
+    return {table for table, marker in after.items() if before.get(table) != marker}
+
+def _emit_catalog_changed(tables):
+    local_writes, local_tables = _take_local_changes()
+    # Lo que este listener no escribió lo cambió otra estación: sus copias quedan viejas
+    # (las propias escrituras ya las mantienen al día sync_search_index y compañía)
+    external = tables - local_tables
+    if 'Tbl_Maestro_Piezas' in external:
+        invalidate_search_index()
+    if external & CONFLICT_MARKER_TABLES:
+        _CONFLICT_SUMMARY_STATE['dirty'] = True
+    _REPLICA_WAKE.set()
+    now = datetime.datetime.now().isoformat(timespec='seconds')
+    change = {"since": _CHANGE_WATCH['since'], "at": now, "tables": sorted(tables), "local_writes": local_writes}
+    write_event("catalog_changed", **change)
+    _CHANGE_WATCH.update(since=now, last_change=change, notifications=_CHANGE_WATCH['notifications'] + 1)
+
+def _change_watch_loop(interval, coalesce):
+    markers = None
+    while True:
+        try:
+            current = read_change_markers()
+            _CHANGE_WATCH['last_error'] = None
+        except Exception as e:
+            if _CHANGE_WATCH['last_error'] is None:
+                log_update(f"Avisos de cambios: lectura de marcadores fallida: {e}", 'WARNING')
+            _CHANGE_WATCH['last_error'] = str(e)
+            time.sleep(interval)
+            continue
+
+        if markers is None:
+            _CHANGE_WATCH['since'] = datetime.datetime.now().isoformat(timespec='seconds')
+        else:
+            changed = _changed_tables(markers, current)
+            if changed:
+                first = time.time()
+                while time.time() - first < CHANGE_COALESCE_MAX_SECONDS:
+                    time.sleep(coalesce)
+                    try:
+                        latest = read_change_markers()
+                    except Exception:
+                        break
+                    more = _changed_tables(current, latest)
+                    current = latest
+                    if not more:
+                        break
+                    changed |= more
+                _emit_catalog_changed(changed)
+            else:
+                _take_local_changes()
+        markers = current
+        time.sleep(interval)
+
+def start_change_watcher(interval=None, coalesce=None):
+    if _CHANGE_WATCH['running']:
+        return False
+    config = load_config()
+    try:
+        interval = float(interval or config.get('change_watch_seconds', CHANGE_WATCH_SECONDS))
+        coalesce = float(coalesce or config.get('change_coalesce_seconds', CHANGE_COALESCE_SECONDS))
+    except (TypeError, ValueError):
+        interval, coalesce = CHANGE_WATCH_SECONDS, CHANGE_COALESCE_SECONDS
+    _CHANGE_WATCH.update(running=True, interval=max(1.0, interval))
+    threading.Thread(target=_change_watch_loop, args=(_CHANGE_WATCH['interval'], max(0.1, coalesce)),
+                     name='change-watch', daemon=True).start()
+    return True
+
+def get_watch_status():
+    return {"status": "success", "events": _LISTENER['events'], **_CHANGE_WATCH}
+
+# --- PIPELINE DE COMANDOS (v14.2) ---
+# {"command": "pipeline", "payload": {"steps": [...], "transaction": false, "stop_on_error": true}}
+# Ejecuta varios comandos en orden y responde UNA línea con todos los resultados.
+# - Cada paso: {"command": ..., "payload": {...}, "id": "nombre opcional"}.
+# - Un valor {"$ref": "0.results.JA-001"} (o ["paso", "llave", ...]) en el payload se
+#   reemplaza por ese dato del resultado de un paso anterior (por índice o id).
+# - transaction: true -> todos los pasos en UNA conexión y UNA transacción; si un paso
+#   falla se revierte todo y los pasos siguientes no se ejecutan.
+
+PIPELINE_MAX_STEPS = 50
+PIPELINE_EXCLUDED = {'pipeline', 'kill'}
+
+_PIPELINE_LOCAL = threading.local()
+
+class _PinnedEngine:
+    """Engine que entrega siempre la conexión del pipeline en curso.
+    begin() abre un SAVEPOINT: el commit real lo hace el pipeline al final."""
+
+    def __init__(self, conn):
+        self._conn = conn
+
+    @contextlib.contextmanager
+    def connect(self):
+        yield self._conn
+
+    @contextlib.contextmanager
+    def begin(self):
+        with self._conn.begin_nested():
+            yield self._conn
+
+    def dispose(self):
+        pass
+
+def get_pinned_engine():
+    return getattr(_PIPELINE_LOCAL, 'engine', None)
+
+def _resolve_pipeline_ref(ref, results, ids):
+    path = ref if isinstance(ref, list) else str(ref).split('.')
+    if not path:
+        raise ValueError("Referencia vacía")
+    step = path[0]
+    index = ids.get(step) if isinstance(step, str) and step in ids else None
+    if index is None:
+        try:
+            index = int(step)
+        except (TypeError, ValueError):
+            raise ValueError(f"Referencia a un paso desconocido: {step}")
+    if not 0 <= index < len(results) or results[index]['status'] != 'success':
+        raise ValueError(f"Referencia al paso {step}, que no se ejecutó con éxito")
+
+    value = results[index]['result']
+    for key in path[1:]:
+        if isinstance(value, list):
+            try:
+                value = value[int(key)]
+            except (ValueError, IndexError):
+                raise ValueError(f"Referencia inválida: {ref}")
+        elif isinstance(value, dict) and key in value:
+            value = value[key]
+        else:
+            raise ValueError(f"Referencia inválida: {ref}")
+    return value
+
+def resolve_pipeline_refs(value, results, ids):
+    """Reemplaza {"$ref": ...} en el payload de un paso por datos de pasos anteriores."""
+    if isinstance(value, dict):
+        if set(value) == {'$ref'}:
+            return _resolve_pipeline_ref(value['$ref'], results, ids)
+        return {key: resolve_pipeline_refs(item, results, ids) for key, item in value.items()}
+    if isinstance(value, list):
+        return [resolve_pipeline_refs(item, results, ids) for item in value]
+    return value
+
+def _run_pipeline_steps(steps, results, ids, stop_on_error):
+    """Ejecuta los pasos; devuelve el índice del primer paso fallido (o None)."""
+    failed = None
+    for index, step in enumerate(steps):
+        if failed is not None and stop_on_error:
+            results.append({"index": index, "id": step.get('id'), "command": step.get('command'), "status": "skipped"})
+            continue
+        cmd = step.get('command')
+        entry = {"index": index, "id": step.get('id'), "command": cmd}
+        if step.get('id') is not None:
+            ids[str(step['id'])] = index
+        t0 = time.perf_counter()
+        try:
+            if cmd in PIPELINE_EXCLUDED:
+                raise ValueError(f"Comando no permitido en un pipeline: {cmd}")
+            payload = resolve_pipeline_refs(step.get('payload') or {}, results, ids)
+            result = dispatch_command(cmd, payload, None)
+        except ValueError as e:
+            result = {"status": "error", "message": str(e)}
+        read = take_replica_read()
+        if read is not None:
+            entry.update(read) # En el paso, no dentro de result: los $ref siguen viendo la forma original
+        entry['elapsed_ms'] = round((time.perf_counter() - t0) * 1000, 3)
+        entry['status'] = 'error' if isinstance(result, dict) and result.get('status') == 'error' else 'success'
+        entry['result'] = result
+        results.append(entry)
+        if entry['status'] == 'error' and failed is None:
+            failed = index
+    return failed
+
+def run_pipeline(payload):
+    payload = payload or {}
+    steps = payload.get('steps')
+    if not isinstance(steps, list) or not steps:
+        return {"status": "error", "message": "Falta la lista de pasos (steps)"}
+    if len(steps) > PIPELINE_MAX_STEPS:
+        return {"status": "error", "message": f"Máximo {PIPELINE_MAX_STEPS} pasos por pipeline"}
+    if not all(isinstance(step, dict) for step in steps):
+        return {"status": "error", "message": "Cada paso debe ser un objeto con 'command'"}
+    if get_pinned_engine() is not None:
+        return {"status": "error", "message": "Pipeline anidado no permitido"}
+
+    transactional = bool(payload.get('transaction', False))
+    stop_on_error = transactional or bool(payload.get('stop_on_error', True))
+    results, ids = [], {}
+    t0 = time.perf_counter()
+
+    if not transactional:
+        failed = _run_pipeline_steps(steps, results, ids, stop_on_error)
+    else:
+        # Migraciones fuera de la transacción del pipeline (no deben revertirse con ella)
+        ensure_schema()
+        with get_engine().connect() as conn:
+            trans = conn.begin()
+            _PIPELINE_LOCAL.engine = _PinnedEngine(conn)
+            try:
+                failed = _run_pipeline_steps(steps, results, ids, stop_on_error)
+            finally:
+                _PIPELINE_LOCAL.engine = None
+            if failed is None:
+                trans.commit()
+                # Los pasos marcaron la réplica antes del commit: un refresco intermedio
+                # pudo copiar los datos viejos y dar la marca por atendida
+                if any(entry['command'] in REPLICA_WRITE_COMMANDS for entry in results):
+                    mark_replica_pending()
+            else:
+                trans.rollback()
+                # Caches que los pasos ya actualizaron con datos revertidos
+                invalidate_search_index()
+                _CONFLICT_SUMMARY_STATE['dirty'] = True
+        if failed is not None:
+            for entry in results:
+                if entry['status'] == 'success':
+                    entry['status'] = 'rolled_back'
+            log_update(f"Pipeline revertido: falló el paso {failed}", 'WARNING')
+
+    elapsed_ms = round((time.perf_counter() - t0) * 1000, 3)
+    if failed is None:
+        status = 'success'
+    elif transactional or not any(entry['status'] == 'success' for entry in results):
+        status = 'error'
+    else:
+        status = 'partial'
+    response = {"status": status, "transaction": transactional, "elapsed_ms": elapsed_ms, "results": results}
+    if failed is not None:
+        response['message'] = f"Falló el paso {failed}: {results[failed]['result'].get('message', '')}"
+    return response
+
+# --- DESPACHO DE COMANDOS ---
+
+def process_command(cmd, payload, args_obj, read_source=False):
+    with track_command(cmd) as request:
+        result = dispatch_command(cmd, payload, args_obj)
+        if isinstance(result, dict) and result.get('status') == 'error':
+            request['error'] = str(result.get('message') or True)
+        read = take_replica_read()
+        if read is not None:
+            result = with_read_source(result, read, read_source)
+        return result
+
+def dispatch_command(cmd, payload, args_obj):
     try:
         result = None
         if cmd == 'test_connection':
             result = test_connection()
         elif cmd in ['get_all', 'catalog']:
             result = get_master_catalog()
+        elif cmd == 'search_catalog':
+            result = search_catalog(payload)
+        elif cmd == 'quick_search':
+            result = quick_search(payload)
+        elif cmd == 'search_index_stats':
+            result = get_search_index_stats()
+        elif cmd == 'catalog_store_stats':
+            result = get_catalog_store_stats()
+        elif cmd == 'find_duplicates':
+            result = find_duplicates(payload)
         elif cmd in ['conflicts', 'get_conflicts']:
             result = get_conflicts()
         elif cmd in ['history', 'get_history']:
-            result = get_history(args.code)
+            code_val = args_obj.code if args_obj else payload.get('code')
+            result = get_history(code_val)
         elif cmd == 'update':
-            result = update_master(args.code, payload, args.force_resolve, args.status)
+            code_val = args_obj.code if args_obj else payload.get('code')
+            force = args_obj.force_resolve if args_obj else payload.get('force_resolve')
+            status = args_obj.status if args_obj else payload.get('status')
+            result = update_master(code_val, payload, force, status)
+        elif cmd == 'batch_apply':
+            result = batch_apply(payload)
         elif cmd == 'delete':
-            result = delete_master(args.code)
+            code_val = args_obj.code if args_obj else payload.get('code')
+            result = delete_master(code_val)
         elif cmd == 'insert':
             result = insert_master(payload)
         elif cmd in ['fetch', 'fetch_part']:
-            result = fetch_part(args.code)
+            code_val = args_obj.code if args_obj else payload.get('code')
+            result = fetch_part(code_val)
         elif cmd in ['homologation', 'get_homologation']:
-            result = get_homologation(args.code)
+            code_val = args_obj.code if args_obj else payload.get('code')
+            result = get_homologation(code_val)
+        elif cmd == 'fetch_parts':
+            result = fetch_parts(args_obj.code if args_obj else payload.get('codes'))
+        elif cmd == 'get_history_many':
+            codes = args_obj.code if args_obj else payload.get('codes')
+            result = get_history_many(codes, (payload or {}).get('limit', HISTORY_LIMIT))
+        elif cmd == 'get_homologation_many':
+            result = get_homologation_many(args_obj.code if args_obj else payload.get('codes'))
         elif cmd == 'get_resolved':
             result = get_resolved_tasks()
         elif cmd == 'get_pending':
             result = get_pending_tasks()
         elif cmd in ['mark_corrected', 'mark_solved']:
-            result = mark_task_solved(args.id or args.code)
+            id_val = args_obj.id if args_obj and args_obj.id else (args_obj.code if args_obj else payload.get('id'))
+            result = mark_task_solved(id_val)
         elif cmd == 'find_blueprint':
-            result = find_blueprint(args.code)
+            code_val = args_obj.code if args_obj else payload.get('code')
+            result = find_blueprint(code_val)
         elif cmd == 'export_master':
             result = export_master()
         elif cmd == 'diagnostic':
-            result = run_full_diagnostics()
+            result = run_full_diagnostics(payload)
         # --- COMMANDS v12.0 STANDARDS ---
         elif cmd in ['standards', 'get_standards']:
             result = get_standards()
         elif cmd == 'add_standard':
-            desc = payload.get('Descripcion') if payload else args.code
+            desc = payload.get('Descripcion') if payload else (args_obj.code if args_obj else '')
             cat = payload.get('Categoria', 'GENERAL') if payload else 'GENERAL'
             result = add_standard(desc, cat)
+        elif cmd == 'import_standards':
+            result = import_standards(payload)
         elif cmd == 'edit_standard':
-            new_desc = payload.get('Descripcion') if payload else args.code
-            result = edit_standard(args.id, new_desc)
+            id_val = args_obj.id if args_obj else payload.get('id')
+            new_desc = payload.get('Descripcion') if payload else (args_obj.code if args_obj else '')
+            result = edit_standard(id_val, new_desc)
         elif cmd == 'delete_standard':
-            result = delete_standard(args.id)
+            id_val = args_obj.id if args_obj else payload.get('id')
+            result = delete_standard(id_val)
         # --- COMMANDS v12.1 SMART HOMOLOGATOR ---
         elif cmd == 'get_suggestion':
-            dirty = args.code or (payload.get('text') if payload else None)
+            dirty = (args_obj.code if args_obj else None) or (payload.get('text') if payload else None)
             result = get_match_suggestion(dirty)
+        elif cmd == 'resolve_conflicts_bulk':
+            result = resolve_conflicts_bulk(payload)
         elif cmd == 'save_correction':
-            result = save_excel_correction(args.id, payload.get('text'))
+            id_val = args_obj.id if args_obj else payload.get('id')
+            txt = payload.get('text')
+            result = save_excel_correction(id_val, txt)
         # --- COMMANDS v13.x DATA MANAGER & CONFIG ---
         elif cmd == 'get_config':
             result = load_config()
@@ -1307,14 +5171,12 @@ if __name__ == "__main__":
         elif cmd in ['get_sources', 'get_paths']:
             result = get_sources()
         elif cmd in ['add_source', 'register_path']:
-            # Normalizar nombres de llaves (puede venir como 'name' o 'filename')
             name = payload.get('name') or payload.get('filename') or "Archivo Nuevo"
             path = payload.get('path')
             result = add_source(name, path)
         elif cmd == 'update_source':
             result = update_source(payload.get('id'), payload.get('path'))
         elif cmd == 'scan_source':
-            # Alias scan_source a scan_and_ingest
             result = scan_and_ingest(payload.get('id'))
         elif cmd == 'write_excel':
             result = write_excel_correction(
@@ -1323,11 +5185,150 @@ if __name__ == "__main__":
                 payload.get('filename'), 
                 payload.get('sheet'), 
                 payload.get('row'),
-                'D' # Default col if needed
+                'D' 
             )
+        elif cmd == 'get_encodings':
+            result = get_encoding_info()
+        elif cmd == 'schema_status':
+            result = get_schema_status()
+        elif cmd == 'startup_profile':
+            load_all = payload.get('load_all', True) if payload else True
+            result = get_startup_profile(load_all)
+        elif cmd == 'replica_status':
+            result = get_replica_status()
+        elif cmd == 'refresh_replica':
+            result = refresh_replica(bool(payload.get('full')) if payload else False)
+        elif cmd == 'stats':
+            result = get_command_stats(payload)
+        elif cmd == 'query_stats':
+            result = get_query_stats(payload)
+        elif cmd == 'log_status':
+            result = get_log_status()
+        elif cmd == 'rebuild_conflict_summary':
+            result = rebuild_conflict_summary()
+        elif cmd == 'pipeline':
+            result = run_pipeline(payload)
+        elif cmd == 'warmup_status':
+            result = get_warmup_status()
+        elif cmd == 'watch_status':
+            result = get_watch_status()
+        elif cmd == 'kill':
+            sys.exit(0)
         else:
             result = {"status": "error", "message": f"Comando desconocido: {cmd}"}
-            
-        print(json.dumps(result, default=str))
+
+        if cmd in REPLICA_WRITE_COMMANDS:
+            mark_replica_pending()
+            note_local_write(cmd, result)
+        return result
     except Exception as e:
-        print(json.dumps({"status": "error", "message": str(e)}, default=str))
+        return {"status": "error", "message": str(e)}
+
+# --- EXECUTION ---
+if __name__ == "__main__":
+    import argparse
+    import multiprocessing
+    multiprocessing.freeze_support() # find_duplicates usa un pool de procesos (data_bridge.exe de PyInstaller)
+    parser = argparse.ArgumentParser()
+    parser.add_argument('command', nargs='?', help='API Command') # Optional for loop mode
+    parser.add_argument('--code', help='Part code')
+    parser.add_argument('--id', help='Task ID')
+    parser.add_argument('--stdin', action='store_true', help='Read payload from stdin (base64)')
+    parser.add_argument('--force_resolve', action='store_true', help='Force resolution')
+    parser.add_argument('--status', help='Custom resolution status')
+    parser.add_argument('--listen', action='store_true', help='Start in persistent listener mode')
+    parser.add_argument('--accept-encoding', dest='accept_encoding', help='Compressed response encodings accepted (e.g. lz4,zlib)')
+    parser.add_argument('--stream', action='store_true', help='Emit large reads as NDJSON frames')
+    parser.add_argument('--batch_size', type=int, help='Rows per streamed frame')
+    parser.add_argument('--events', action='store_true', help='Emit unsolicited event lines in listener mode (ready, catalog_changed)')
+    parser.add_argument('--watch', action='store_true', help='Poll server change markers and emit catalog_changed events (implies --events)')
+    
+    args = parser.parse_known_args()[0]
+
+    # --- MODE 1: PERSISTENT LISTENER (OPTIMIZATION v14.1) ---
+    if args.listen:
+        # Optimización: Mantener proceso vivo para evitar carga repetitiva de Python/Librerías
+        _LISTENER['events'] = args.events or args.watch
+        start_listener_warmup() # Calentamiento, réplica y keep-alive en segundo plano (no retrasan el loop)
+        if args.watch or (_LISTENER['events'] and load_config().get('change_watch', False)):
+            start_change_watcher() # Avisos catalog_changed cuando otra estación modifica datos
+        while True:
+            try:
+                # 1. FRENO DE MANO: Pausa obligatoria
+                time.sleep(0.05) # 50ms es suficiente para respuesta rápida sin quemar CPU
+
+                # 2. DETECCIÓN DE PADRE MUERTO (Suicide Protocol)
+                if sys.stdin.closed:
+                    sys.exit(0)
+
+                # Leer línea de stdin
+                line = sys.stdin.readline()
+                if not line:
+                    # EOF recibido (padre cerró el stream)
+                    sys.exit(0)
+                
+                line = line.strip()
+                if not line:
+                    continue
+                note_listener_activity()
+
+                # Procesar Request
+                try:
+                    req = json.loads(line)
+                    cmd = req.get('command')
+                    payload = req.get('payload', {})
+                    
+                    # Logica de args (shim para compatibilidad con funcion process_command)
+                    # En modo listen, todo viene en payload
+                    
+                    # Lecturas grandes en frames NDJSON si el cliente lo pide
+                    if req.get('stream') and cmd in STREAMABLE_COMMANDS:
+                        with track_command(cmd):
+                            write_stream(cmd, req.get('request_id'), req.get('batch_size'), req.get('accept_encoding'))
+                        continue
+
+                    # Métricas: el request incluye serialización y escritura de la respuesta
+                    with track_command(cmd):
+                        result = process_command(cmd, payload, None, bool(req.get('read_source')))
+
+                        # Responder (comprimido solo si el cliente lo negoció)
+                        write_response(result, req.get('accept_encoding'))
+
+                except json.JSONDecodeError:
+                    print(json.dumps({"status": "error", "message": "JSON invalido"}, default=str))
+                    sys.stdout.flush()
+                    
+            except KeyboardInterrupt:
+                sys.exit(0)
+            except Exception as e:
+                # 3. LOGGING CONTROLADO Y WAIT
+                # Si falla el bucle (ej. stdin roto), esperar antes de reintentar o morir
+                try:
+                    print(json.dumps({"status": "error", "message": f"Loop Error: {str(e)}"}, default=str))
+                    sys.stdout.flush()
+                except:
+                    pass
+                time.sleep(1.0) # Espera larga si hay error grave
+
+    # --- MODE 2: ONE-SHOT (LEGACY) ---
+    else:
+        payload = None
+        if args.stdin:
+            try:
+                stdin_data = sys.stdin.read().strip()
+                if stdin_data:
+                    try:
+                        payload = json.loads(base64.b64decode(stdin_data).decode('utf-8'))
+                    except:
+                        payload = json.loads(stdin_data)
+            except:
+                pass
+        
+        # Shim para process_command con CLI args
+        # Convertimos args a objeto compatible o usamos payload
+        # process_command usa args_obj para .code, .id, etc.
+        if args.stream and args.command in STREAMABLE_COMMANDS:
+            write_stream(args.command, None, args.batch_size, args.accept_encoding)
+        else:
+            res = process_command(args.command, payload, args)
+            write_response(res, args.accept_encoding)
@@ -0,0 +1,247 @@
+import os
+import sys
+import random
+import datetime
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import data_bridge
+
+# Generador de datos sintéticos para el sustituto SQLite del bridge (v14.2)
+# Uso: python scripts/synthetic_data.py --db bench.sqlite --parts 20000 --conflict_ratio 0.05 --history_depth 3
+#      python scripts/synthetic_data.py --db bench.sqlite --workbook lista.xlsx --rows 5000 --conflict_rate 0.1
+
+PIECES = ['SOPORTE', 'PLACA', 'ANGULO', 'TUBO', 'CANAL', 'BRIDA', 'TAPA', 'REFUERZO', 'MENSULA', 'BASE', 'GUARDA', 'ESCUADRA']
+QUALIFIERS = ['LATERAL', 'SUPERIOR', 'INFERIOR', 'FRONTAL', 'TRASERO', 'CENTRAL', 'DE MONTAJE', 'DE FIJACION']
+PROCESSES = ['CORTE LASER', 'DOBLEZ', 'SOLDADURA', 'MAQUINADO', 'PINTURA', 'GALVANIZADO', None]
+SYMMETRY = ['IZQ', 'DER', 'SIM', None]
+
+# Encabezados de una lista de proyecto (fila 4, columnas D-L)
+WORKBOOK_HEADERS = ['CÓDIGO', 'DESCRIPCIÓN', 'MEDIDA', 'CANT.', 'SIMETRÍA', 'PROCESO PRIMARIO', 'PROCESO 1', 'PROCESO 2', 'PROCESO 3']
+
+def perturb_description(text, rng):
+    """Variante "sucia" de una descripción, como llega desde Excel."""
+    kind = rng.randrange(4)
+    if kind == 0:
+        return text.lower()
+    if kind == 1:
+        return '  ' + text.replace(' ', '  ') + ' '
+    if kind == 2 and len(text) > 4:
+        i = rng.randrange(len(text) - 1)
+        return text[:i] + text[i + 1] + text[i] + text[i + 2:] # Transposición
+    return text + ' REV B'
+
+def near_duplicate_description(text, rng):
+    """Casi-duplicado que sobrevive a la normalización (mayúsculas/espacios): cambia caracteres o tokens.
+    Con ~20 trigramas, solo los cambios en los extremos quedan sobre Jaccard 0.85; los del
+    medio quedan por debajo y prueban que no se reporten."""
+    original = data_bridge._normalize_description(text)
+    for _ in range(10):
+        tokens = text.split()
+        kind = rng.randrange(6)
+        if kind == 0:
+            edited = text + rng.choice(['.', 'S', ' A', ' B']) # Sufijo al final
+        elif kind == 1:
+            edited = text[:-1] # Último carácter perdido
+        elif kind == 2:
+            edited = rng.choice('XZQW') + text[1:] # Error de dedo en el primer carácter
+        elif kind == 3 and len(text) > 4:
+            i = rng.randrange(len(text) - 1)
+            edited = text[:i] + text[i + 1] + text[i] + text[i + 2:] # Transposición
+        elif kind == 4 and len(tokens) > 2:
+            i = rng.randrange(len(tokens) - 1)
+            tokens[i], tokens[i + 1] = tokens[i + 1], tokens[i] # Tokens invertidos
+            edited = ' '.join(tokens)
+        else:
+            digits = [i for i, char in enumerate(text) if char.isdigit()]
+            if not digits:
+                continue
+            i = rng.choice(digits)
+            edited = text[:i] + str((int(text[i]) + rng.randint(1, 9)) % 10) + text[i + 1:] # Medida mal capturada
+        if data_bridge._normalize_description(edited) != original:
+            if rng.random() < 0.3: # A veces, además, ruido de Excel que la normalización quita
+                edited = rng.choice([edited.lower(), '  ' + edited.replace(' ', '  ') + ' '])
+            return edited
+    return text + ' REV B'
+
+def generate_parts(parts, rng, base):
+    materials = [item['d'] for item in data_bridge.validate_standards(data_bridge.DEFAULT_STANDARDS)[0]]
+    rows = []
+    for i in range(parts):
+        rows.append({
+            'c': f"JA-{i:06d}",
+            'd': f"{rng.choice(PIECES)} {rng.choice(QUALIFIERS)} {rng.randint(10, 3000)} MM",
+            'm': rng.choice(materials),
+            'md': f"{rng.randint(10, 3000)} x {rng.randint(10, 1500)} MM",
+            's': rng.choice(SYMMETRY),
+            'p0': rng.choice(PROCESSES),
+            'p1': rng.choice(PROCESSES),
+            'p2': rng.choice(PROCESSES),
+            'p3': rng.choice(PROCESSES),
+            'u': base + datetime.timedelta(minutes=rng.randint(0, 500000))
+        })
+    return rows
+
+def build_standin(path, parts=10000, conflict_ratio=0.05, history_depth=3, seed=42):
+    """Crea (o reemplaza) un SQLite con el esquema completo y datos sintéticos. Devuelve conteos."""
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+    data_bridge.use_backend('sqlite', path)
+    data_bridge.create_standin_schema()
+
+    rng = random.Random(seed)
+    base = datetime.datetime(2023, 1, 1)
+    master = generate_parts(parts, rng, base)
+
+    projects, conflicts, resolutions = [], [], []
+    for n, part in enumerate(master):
+        conflicted = rng.random() < conflict_ratio
+        excel_desc = perturb_description(part['d'], rng) if conflicted else part['d']
+        projects.append({
+            'c': part['c'], 'd': excel_desc,
+            'f': f"PROYECTO_{n // 500:04d}.xlsx", 'h': 'LISTA', 'r': 6 + n % 500,
+            'q': 1 if conflicted else 0, 'u': part['u']
+        })
+        if conflicted:
+            conflicts.append({'c': part['c'], 'x': excel_desc, 'm': part['d'], 'u': part['u']})
+        for depth in range(history_depth):
+            resolutions.append({
+                'c': part['c'], 'd': part['d'], 's': rng.choice(['CORREGIDO', 'IGNORADO']),
+                'f': part['u'] - datetime.timedelta(days=30 * (depth + 1))
+            })
+
+    text = data_bridge.text
+    with data_bridge.get_engine().begin() as conn:
+        conn.execute(text("""
+            INSERT INTO Tbl_Maestro_Piezas
+            (Codigo_Pieza, Descripcion, Material, Medida, Simetria, Proceso_Primario, Proceso_1, Proceso_2, Proceso_3, Ultima_Actualizacion)
+            VALUES (:c, :d, :m, :md, :s, :p0, :p1, :p2, :p3, :u)
+        """), master)
+        conn.execute(text("""
+            INSERT INTO Tbl_Historial_Proyectos
+            (Codigo_Pieza, Descripcion_Excel, Nombre_Archivo, Nombre_Hoja, Numero_Fila_Excel, Requiere_Correccion, Fecha_Registro)
+            VALUES (:c, :d, :f, :h, :r, :q, :u)
+        """), projects)
+        if conflicts:
+            conn.execute(text("""
+                INSERT INTO Tbl_Auditoria_Conflictos (Codigo_Pieza, Desc_Excel, Desc_Master, Estado, Fecha_Deteccion, Tipo_Conflicto)
+                VALUES (:c, :x, :m, 'PENDIENTE', :u, 'DATOS_DIFERENTES')
+            """), conflicts)
+        if resolutions:
+            conn.execute(text("""
+                INSERT INTO Tbl_Historial_Resoluciones (Codigo_Pieza, Descripcion_Final, Estado_Resolucion, Fecha_Resolucion, Usuario)
+                VALUES (:c, :d, :s, :f, 'SISTEMA')
+            """), resolutions)
+
+    return {
+        "parts": len(master),
+        "conflicts": len(conflicts),
+        "history_rows": len(resolutions),
+        "project_rows": len(projects),
+        "seed": seed
+    }
+
+def build_project_workbook(path, existing, rows=2000, conflict_rate=0.1, new_rate=0.1, sheets=3,
+                           group_every=25, merged_rate=0.02, seed=42):
+    """Libro con formato de lista de proyecto: títulos combinados, encabezados en la fila 4,
+    datos desde la fila 6 (D-L), separadores de subensamble combinados y descripciones
+    combinadas en vertical. existing: [(codigo, descripcion)] del maestro.
+    Devuelve lo que la ingesta debe detectar (altas, conflictos) y filas con conflicto."""
+    rng = random.Random(seed)
+    wb = data_bridge.openpyxl.Workbook()
+    ws = wb.active
+    ws.title = 'LISTA DE MATERIALES'
+    ws.merge_cells('A1:L1')
+    ws['A1'] = f"PROYECTO SINTÉTICO {seed:04d}"
+    ws.merge_cells('A2:L2')
+    ws['A2'] = 'CLIENTE: PRUEBAS DE RENDIMIENTO'
+    ws['A3'] = 'REV. A'
+    for offset, title in enumerate(WORKBOOK_HEADERS):
+        ws.cell(row=4, column=4 + offset, value=title)
+    ws.merge_cells('D5:L5')
+    ws['D5'] = 'DATOS DE PIEZA'
+
+    expected_new = 0
+    conflict_rows = []
+    row_number = data_bridge.INGEST_FIRST_ROW
+    previous_data_row = None
+    for n in range(rows):
+        if group_every and n and n % group_every == 0:
+            # Separador de subensamble: combinado A:C, sin código (la ingesta lo salta)
+            ws.merge_cells(start_row=row_number, start_column=1, end_row=row_number, end_column=3)
+            ws.cell(row=row_number, column=1, value=f"SUBENSAMBLE {n // group_every}")
+            row_number += 1
+            previous_data_row = None
+
+        roll = rng.random()
+        master_desc = None
+        if roll < new_rate or not existing:
+            code = f"SN{seed:04d}-{expected_new:06d}"
+            desc = f"{rng.choice(PIECES)} NUEVA {rng.randint(10, 3000)} MM"
+            expected_new += 1
+        else:
+            code, master_desc = rng.choice(existing)
+            desc = perturb_description(master_desc, rng) if roll < new_rate + conflict_rate else master_desc
+
+        values = [code, desc, f"{rng.randint(10, 3000)} MM", rng.randint(1, 20), rng.choice(SYMMETRY),
+                  rng.choice(PROCESSES), rng.choice(PROCESSES), rng.choice(PROCESSES), rng.choice(PROCESSES)]
+        for offset, value in enumerate(values):
+            ws.cell(row=row_number, column=4 + offset, value=value)
+
+        if previous_data_row and rng.random() < merged_rate:
+            # Descripción combinada con la fila anterior: esta fila se lee vacía
+            ws.merge_cells(start_row=previous_data_row, start_column=5, end_row=row_number, end_column=5)
+            desc = ''
+            previous_data_row = None
+        else:
+            previous_data_row = row_number
+
+        if master_desc is not None and desc != master_desc:
+            conflict_rows.append({'row': row_number, 'code': code, 'master': master_desc})
+        row_number += 1
+
+    for index in range(1, sheets):
+        extra = wb.create_sheet(f"HOJA {index + 1}")
+        extra['A1'] = 'RESUMEN DE CORTE' if index == 1 else 'NOTAS'
+        for r in range(2, 52):
+            extra.cell(row=r, column=1, value=rng.choice(PIECES))
+            extra.cell(row=r, column=2, value=rng.randint(1, 500))
+    wb.active = 0
+    wb.save(path)
+    wb.close()
+
+    return {
+        "path": path,
+        "sheet": ws.title,
+        "rows": rows,
+        "new": expected_new,
+        "conflicts": len(conflict_rows),
+        "conflict_rows": conflict_rows
+    }
+
+def load_master_pairs():
+    """(codigo, descripcion) del maestro en el backend activo."""
+    with data_bridge.get_engine().connect() as conn:
+        return [tuple(row) for row in conn.execute(data_bridge.text("SELECT Codigo_Pieza, Descripcion FROM Tbl_Maestro_Piezas"))]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--db', default='bench_standin.sqlite', help='Archivo SQLite a generar')
+    parser.add_argument('--parts', type=int, default=10000, help='Piezas en el maestro')
+    parser.add_argument('--conflict_ratio', type=float, default=0.05, help='Fracción de piezas con conflicto pendiente')
+    parser.add_argument('--history_depth', type=int, default=3, help='Resoluciones históricas por pieza')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--workbook', help='Además, generar una lista de proyecto .xlsx contra ese maestro')
+    parser.add_argument('--rows', type=int, default=2000, help='Filas de la lista de proyecto')
+    parser.add_argument('--conflict_rate', type=float, default=0.1, help='Fracción de filas con descripción distinta al maestro')
+    parser.add_argument('--new_rate', type=float, default=0.1, help='Fracción de filas con código nuevo')
+    parser.add_argument('--sheets', type=int, default=3, help='Hojas del libro')
+    args = parser.parse_args()
+    counts = build_standin(args.db, args.parts, args.conflict_ratio, args.history_depth, args.seed)
+    print(f"✅ {args.db}: {counts['parts']} piezas, {counts['conflicts']} conflictos, {counts['history_rows']} resoluciones")
+    if args.workbook:
+        book = build_project_workbook(args.workbook, load_master_pairs(), args.rows, args.conflict_rate,
+                                      args.new_rate, args.sheets, seed=args.seed)
+        print(f"✅ {args.workbook}: {book['rows']} filas, {book['new']} altas, {book['conflicts']} conflictos esperados")